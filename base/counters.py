@@ -0,0 +1,16 @@
+# base/counters.py
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+
+def increment(key, alias=DEFAULT_CACHE_ALIAS):
+    """
+    Add one to the counter kept at `key` in the cache `alias`, creating it
+    if needed. Counters never expire, though the cache may evict them.
+    """
+    cache = caches[alias]
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter was evicted between `add()` and `incr()`.
+        cache.set(key, 1, timeout=None)
@@ -0,0 +1,163 @@
+# base/feeds.py
+"""
+Streaming Atom and RSS feeds with conditional GET.
+
+`feed_response()` answers a feed request as cheaply as it can:
+
+1. Validators are built from the feed's latest timestamp and item count
+   (one aggregate query, made by the caller) and the versions of its
+   `base.page_cache` tags, which signal handlers bump on edits the
+   timestamps don't show. A matching `If-None-Match` / `If-Modified-Since`
+   gets a `304` without rendering anything.
+2. Bodies are cached under their ETag, so a cached body is valid exactly as
+   long as the validators are unchanged and needs no invalidation of its
+   own.
+3. Otherwise the feed is rendered item by item into a
+   `StreamingHttpResponse`; the caller passes items as a lazy iterable, so
+   a large archive is never held in memory as a whole.
+"""
+import hashlib
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils import feedgenerator
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from base.page_cache import current_versions, release
+
+KEY_PREFIX = "feed"
+
+# Items written per streamed chunk.
+CHUNK_ITEMS = 50
+
+
+class StreamingFeedMixin:
+    """
+    Write a `feedgenerator.SyndicationFeed` one chunk at a time.
+
+    The document is first written without items and split before the
+    closing tag of `CONTAINER`; items are then written between the two
+    halves with the feed class's own `write_items()`.
+    """
+
+    CONTAINER = None
+
+    def __init__(self, *args, last_modified=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.last_modified = last_modified
+
+    def latest_post_date(self):
+        # The items aren't known up front; the caller knows the latest.
+        return self.last_modified or super().latest_post_date()
+
+    def stream(self, items):
+        """
+        Yield the feed with `items`, an iterable of `add_item()` keyword
+        arguments, as strings.
+        """
+        buffer = StringIO()
+        self.items = []
+        self.write(buffer, "utf-8")
+        document = buffer.getvalue()
+        split = document.rindex(f"</{self.CONTAINER}>")
+        yield document[:split]
+
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(buffer, "utf-8", short_empty_elements=True)
+        for count, item in enumerate(items, 1):
+            self.items = []
+            self.add_item(**item)
+            self.write_items(handler)
+            if count % CHUNK_ITEMS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue() + document[split:]
+
+
+class StreamingAtomFeed(StreamingFeedMixin, feedgenerator.Atom1Feed):
+    CONTAINER = "feed"
+
+
+class StreamingRssFeed(StreamingFeedMixin, feedgenerator.Rss201rev2Feed):
+    CONTAINER = "channel"
+
+
+FEED_TYPES = {
+    "atom": StreamingAtomFeed,
+    "rss": StreamingRssFeed,
+}
+
+
+def feed_digest(request, feed_format, last_modified, count, tags):
+    """
+    Return a digest of everything the feed at `request.path` depends on;
+    its ETag and the key its body is cached under.
+    """
+    versions = sorted(current_versions(tags).items())
+    key = (
+        f"{release()}|{request.path}|{feed_format}|{last_modified}|{count}"
+        f"|{versions}"
+    )
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def body_key(digest):
+    return f"{KEY_PREFIX}:{digest}"
+
+
+def cache_body(key, chunks):
+    """
+    Yield `chunks` and cache the body they form once it has been sent,
+    unless it grew over `FEED_CACHE_MAX_BYTES`.
+    """
+    kept, size = [], 0
+    for chunk in chunks:
+        if kept is not None:
+            size += len(chunk)
+            if size > settings.FEED_CACHE_MAX_BYTES:
+                kept = None
+            else:
+                kept.append(chunk)
+        yield chunk
+    if kept is not None:
+        cache.set(key, "".join(kept), settings.FEED_CACHE_TIMEOUT)
+
+
+def feed_response(request, feed_format, *, items, last_modified, count, tags,
+                  **feed_kwargs):
+    """
+    Return the response for a feed in `feed_format` ("atom" or "rss").
+
+    `items` is a lazy iterable of `add_item()` keyword arguments, only
+    consumed if the body has to be rendered; `last_modified` and `count`
+    describe it and `tags` are the `base.page_cache` tags it depends on.
+    `feed_kwargs` are passed to the feed class (`title`, `link`, ...).
+    """
+    feed_class = FEED_TYPES.get(feed_format)
+    if feed_class is None:
+        raise Http404("Unknown feed format.")
+    digest = feed_digest(request, feed_format, last_modified, count, tags)
+    etag = quote_etag(digest)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        feed = feed_class(last_modified=last_modified, **feed_kwargs)
+        key = body_key(digest)
+        body = cache.get(key) if settings.PAGE_CACHE_ENABLED else None
+        if body is not None:
+            response = HttpResponse(body, content_type=feed.content_type)
+        else:
+            chunks = feed.stream(items)
+            if settings.PAGE_CACHE_ENABLED:
+                chunks = cache_body(key, chunks)
+            response = StreamingHttpResponse(chunks, content_type=feed.content_type)
+    response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    return response
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from base.page_cache import invalidate, object_tags
+from base.rendering import LINES, PARAGRAPHS, refresh_html
+from blog.models import Post
+from portfolio.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-render the stored HTML of `blog.Post.body` and "
+        "`portfolio.Project.description` whose source or renderer changed"
+    )
+    batch_size = 200
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render every row, even if its hash is current.",
+        )
+
+    def handle(self, *args, **kwargs):
+        force = kwargs.get("force", False)
+        targets = (
+            (Post, "body", PARAGRAPHS, "post"),
+            (Project, "description", LINES, "project"),
+        )
+        for model, field, style, tag in targets:
+            html_field = f"{field}_html"
+            hash_field = f"{field}_html_hash"
+            rows = model.objects.only("id", field, hash_field).order_by("pk")
+            updated = 0
+            last_pk = 0
+            while True:
+                batch = list(rows.filter(pk__gt=last_pk)[: self.batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                if force:
+                    for obj in batch:
+                        setattr(obj, hash_field, "")
+                stale = [obj for obj in batch if refresh_html(obj, field, style)]
+                if stale:
+                    # `bulk_update()` bypasses `save()`, so `updated_at`
+                    # and the signal handlers are left alone; cached pages
+                    # showing the rows are purged here instead.
+                    model.objects.bulk_update(stale, [html_field, hash_field])
+                    invalidate(f"{tag}-feed", *object_tags(tag, stale))
+                    updated += len(stale)
+            self.stdout.write(
+                f"Re-rendered {updated} {model._meta.verbose_name_plural}."
+            )
@@ -0,0 +1,181 @@
+# base/middleware.py
+import logging
+import os
+import random
+import re
+import sys
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Literals are replaced so queries that differ only by parameter values
+# (the hallmark of an N+1) normalize to the same shape.
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST = re.compile(r"\bIN \((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+
+THIS_FILE = os.path.abspath(__file__)
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised in development when a view exceeds its query budget or repeats
+    the same query shape too many times.
+    """
+
+
+def normalize_sql(sql):
+    """
+    Reduce `sql` to its shape by stripping parameter values.
+    """
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = NUMBER_LITERAL.sub("?", sql)
+    sql = IN_LIST.sub("IN (...)", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def find_query_origin():
+    """
+    Walk the current stack and describe where a query came from: the
+    innermost project function (e.g. `Project.display_technologies`) and
+    the innermost template line being rendered, if any.
+    """
+    base_dir = str(settings.BASE_DIR)
+    code_location = None
+    template_location = None
+    frame = sys._getframe(1)
+    while frame is not None and (code_location is None or template_location is None):
+        code = frame.f_code
+        filename = os.path.abspath(code.co_filename)
+        if template_location is None and code.co_name == "render_annotated":
+            node = frame.f_locals.get("self")
+            token = getattr(node, "token", None)
+            origin = getattr(node, "origin", None)
+            if token is not None and origin is not None:
+                template_location = f"{origin.template_name}:{token.lineno}"
+        elif (
+            code_location is None
+            and filename.startswith(base_dir)
+            and filename != THIS_FILE
+            and "site-packages" not in filename
+        ):
+            owner = frame.f_locals.get("self")
+            name = code.co_name
+            if owner is not None:
+                name = f"{type(owner).__name__}.{name}"
+            relative = os.path.relpath(filename, base_dir)
+            code_location = f"{name} ({relative}:{frame.f_lineno})"
+        frame = frame.f_back
+    return code_location, template_location
+
+
+class QueryRecorder:
+    """
+    `connection.execute_wrapper()` hook that counts queries and groups them
+    by normalized shape.
+    """
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.count = 0
+        self.shapes = Counter()
+        self.origins = defaultdict(Counter)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        shape = normalize_sql(sql)
+        self.shapes[shape] += 1
+        if self.trace:
+            self.origins[shape][find_query_origin()] += 1
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        """
+        Return `(shape, count)` pairs for shapes run more than `threshold`
+        times, most frequent first.
+        """
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+
+class QueryBudgetMiddleware:
+    """
+    Count the SQL queries of each request and compare them against the
+    budget configured for its URL name in `settings.QUERY_BUDGETS`.
+
+    Requests are also checked for the same normalized query being run more
+    than `settings.QUERY_REPEAT_THRESHOLD` times (an N+1). With
+    `settings.QUERY_BUDGET_RAISE` enabled (development) violations raise
+    `QueryBudgetExceeded` with a report naming the code and template lines
+    that issued the queries; otherwise they are logged. Only a
+    `settings.QUERY_BUDGET_SAMPLE_RATE` fraction of requests is
+    instrumented, and each sampled request logs its query counters.
+    Streaming responses are exempt: their queries run while the body is
+    sent, after the middleware has returned.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = getattr(settings, "QUERY_BUDGET_SAMPLE_RATE", 1.0)
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        should_raise = getattr(settings, "QUERY_BUDGET_RAISE", False)
+        recorder = QueryRecorder(trace=should_raise)
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else None
+        budgets = getattr(settings, "QUERY_BUDGETS", {})
+        if view_name not in budgets or response.streaming:
+            # Streamed bodies (feeds) run their queries after this returns,
+            # one batch per chunk, so they can't be held to a fixed budget.
+            return response
+
+        budget = budgets[view_name]
+        threshold = getattr(settings, "QUERY_REPEAT_THRESHOLD", 5)
+        repeated = recorder.repeated(threshold)
+        logger.info(
+            "query_budget view=%s queries=%d budget=%d repeated_shapes=%d",
+            view_name,
+            recorder.count,
+            budget,
+            len(repeated),
+        )
+        if recorder.count <= budget and not repeated:
+            return response
+
+        report = self.build_report(view_name, budget, recorder, repeated)
+        if should_raise:
+            raise QueryBudgetExceeded(report)
+        logger.warning(report)
+        return response
+
+    def build_report(self, view_name, budget, recorder, repeated):
+        """
+        Describe a budget violation, naming where repeated queries came from.
+        """
+        lines = [
+            f"View '{view_name}' ran {recorder.count} queries "
+            f"(budget {budget})."
+        ]
+        for shape, count in repeated:
+            lines.append(f"Repeated {count}x: {shape}")
+            for (code_location, template_location), hits in recorder.origins[
+                shape
+            ].most_common(3):
+                lines.append(
+                    f"    {hits}x from {code_location or 'unknown code'}"
+                    f" in template {template_location or '-'}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,224 @@
+# base/page_cache.py
+"""
+Full-response cache for anonymous visitors with tag-based invalidation.
+
+A cached view records dependency tags such as `post:42` or `technology:7`
+while it renders (see `add_cache_tags()`). Each tag has a version stored in
+the cache; an entry remembers the versions of its tags when it was stored
+and is only served while they are unchanged. `invalidate()` replaces a
+tag's version, so exactly the entries that depend on it become stale, with
+any cache backend and without tracking reverse key sets. Page keys include
+`release()`, so markup cached before a deploy is never served after it.
+"""
+import hashlib
+import time
+from functools import lru_cache, wraps
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from base import single_flight
+from base.counters import increment
+
+KEY_PREFIX = "page-cache"
+
+# Names passed to `cache_anonymous_page()`, for `stats()`.
+CACHED_VIEWS = set()
+
+
+def tag_key(tag):
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def counter_key(view_name, outcome):
+    return f"{KEY_PREFIX}:{outcome}:{view_name}"
+
+
+@lru_cache(maxsize=None)
+def source_digest():
+    """
+    Return a digest of the project's templates and Python modules.
+    """
+    base_dir = Path(settings.BASE_DIR)
+    roots = [Path(d) for engine in settings.TEMPLATES for d in engine["DIRS"]]
+    roots += [
+        Path(config.path)
+        for config in apps.get_app_configs()
+        if Path(config.path).is_relative_to(base_dir)
+    ]
+    digest = hashlib.md5()
+    for root in sorted(set(roots)):
+        for path in sorted(root.rglob("*")):
+            if path.suffix in (".html", ".py", ".txt", ".xml") and path.is_file():
+                digest.update(str(path.relative_to(base_dir)).encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def release():
+    """
+    Return `settings.PAGE_CACHE_VERSION`, or else a digest of the code that
+    renders pages, which changes with every deploy that changes markup.
+    """
+    return settings.PAGE_CACHE_VERSION or source_digest()
+
+
+def page_key(view_name, request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"{KEY_PREFIX}:page:{release()}:{view_name}:{path}"
+
+
+def new_version():
+    return time.time_ns()
+
+
+def add_cache_tags(request, *tags):
+    """
+    Declare that the response being rendered for `request` depends on
+    `tags`. Does nothing outside a cached view.
+    """
+    collected = getattr(request, "page_cache_tags", None)
+    if collected is not None:
+        collected.update(tags)
+
+
+def object_tags(prefix, objects):
+    """
+    Return `"<prefix>:<pk>"` tags for `objects`.
+    """
+    return [f"{prefix}:{obj.pk}" for obj in objects]
+
+
+def invalidate(*tags):
+    """
+    Make every cached page depending on any of `tags` stale. The versions
+    are replaced again once the current transaction commits, since a
+    concurrent request may have re-cached the old content in between.
+    """
+    if not tags:
+        return
+    cache.set_many({tag_key(tag): new_version() for tag in tags}, timeout=None)
+    transaction.on_commit(
+        lambda: cache.set_many(
+            {tag_key(tag): new_version() for tag in tags}, timeout=None
+        )
+    )
+
+
+def current_versions(tags):
+    """
+    Return `{tag: version}` for `tags`, creating versions for new tags.
+    """
+    keys = {tag_key(tag): tag for tag in tags}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        version = new_version()
+        # `add()` keeps a version another worker created in the meantime.
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+        found[key] = version
+    return {keys[key]: version for key, version in found.items()}
+
+
+def is_current(response):
+    keys = {
+        tag_key(tag): version
+        for tag, version in response.page_cache_versions.items()
+    }
+    found = cache.get_many(keys)
+    return all(found.get(key) == version for key, version in keys.items())
+
+
+def stats():
+    """
+    Return `{view_name: {"hits": n, "stale": n, "misses": n}}` for every
+    cached view.
+    """
+    outcomes = {"hits": "hit", "stale": "stale", "misses": "miss"}
+    keys = [
+        counter_key(view_name, outcome)
+        for view_name in CACHED_VIEWS
+        for outcome in outcomes.values()
+    ]
+    found = cache.get_many(keys)
+    return {
+        view_name: {
+            name: found.get(counter_key(view_name, outcome), 0)
+            for name, outcome in outcomes.items()
+        }
+        for view_name in sorted(CACHED_VIEWS)
+    }
+
+
+def is_cacheable_request(request, shared):
+    """
+    Shared pages don't depend on the visitor at all, so they are served to
+    everyone without loading the session.
+    """
+    return (
+        settings.PAGE_CACHE_ENABLED
+        and request.method in ("GET", "HEAD")
+        and (shared or not request.user.is_authenticated)
+    )
+
+
+def is_cacheable_response(request, response):
+    """
+    Only store responses that are identical for every anonymous visitor.
+    """
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # A page embedding a CSRF token is tied to the visitor's cookie.
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        and "private" not in response.get("Cache-Control", "")
+    )
+
+
+def cache_anonymous_page(view_name, shared=False):
+    """
+    Decorator caching the full response of a view for anonymous visitors,
+    or for everyone if the view is `shared` (its pages are completed per
+    visitor by `base.views.session_fragment`), until one of the tags it
+    declared is invalidated. Pages are recomputed
+    through `base.single_flight`, so one change causes one re-render across
+    workers while the others keep serving the previous page. Responses
+    carry an `X-Page-Cache: HIT` / `STALE` / `MISS` header.
+    """
+    CACHED_VIEWS.add(view_name)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request, shared):
+                return view_func(request, *args, **kwargs)
+
+            def render_page():
+                request.page_cache_tags = set()
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, "render") and callable(response.render):
+                    response = response.render()
+                if is_cacheable_response(request, response):
+                    response.page_cache_versions = current_versions(
+                        request.page_cache_tags
+                    )
+                return response
+
+            response, status = single_flight.fetch(
+                page_key(view_name, request),
+                render_page,
+                settings.PAGE_CACHE_TIMEOUT,
+                is_current=is_current,
+                cacheable=lambda response: hasattr(response, "page_cache_versions"),
+            )
+            increment(counter_key(view_name, status.lower()))
+            response["X-Page-Cache"] = status
+            return response
+
+        return wrapper
+
+    return decorator
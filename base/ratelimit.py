@@ -0,0 +1,90 @@
+# base/ratelimit.py
+"""
+Token buckets kept in a cache.
+
+A bucket holds up to `capacity` tokens and regains `rate` tokens per
+second; every request spends one. It is stored as `(tokens, timestamp)`
+and refilled lazily when read, so a decision is a single cache round trip
+each way and no background process is needed. The read-modify-write isn't
+atomic, so concurrent requests can overspend a bucket by a token or two,
+which is fine for throttling.
+
+Every request writes its bucket, so the cache should be a fast one such as
+Redis rather than the database cache, and shared by every worker process
+for the limits to hold across them.
+"""
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+from base.counters import increment
+
+KEY_PREFIX = "ratelimit"
+
+
+def counter_key(name):
+    return f"{KEY_PREFIX}:dropped:{name}"
+
+
+class TokenBucket:
+    """
+    Rate limit named `name`, allowing bursts of `capacity` requests and
+    `rate` requests per second after that, per key, kept in the cache
+    `alias`.
+    """
+
+    def __init__(self, name, rate, capacity, alias=DEFAULT_CACHE_ALIAS):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def cache_key(self, key):
+        return f"{KEY_PREFIX}:{self.name}:{key}"
+
+    @property
+    def timeout(self):
+        # A full bucket is the default, so it doesn't need to be kept longer
+        # than it takes to refill.
+        return int(self.capacity / self.rate) + 1
+
+    def tokens(self, key, now):
+        tokens, updated = self.cache.get(self.cache_key(key), (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def wait(self, key, now=None):
+        """
+        Return the seconds until the bucket of `key` has a token, `0` if it
+        has one now, without spending it.
+        """
+        now = time.time() if now is None else now
+        return max(0, (1 - self.tokens(key, now)) / self.rate)
+
+    def consume(self, key, now=None):
+        """
+        Spend a token from the bucket of `key`. Returns `0` if the request
+        is allowed, otherwise the seconds until a token is available.
+        """
+        now = time.time() if now is None else now
+        tokens = self.tokens(key, now)
+        if tokens < 1:
+            self.drop()
+            return (1 - tokens) / self.rate
+        self.cache.set(self.cache_key(key), (tokens - 1, now), self.timeout)
+        return 0
+
+    def drop(self):
+        """
+        Count a request rejected by this limit.
+        """
+        increment(counter_key(self.name), self.alias)
+
+    def dropped(self):
+        """
+        Number of requests this limit has rejected.
+        """
+        return self.cache.get(counter_key(self.name), 0)
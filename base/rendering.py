@@ -0,0 +1,102 @@
+# base/rendering.py
+import hashlib
+from importlib.util import find_spec
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.template.defaultfilters import linebreaks_filter, linebreaksbr
+
+# Bump this whenever the output of `render_text()` changes for the same
+# input, then run `python manage.py rerender_html` to refresh stored HTML.
+RENDERER_VERSION = "1"
+
+SAFE_URL_SCHEMES = ("", "http", "https", "mailto")
+
+# `linebreaks` wraps paragraphs in `<p>`; `linebreaksbr` only inserts `<br>`.
+PARAGRAPHS = "paragraphs"
+LINES = "lines"
+
+
+def text_format():
+    """
+    Return the source format in effect: "markdown" (with "+pygments" when
+    code highlighting is available) if `settings.RICH_TEXT_FORMAT` asks for
+    it and the `markdown` package is installed, otherwise "plain".
+    """
+    if getattr(settings, "RICH_TEXT_FORMAT", "plain") != "markdown":
+        return "plain"
+    if find_spec("markdown") is None:
+        return "plain"
+    if find_spec("pygments") is None:
+        return "markdown"
+    return "markdown+pygments"
+
+
+def source_hash(source, style):
+    """
+    Return a hash identifying the HTML `render_text()` would produce, so
+    stored HTML is only regenerated when the source or renderer changes.
+    """
+    key = "\0".join([RENDERER_VERSION, text_format(), style, source or ""])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def render_markdown(source):
+    """
+    Render Markdown with fenced code blocks, highlighted by Pygments when it
+    is installed. Raw HTML in the source is escaped, not passed through,
+    and links or images with unsafe schemes (`javascript:` etc.) are
+    neutralized.
+    """
+    import markdown
+    from markdown.treeprocessors import Treeprocessor
+
+    class SafeUrls(Treeprocessor):
+        def run(self, root):
+            for element in root.iter():
+                for attribute in ("href", "src"):
+                    url = element.get(attribute)
+                    if url and urlparse(url.strip()).scheme.lower() not in (
+                        SAFE_URL_SCHEMES
+                    ):
+                        element.set(attribute, "#")
+
+    extensions = ["fenced_code", "tables"]
+    if text_format() == "markdown+pygments":
+        extensions.append("codehilite")
+    md = markdown.Markdown(extensions=extensions, output_format="html")
+    md.preprocessors.deregister("html_block")
+    md.inlinePatterns.deregister("html")
+    md.treeprocessors.register(SafeUrls(md), "safe_urls", 0)
+    return md.convert(source)
+
+
+def render_text(source, style=PARAGRAPHS):
+    """
+    Render user-entered text to HTML.
+
+    With `settings.RICH_TEXT_FORMAT = "markdown"` the `markdown` package
+    (and optionally `pygments`) is used; otherwise, or if it isn't
+    installed, the output matches Django's `linebreaks` / `linebreaksbr`
+    filters.
+    """
+    source = source or ""
+    if text_format() != "plain":
+        return render_markdown(source)
+    if style == LINES:
+        return linebreaksbr(source)
+    return linebreaks_filter(source)
+
+
+def refresh_html(obj, source_field, style=PARAGRAPHS):
+    """
+    Re-render `<source_field>_html` on `obj` if `<source_field>_html_hash`
+    is stale. Returns `True` if the HTML was regenerated.
+    """
+    source = getattr(obj, source_field)
+    digest = source_hash(source, style)
+    if getattr(obj, f"{source_field}_html_hash") == digest:
+        return False
+    setattr(obj, f"{source_field}_html", render_text(source, style))
+    setattr(obj, f"{source_field}_html_hash", digest)
+    return True
@@ -0,0 +1,291 @@
+# base/similarity.py
+"""
+Item-to-item similarity for "related" recommendations.
+
+`SimilarityIndex` scores pairs of items as a weighted mix of
+
+- TF-IDF cosine similarity of their texts, and
+- Jaccard similarity of their sets (categories, technologies, ...).
+
+Both are sparse: an item is only compared with items sharing a term or a
+set member, found through postings lists (term -> items), which is the
+sparse matrix product `X @ X.T` without materializing `X`. `top_k_all()`
+computes that product with vectorized NumPy operations a block of rows at
+a time, keeping only each row's best `k`, so memory stays bounded however
+many items there are; `top_k()` scores one item against all others, which
+is what incremental updates need. Both give the same results.
+"""
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# Cells `top_k_all()` works on at once, per block of rows: the rows x items
+# scores plus the postings entries expanded to compute them.
+BLOCK_CELLS = 1 << 20
+
+WORD = re.compile(r"[^\W\d_]{3,}", re.UNICODE)
+
+STOP_WORDS = frozenset(
+    """
+    about after again also and any are because been before being between
+    both but can could did does doing down during each few for from had has
+    have having her here hers him his how into its just more most not now
+    off once only other our out over own same she should some such than
+    that the their them then there these they this those through too under
+    until very was were what when where which while who whom why will with
+    would you your
+    """.split()
+)
+
+
+def tokens(text):
+    return [
+        word for word in WORD.findall(text.lower()) if word not in STOP_WORDS
+    ]
+
+
+def tfidf(documents):
+    """
+    Return an L2-normalized `{term: weight}` vector per token list in
+    `documents`, with sublinear term frequencies and smoothed IDF.
+    """
+    counts = [Counter(document) for document in documents]
+    frequency = Counter(term for count in counts for term in count)
+    total = len(documents)
+    idf = {
+        term: math.log((1 + total) / (1 + documents_with_term)) + 1
+        for term, documents_with_term in frequency.items()
+    }
+    vectors = []
+    for count in counts:
+        vector = {
+            term: (1 + math.log(occurrences)) * idf[term]
+            for term, occurrences in count.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+    return vectors
+
+
+class SimilarityIndex:
+    """
+    Pairwise similarity of the items `ids`.
+
+    `texts` (token lists, see `tokens()`) and `sets` (collections of
+    hashable members) are given per item, in `ids` order; either may be
+    omitted. The score of a pair is `set_weight` times their Jaccard
+    similarity plus `1 - set_weight` times their text cosine similarity.
+    """
+
+    def __init__(self, ids, texts=None, sets=None, set_weight=0.0):
+        self.ids = list(ids)
+        self.position = {item: position for position, item in enumerate(self.ids)}
+        if texts is None:
+            set_weight = 1.0
+        elif sets is None:
+            set_weight = 0.0
+        self.set_weight = set_weight
+        self.text_weight = 1.0 - set_weight
+        self.vectors = tfidf(texts) if texts is not None else [{}] * len(self.ids)
+        self.sets = [set(members) for members in sets or [()] * len(self.ids)]
+        self.term_postings = defaultdict(list)
+        for position, vector in enumerate(self.vectors):
+            for term, weight in vector.items():
+                self.term_postings[term].append((position, weight))
+        self.member_postings = defaultdict(list)
+        for position, members in enumerate(self.sets):
+            for member in members:
+                self.member_postings[member].append(position)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def scores(self, item):
+        """
+        Return `{other position: score}` for the items sharing a term or a
+        member with `item`.
+        """
+        position = self.position[item]
+        cosine = defaultdict(float)
+        for term, weight in self.vectors[position].items():
+            for other, other_weight in self.term_postings[term]:
+                cosine[other] += weight * other_weight
+        shared = Counter(
+            other
+            for member in self.sets[position]
+            for other in self.member_postings[member]
+        )
+        size = len(self.sets[position])
+        scores = {}
+        for other in cosine.keys() | shared.keys():
+            if other == position:
+                continue
+            union = size + len(self.sets[other]) - shared[other]
+            jaccard = shared[other] / union if union else 0.0
+            score = self.text_weight * cosine[other] + self.set_weight * jaccard
+            if score > 0:
+                scores[other] = score
+        return scores
+
+    def top_k(self, item, k):
+        """
+        Return the `k` items most similar to `item` as `[(id, score), ...]`,
+        best first; ties go to the lower id.
+        """
+        best = heapq.nsmallest(
+            k,
+            self.scores(item).items(),
+            key=lambda pair: (-pair[1], self.ids[pair[0]]),
+        )
+        return [(self.ids[other], score) for other, score in best]
+
+    def top_k_all(self, k):
+        """
+        Return `{id: top_k(id, k)}` for every item.
+        """
+        count = len(self.ids)
+        terms = Postings(self.term_postings.values(), count)
+        members = Postings(
+            (
+                [(position, 1.0) for position in positions]
+                for positions in self.member_postings.values()
+            ),
+            count,
+        )
+        sizes = np.array([len(members) for members in self.sets], dtype=np.float64)
+        costs = count + terms.costs() + members.costs()
+        ids = np.array(self.ids)
+        result = {}
+        for start, stop in blocks(costs, BLOCK_CELLS):
+            scores = np.zeros((stop - start, count))
+            if self.text_weight:
+                scores += self.text_weight * terms.products(start, stop)
+            if self.set_weight:
+                shared = members.products(start, stop)
+                union = sizes[start:stop, None] + sizes[None, :] - shared
+                scores += self.set_weight * np.divide(
+                    shared, union, out=np.zeros_like(shared), where=shared > 0
+                )
+            scores[np.arange(stop - start), np.arange(start, stop)] = 0
+            for row, item in enumerate(self.ids[start:stop]):
+                row_scores = scores[row]
+                candidates = np.flatnonzero(row_scores > 0)
+                if len(candidates) > k:
+                    # Only the `k` best and those tied with the last one.
+                    worst = np.partition(row_scores[candidates], -k)[-k]
+                    candidates = candidates[row_scores[candidates] >= worst]
+                # Best score first, ties to the lower id, as in `top_k()`.
+                order = np.lexsort((ids[candidates], -row_scores[candidates]))[:k]
+                result[item] = [
+                    (int(ids[other]), float(row_scores[other]))
+                    for other in candidates[order]
+                ]
+        return result
+
+
+class Postings:
+    """
+    Postings lists (`[(position, weight), ...]` per term or member) of
+    `count` items as flat arrays, indexed both by list and by item, for
+    computing rows of the product `X @ X.T` a block at a time. Lists of a
+    single item only add to the diagonal and are left out.
+    """
+
+    def __init__(self, postings_lists, count):
+        lists = [postings for postings in postings_lists if len(postings) > 1]
+        lengths = np.array([len(postings) for postings in lists], dtype=np.int64)
+        self.count = count
+        self.list_offsets = np.concatenate(([0], np.cumsum(lengths)))
+        self.positions = np.array(
+            [position for postings in lists for position, _ in postings],
+            dtype=np.int64,
+        )
+        self.weights = np.array(
+            [weight for postings in lists for _, weight in postings],
+            dtype=np.float64,
+        )
+        # The same entries grouped by item.
+        order = np.argsort(self.positions, kind="stable")
+        self.item_lists = np.repeat(np.arange(len(lists)), lengths)[order]
+        self.item_weights = self.weights[order]
+        self.item_offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.positions, minlength=count)))
+        )
+
+    def costs(self):
+        """
+        Return the number of entries `products()` expands for each row.
+        """
+        lengths = np.diff(self.list_offsets)[self.item_lists]
+        items = np.repeat(np.arange(self.count), np.diff(self.item_offsets))
+        return np.bincount(items, weights=lengths, minlength=self.count)
+
+    def products(self, start, stop):
+        """
+        Return rows `start:stop` of `X @ X.T`, where `X` is the items x
+        lists matrix of weights, as a dense array.
+        """
+        first, last = self.item_offsets[start], self.item_offsets[stop]
+        rows = np.repeat(
+            np.arange(stop - start), np.diff(self.item_offsets[start:stop + 1])
+        )
+        lists = self.item_lists[first:last]
+        begins = self.list_offsets[lists]
+        lengths = self.list_offsets[lists + 1] - begins
+        # Pair every entry of the rows with every entry of its list.
+        entries = np.repeat(np.arange(len(lists)), lengths)
+        others = (
+            np.arange(lengths.sum())
+            - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            + np.repeat(begins, lengths)
+        )
+        cells = rows[entries] * self.count + self.positions[others]
+        products = np.bincount(
+            cells,
+            weights=self.item_weights[first:last][entries] * self.weights[others],
+            minlength=(stop - start) * self.count,
+        )
+        # `bincount()` returns integers when there is nothing to add.
+        return products.astype(np.float64, copy=False).reshape(
+            stop - start, self.count
+        )
+
+
+def blocks(costs, limit):
+    """
+    Split the rows into consecutive `(start, stop)` ranges whose `costs`
+    add up to at most `limit`, with at least one row each.
+    """
+    start, total = 0, 0
+    for row, cost in enumerate(costs):
+        if row > start and total + cost > limit:
+            yield start, row
+            start, total = row, 0
+        total += cost
+    if start < len(costs):
+        yield start, len(costs)
+
+
+def stale_items(index, changed, stored, k):
+    """
+    Return the items of `index` whose `top_k(item, k)` may differ from
+    `stored` (`{id: [(id, score), ...]}`) after the items `changed` were
+    changed or removed: the changed items themselves, the items listing
+    one of them, and the items a changed item now beats the worst
+    neighbour of.
+    """
+    changed = set(changed)
+    stale = {item for item in changed if item in index}
+    for item, neighbours in stored.items():
+        if any(neighbour in changed for neighbour, _ in neighbours):
+            stale.add(item)
+    for item in changed & stale:
+        for position, score in index.scores(item).items():
+            other = index.ids[position]
+            neighbours = stored.get(other, [])
+            if len(neighbours) < k or score > min(s for _, s in neighbours):
+                stale.add(other)
+    return {item for item in stale if item in index}
@@ -0,0 +1,125 @@
+# base/single_flight.py
+"""
+Stampede protection for cached values.
+
+`fetch()` stores a value together with its logical expiry and how long it
+took to compute, and keeps it physically for `CACHE_STALE_SECONDS` longer:
+
+- Shortly before the logical expiry a request may refresh the value early,
+  with a probability that grows as expiry approaches and with the cost of
+  the computation ("XFetch"), so refreshes are spread out instead of all
+  landing on the expiry instant.
+- Only the request holding the key's lock recomputes. Everyone else keeps
+  getting the stale value while it is refreshed.
+- With no value to fall back on, followers wait up to `CACHE_LOCK_WAIT`
+  seconds for the leader's result before computing it themselves. They
+  stop waiting as soon as the leader releases the lock without storing a
+  value, as it does for errors and uncacheable values.
+"""
+import math
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+
+# How often followers look for the leader's result while waiting.
+POLL_INTERVAL = 0.05
+
+
+def lock_key(key):
+    return f"{key}:lock"
+
+
+def acquire(key):
+    """
+    Try to become the only process recomputing `key`. Returns a token for
+    `release()`, or `None` if another process holds the lock.
+    """
+    token = uuid.uuid4().hex
+    if cache.add(lock_key(key), token, settings.CACHE_LOCK_TIMEOUT):
+        return token
+    return None
+
+
+def release(key, token):
+    """
+    Drop the lock on `key` unless it expired and was taken over.
+    """
+    if cache.get(lock_key(key)) == token:
+        cache.delete(lock_key(key))
+
+
+def refresh_early(entry, now):
+    """
+    Decide whether to recompute a still valid `entry` ahead of its expiry.
+    `-log(random())` is exponentially distributed, so the chance grows
+    smoothly as `now` nears `expires`, scaled by the recompute time.
+    """
+    gap = entry["delta"] * settings.CACHE_EARLY_EXPIRY_BETA
+    return now - gap * math.log(1.0 - random.random()) >= entry["expires"]
+
+
+def store(key, value, timeout, delta):
+    cache.set(
+        key,
+        {"value": value, "expires": time.time() + timeout, "delta": delta},
+        timeout + settings.CACHE_STALE_SECONDS,
+    )
+
+
+def compute_and_store(key, compute, timeout, cacheable):
+    started = time.monotonic()
+    value = compute()
+    if cacheable(value):
+        store(key, value, timeout, time.monotonic() - started)
+    return value
+
+
+def fetch(key, compute, timeout, is_current=None, cacheable=None):
+    """
+    Return `(value, status)` for `key`, calling `compute()` at most once
+    per expiry across processes. `status` is `HIT`, `STALE` (served while
+    another process recomputes) or `MISS` (computed by this request).
+
+    `is_current(value)` can reject a cached value before its expiry, and
+    `cacheable(value)` prevents storing a computed one.
+    """
+    is_current = is_current or (lambda value: True)
+    cacheable = cacheable or (lambda value: True)
+
+    entry = cache.get(key)
+    if entry is not None:
+        current = is_current(entry["value"])
+        if current and not refresh_early(entry, time.time()):
+            return entry["value"], HIT
+        token = acquire(key)
+        if token is None:
+            return entry["value"], HIT if current else STALE
+        try:
+            return compute_and_store(key, compute, timeout, cacheable), MISS
+        finally:
+            release(key, token)
+
+    token = acquire(key)
+    if token is None:
+        deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None and is_current(entry["value"]):
+                return entry["value"], HIT
+            if cache.get(lock_key(key)) is None:
+                # Done without storing a value; nothing more to wait for.
+                break
+        # The leader is slow or failed; don't keep the visitor waiting.
+        return compute_and_store(key, compute, timeout, cacheable), MISS
+    try:
+        return compute_and_store(key, compute, timeout, cacheable), MISS
+    finally:
+        release(key, token)
@@ -0,0 +1,200 @@
+# base/sitemaps.py
+"""
+Sitemaps built straight from `values_list()` rows.
+
+Each `Section` lists one kind of page. Its URLs are split into chunks by
+`id` range, `SITEMAP_CHUNK_SIZE` ids per chunk, so a chunk never holds
+more URLs than the sitemap protocol allows and is selected by an index
+range scan rather than an `OFFSET`. `sitemap.xml` is a sitemap index
+naming the non-empty chunks, found with one grouped query per section;
+other chunks don't exist and are answered with a `404`.
+
+Chunks are gzipped while their rows are streamed from the database and
+the compressed bytes are cached alongside the page cache. Cache keys and
+ETags include the versions of each section's `base.page_cache` tags, so
+signal handlers invalidate them like cached pages and unchanged sitemaps
+are answered with a `304`.
+"""
+import gzip
+import hashlib
+import zlib
+from itertools import chain
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max
+from django.db.models.constants import LOOKUP_SEP
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+
+from base.page_cache import current_versions, release
+
+KEY_PREFIX = "sitemap"
+
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+# Rows fetched from the database at a time.
+FETCH_SIZE = 2000
+
+
+class Section:
+    """
+    One kind of page in the sitemap.
+
+    `fields` are fetched for every row and passed to `location()`;
+    `lastmod` is the path of an indexed timestamp, possibly across a
+    relation, in which case the latest related one is used. `tags` are the
+    `base.page_cache` tags whose invalidation changes the section.
+    """
+
+    model = None
+    fields = ("id",)
+    lastmod = None
+    tags = ()
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def location(self, *values):
+        raise NotImplementedError
+
+    def lastmod_expression(self):
+        if LOOKUP_SEP in self.lastmod:
+            return Max(self.lastmod)
+        return F(self.lastmod)
+
+    def chunks(self, size):
+        """
+        Return `[(chunk, lastmod), ...]` for the non-empty chunks.
+        """
+        return list(
+            self.get_queryset()
+            .annotate(sitemap_chunk=(F("id") - 1) / size)
+            .values("sitemap_chunk")
+            .annotate(sitemap_lastmod=Max(self.lastmod))
+            .order_by("sitemap_chunk")
+            .values_list("sitemap_chunk", "sitemap_lastmod")
+        )
+
+    def rows(self, chunk, size):
+        """
+        Yield `(location, lastmod)` for the ids of `chunk`, in `id` order.
+        """
+        rows = (
+            self.get_queryset()
+            .filter(id__gt=chunk * size, id__lte=(chunk + 1) * size)
+            .annotate(sitemap_lastmod=self.lastmod_expression())
+            .order_by("id")
+            .values_list(*self.fields, "sitemap_lastmod")
+        )
+        for *values, lastmod in rows.iterator(chunk_size=FETCH_SIZE):
+            yield self.location(*values), lastmod
+
+
+def format_lastmod(lastmod):
+    return lastmod.replace(microsecond=0).isoformat()
+
+
+def url_entry(tag, location, lastmod):
+    entry = f"<{tag}><loc>{escape(location)}</loc>"
+    if lastmod is not None:
+        entry += f"<lastmod>{format_lastmod(lastmod)}</lastmod>"
+    return entry + f"</{tag}>\n"
+
+
+def compress(lines):
+    """
+    Gzip the strings `lines` as they are produced.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    parts = [
+        compressor.compress('<?xml version="1.0" encoding="UTF-8"?>\n'.encode())
+    ]
+    for line in lines:
+        parts.append(compressor.compress(line.encode()))
+    parts.append(compressor.flush())
+    return b"".join(parts)
+
+
+def index_lines(request, sections):
+    yield f'<sitemapindex xmlns="{XMLNS}">\n'
+    size = settings.SITEMAP_CHUNK_SIZE
+    for name, section in sections.items():
+        for chunk, lastmod in section.chunks(size):
+            location = request.build_absolute_uri(
+                reverse("sitemap-section", kwargs={"section": name, "chunk": chunk})
+            )
+            yield url_entry("sitemap", location, lastmod)
+    yield "</sitemapindex>\n"
+
+
+def section_lines(request, section, chunk):
+    rows = section.rows(chunk, settings.SITEMAP_CHUNK_SIZE)
+    first = next(rows, None)
+    if first is None:
+        raise Http404("No such sitemap chunk.")
+    yield f'<urlset xmlns="{XMLNS}">\n'
+    base = request.build_absolute_uri("/").rstrip("/")
+    for location, lastmod in chain([first], rows):
+        yield url_entry("url", base + location, lastmod)
+    yield "</urlset>\n"
+
+
+def sitemap_response(request, name, tags, build):
+    """
+    Return the sitemap `name`, gzipped by `build()` unless it is cached.
+    """
+    versions = sorted(current_versions(tags).items())
+    key = f"{request.build_absolute_uri('/')}|{name}|{settings.SITEMAP_CHUNK_SIZE}"
+    digest = hashlib.md5(f"{release()}|{key}|{versions}".encode()).hexdigest()
+    etag = quote_etag(digest)
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        cache_key = f"{KEY_PREFIX}:{digest}"
+        body = cache.get(cache_key) if settings.PAGE_CACHE_ENABLED else None
+        if body is None:
+            body = build()
+            if settings.PAGE_CACHE_ENABLED:
+                cache.set(cache_key, body, settings.SITEMAP_CACHE_TIMEOUT)
+        if "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", ""):
+            response = HttpResponse(body, content_type="application/xml")
+            response["Content-Encoding"] = "gzip"
+        else:
+            # Rare; crawlers accept gzip.
+            body = gzip.decompress(body)
+            response = HttpResponse(body, content_type="application/xml")
+        patch_vary_headers(response, ["Accept-Encoding"])
+    response["ETag"] = etag
+    return response
+
+
+def sitemap_index(request, sitemaps):
+    """
+    The sitemap index, naming every chunk of every section in `sitemaps`.
+    """
+    tags = [tag for section in sitemaps.values() for tag in section.tags]
+    return sitemap_response(
+        request,
+        "index",
+        tags,
+        lambda: compress(index_lines(request, sitemaps)),
+    )
+
+
+def sitemap_section(request, sitemaps, section, chunk):
+    """
+    One chunk of a section of the sitemap.
+    """
+    if section not in sitemaps:
+        raise Http404("No such sitemap section.")
+    current = sitemaps[section]
+    return sitemap_response(
+        request,
+        f"{section}-{chunk}",
+        current.tags,
+        lambda: compress(section_lines(request, current, chunk)),
+    )
@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import feedgenerator
+
+from base import feeds
+from base.page_cache import invalidate
+
+LAST_MODIFIED = datetime(2023, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def items(count):
+    return [
+        {
+            "title": f"Item {number}",
+            "link": f"https://example.com/{number}/",
+            "description": f"Description {number}",
+            "pubdate": LAST_MODIFIED,
+        }
+        for number in range(count)
+    ]
+
+
+FEED_KWARGS = {
+    "title": "Feed",
+    "link": "https://example.com/",
+    "description": "A feed",
+}
+
+
+class StreamingFeedTest(TestCase):
+    """
+    Tests for `base.feeds.StreamingFeedMixin`.
+    """
+
+    def assertStreamsLikeWrite(self, streaming_class, feed_class, count):
+        expected = feed_class(**FEED_KWARGS)
+        for item in items(count):
+            expected.add_item(**item)
+        out = StringIO()
+        expected.write(out, "utf-8")
+        streamed = streaming_class(last_modified=LAST_MODIFIED, **FEED_KWARGS)
+        self.assertEqual("".join(streamed.stream(iter(items(count)))), out.getvalue())
+
+    def test_atom_matches_feedgenerator(self):
+        """
+        The streamed Atom feed is the document `Atom1Feed` writes.
+        """
+        for count in (1, feeds.CHUNK_ITEMS + 1):
+            with self.subTest(count=count):
+                self.assertStreamsLikeWrite(
+                    feeds.StreamingAtomFeed, feedgenerator.Atom1Feed, count
+                )
+
+    def test_rss_matches_feedgenerator(self):
+        """
+        The streamed RSS feed is the document `Rss201rev2Feed` writes.
+        """
+        for count in (1, feeds.CHUNK_ITEMS + 1):
+            with self.subTest(count=count):
+                self.assertStreamsLikeWrite(
+                    feeds.StreamingRssFeed, feedgenerator.Rss201rev2Feed, count
+                )
+
+    def test_items_are_consumed_lazily(self):
+        """
+        Items are pulled from the iterable one chunk at a time.
+        """
+        pulled = []
+
+        def lazy():
+            for item in items(feeds.CHUNK_ITEMS * 2):
+                pulled.append(item)
+                yield item
+
+        chunks = feeds.StreamingAtomFeed(**FEED_KWARGS).stream(lazy())
+        next(chunks)
+        self.assertEqual(pulled, [])
+        next(chunks)
+        self.assertEqual(len(pulled), feeds.CHUNK_ITEMS)
+
+
+class FeedResponseTest(TestCase):
+    """
+    Tests for `base.feeds.feed_response`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def respond(self, feed_format="atom", **headers):
+        request = RequestFactory().get("/feed/", **headers)
+        return feeds.feed_response(
+            request,
+            feed_format,
+            items=iter(items(3)),
+            last_modified=LAST_MODIFIED,
+            count=3,
+            tags=["feed-test"],
+            **FEED_KWARGS,
+        )
+
+    def test_sends_validators(self):
+        """
+        Feeds carry an ETag and the latest item's Last-Modified.
+        """
+        response = self.respond()
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertEqual(response["Last-Modified"], "Mon, 01 May 2023 12:00:00 GMT")
+        self.assertIn(b"Item 2", b"".join(response.streaming_content))
+
+    def test_matching_etag_returns_304_without_rendering(self):
+        """
+        A matching `If-None-Match` is answered without rendering.
+        """
+        etag = self.respond()["ETag"]
+        with mock.patch.object(feeds.StreamingFeedMixin, "stream") as stream:
+            response = self.respond(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        stream.assert_not_called()
+
+    def test_if_modified_since_returns_304(self):
+        """
+        An `If-Modified-Since` at the latest item is answered with 304.
+        """
+        response = self.respond(HTTP_IF_MODIFIED_SINCE="Mon, 01 May 2023 12:00:00 GMT")
+        self.assertEqual(response.status_code, 304)
+
+    def test_invalidated_tag_changes_etag(self):
+        """
+        Bumping one of the feed's tags changes its ETag.
+        """
+        etag = self.respond()["ETag"]
+        invalidate("feed-test")
+        self.assertNotEqual(self.respond()["ETag"], etag)
+        self.assertEqual(self.respond(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_body_is_cached_after_streaming(self):
+        """
+        A fully streamed body is served from the cache next time.
+        """
+        body = b"".join(self.respond().streaming_content)
+        cached = self.respond()
+        self.assertIsInstance(cached, HttpResponse)
+        self.assertEqual(cached.content, body)
+        self.assertEqual(cached["Content-Type"], "application/atom+xml; charset=utf-8")
+
+    @override_settings(PAGE_CACHE_ENABLED=True, FEED_CACHE_MAX_BYTES=100)
+    def test_large_body_is_not_cached(self):
+        """
+        Bodies over `FEED_CACHE_MAX_BYTES` are streamed every time.
+        """
+        b"".join(self.respond().streaming_content)
+        self.assertIsInstance(self.respond(), StreamingHttpResponse)
+
+    def test_unknown_format_is_not_found(self):
+        """
+        Only "atom" and "rss" feeds exist.
+        """
+        with self.assertRaises(Http404):
+            self.respond("json")
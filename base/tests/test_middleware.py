@@ -0,0 +1,133 @@
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve
+
+from accounts.models import CustomUser
+from base.middleware import (
+    QueryBudgetExceeded,
+    QueryBudgetMiddleware,
+    normalize_sql,
+)
+from portfolio.models import Project, Technology
+
+
+class NormalizeSqlTest(TestCase):
+    """
+    Tests for `normalize_sql`.
+    """
+
+    def test_literals_are_replaced(self):
+        """
+        Queries differing only by parameter values share a shape.
+        """
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id = 1 AND name = 'x'"),
+            normalize_sql("SELECT  * FROM t WHERE id = 22 AND name = 'y''z'"),
+        )
+
+    def test_in_lists_are_collapsed(self):
+        """
+        `IN` lists of any length share a shape.
+        """
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id IN (...)",
+        )
+
+
+@override_settings(
+    QUERY_BUDGETS={"portfolio:projects": 3},
+    QUERY_REPEAT_THRESHOLD=2,
+    QUERY_BUDGET_SAMPLE_RATE=1.0,
+)
+class QueryBudgetMiddlewareTest(TestCase):
+    """
+    Tests for `QueryBudgetMiddleware`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create projects whose technologies are not prefetched.
+        """
+        owner = CustomUser.objects.create_user(
+            username="testuser1",
+            password="testpassword1",
+        )
+        technology = Technology.objects.create(name="Python")
+        for number in range(4):
+            project = Project.objects.create(
+                owner=owner,
+                title=f"Test Project {number}",
+            )
+            project.technology.add(technology)
+
+    def make_request(self):
+        request = RequestFactory().get("/portfolio/projects/")
+        request.resolver_match = resolve("/portfolio/projects/")
+        return request
+
+    def n_plus_one_view(self, request):
+        for project in Project.objects.all():
+            project.display_technologies()
+        return HttpResponse("ok")
+
+    def constant_view(self, request):
+        list(Project.objects.prefetch_related("technology"))
+        return HttpResponse("ok")
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_n_plus_one_raises_with_report(self):
+        """
+        A repeated query shape raises and names the model method behind it.
+        """
+        middleware = QueryBudgetMiddleware(self.n_plus_one_view)
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            middleware(self.make_request())
+        report = str(raised.exception)
+        self.assertIn("portfolio:projects", report)
+        self.assertIn("Repeated 4x", report)
+        self.assertIn("Project.display_technologies", report)
+
+    @override_settings(QUERY_BUDGET_RAISE=False)
+    def test_violation_is_logged_when_not_raising(self):
+        """
+        Violations are logged instead of raised outside development.
+        """
+        middleware = QueryBudgetMiddleware(self.n_plus_one_view)
+        with self.assertLogs("base.middleware", level="WARNING"):
+            response = middleware(self.make_request())
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_view_within_budget_passes(self):
+        """
+        A view within its budget returns its response untouched.
+        """
+        middleware = QueryBudgetMiddleware(self.constant_view)
+        response = middleware(self.make_request())
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGET_RAISE=True, QUERY_BUDGET_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_checked(self):
+        """
+        Requests outside the sample are passed straight through.
+        """
+        middleware = QueryBudgetMiddleware(self.n_plus_one_view)
+        response = middleware(self.make_request())
+        self.assertEqual(response.status_code, 200)
+
+    def streaming_view(self, request):
+        return StreamingHttpResponse(
+            project.display_technologies() for project in Project.objects.all()
+        )
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_streaming_responses_are_exempt(self):
+        """
+        Streaming responses are not checked against queries they haven't
+        run yet, nor the ones they run while being sent.
+        """
+        middleware = QueryBudgetMiddleware(self.streaming_view)
+        response = middleware(self.make_request())
+        self.assertEqual(len(list(response.streaming_content)), 4)
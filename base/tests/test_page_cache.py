@@ -0,0 +1,335 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from base import page_cache
+from blog.models import Category, Comment, Post
+from portfolio.models import Project, ProjectImage, Technology
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class PageCacheTestCase(TestCase):
+    """
+    Base class clearing the cache around every test.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def assertCached(self, url):
+        """
+        Assert that `url` is served from the page cache.
+        """
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "HIT")
+
+    def assertNotCached(self, url):
+        """
+        Assert that `url` is rendered again.
+        """
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "MISS")
+
+
+class BlogPageCacheTest(PageCacheTestCase):
+    """
+    Tests for the page cache of the `blog` list pages.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username="testuser1",
+            password="testpassword1",
+        )
+        cls.category = Category.objects.create(name="Rocks")
+        cls.other_category = Category.objects.create(name="Flint")
+        cls.post = Post.objects.create(
+            title="Test Post",
+            body="Test body",
+            author=cls.user,
+        )
+        cls.post.categories.add(cls.category)
+        cls.other_post = Post.objects.create(
+            title="Other Post",
+            body="Other body",
+            author=cls.user,
+        )
+        cls.other_post.categories.add(cls.other_category)
+
+    def test_anonymous_page_is_cached(self):
+        """
+        The second anonymous request is served without touching the
+        database.
+        """
+        url = reverse("blog:index")
+        self.assertNotCached(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response["X-Page-Cache"], "HIT")
+        self.assertContains(response, "Test Post")
+
+    def test_query_string_is_part_of_the_key(self):
+        """
+        Different pages of a list are cached separately.
+        """
+        self.assertNotCached(reverse("blog:index"))
+        self.assertNotCached(reverse("blog:index") + "?after=x")
+
+    def test_pages_are_not_served_across_releases(self):
+        """
+        Pages cached by the previous release are rendered again.
+        """
+        url = reverse("blog:index")
+        with self.settings(PAGE_CACHE_VERSION="v1"):
+            self.assertNotCached(url)
+            self.assertCached(url)
+        with self.settings(PAGE_CACHE_VERSION="v2"):
+            self.assertNotCached(url)
+
+    def test_release_defaults_to_a_digest_of_the_code(self):
+        with self.settings(PAGE_CACHE_VERSION=""):
+            self.assertEqual(page_cache.release(), page_cache.source_digest())
+
+    def test_authenticated_requests_are_not_cached(self):
+        """
+        Logged in users always get a freshly rendered page.
+        """
+        self.client.login(username="testuser1", password="testpassword1")
+        response = self.client.get(reverse("blog:index"))
+        self.assertNotIn("X-Page-Cache", response)
+
+    def test_editing_a_post_purges_pages_showing_it(self):
+        """
+        Saving a post purges the pages tagged with it and only those.
+        """
+        index = reverse("blog:index")
+        rocks = self.category.get_absolute_url()
+        flint = self.other_category.get_absolute_url()
+        for url in (index, rocks, flint):
+            self.client.get(url)
+        self.post.title = "Edited Post"
+        self.post.save()
+        self.assertNotCached(index)
+        self.assertNotCached(rocks)
+        self.assertCached(flint)
+        self.assertContains(self.client.get(rocks), "Edited Post")
+
+    def test_new_post_purges_index(self):
+        """
+        Creating a post purges the index, not unrelated category pages.
+        """
+        index = reverse("blog:index")
+        rocks = self.category.get_absolute_url()
+        self.client.get(index)
+        self.client.get(rocks)
+        Post.objects.create(title="New Post", body="New", author=self.user)
+        self.assertNotCached(index)
+        self.assertCached(rocks)
+
+    def test_adding_a_category_purges_its_page(self):
+        """
+        Adding a post to a category purges that category's page.
+        """
+        flint = self.other_category.get_absolute_url()
+        self.client.get(flint)
+        self.post.categories.add(self.other_category)
+        self.assertNotCached(flint)
+
+    def test_renaming_a_category_purges_pages_showing_it(self):
+        """
+        Pages listing a post in a category show the category's name.
+        """
+        index = reverse("blog:index")
+        self.client.get(index)
+        self.category.name = "Stones"
+        self.category.save()
+        self.assertContains(self.client.get(index), "Stones")
+
+    def test_comment_purges_post_pages(self):
+        """
+        Comments change the counts shown on list pages.
+        """
+        index = reverse("blog:index")
+        flint = self.other_category.get_absolute_url()
+        self.client.get(index)
+        self.client.get(flint)
+        Comment.objects.create(author="Visitor", body="Hi", post=self.post)
+        self.assertNotCached(index)
+        self.assertCached(flint)
+
+    def test_counters_are_exposed_to_staff(self):
+        """
+        `page-cache-stats` reports hits and misses per view.
+        """
+        url = reverse("blog:index")
+        self.client.get(url)
+        self.client.get(url)
+        staff = CustomUser.objects.create_user(
+            username="staff",
+            password="staffpassword",
+            is_staff=True,
+        )
+        self.client.force_login(staff)
+        stats = self.client.get(reverse("page-cache-stats")).json()
+        self.assertEqual(stats["blog:index"], {"hits": 1, "stale": 0, "misses": 1})
+
+    def test_counters_are_hidden_from_visitors(self):
+        """
+        Anonymous visitors are sent to the admin login.
+        """
+        response = self.client.get(reverse("page-cache-stats"))
+        self.assertEqual(response.status_code, 302)
+
+
+class BlogDetailPageCacheTest(PageCacheTestCase):
+    """
+    Tests for the page cache of `blog_detail`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(
+            username="testuser1",
+            password="testpassword1",
+        )
+        cls.post = Post.objects.create(title="Test Post", body="Body", author=user)
+
+    def test_page_is_shared_by_every_visitor(self):
+        """
+        The page is cached without `Vary: Cookie` and served to logged in
+        users too.
+        """
+        url = reverse("blog:blog-detail", kwargs={"pk": self.post.pk})
+        response = self.client.get(url)
+        self.assertNotIn("Vary", response)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertNotContains(response, "csrftoken")
+        self.client.login(username="testuser1", password="testpassword1")
+        self.assertCached(url)
+
+    def test_comment_requires_csrf_token_from_fragment(self):
+        """
+        Comments are still CSRF protected; the token comes from the
+        session fragment.
+        """
+        client = Client(enforce_csrf_checks=True)
+        url = reverse("blog:blog-detail", kwargs={"pk": self.post.pk})
+        data = {"author": "Visitor", "body": "Hi"}
+        self.assertEqual(client.post(url, data).status_code, 403)
+        token = client.get(reverse("session-fragment")).json()["csrf_token"]
+        response = client.post(url, {**data, "csrfmiddlewaretoken": token})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), 1)
+
+
+class PortfolioPageCacheTest(PageCacheTestCase):
+    """
+    Tests for the page cache of the `portfolio` pages.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = CustomUser.objects.create_user(
+            username="testuser1",
+            password="testpassword1",
+        )
+        cls.python = Technology.objects.create(name="Python")
+        cls.django = Technology.objects.create(name="Django")
+        cls.project = Project.objects.create(
+            owner=owner,
+            title="Test Project",
+            description="Test description",
+        )
+        cls.project.technology.add(cls.python)
+        cls.other_project = Project.objects.create(
+            owner=owner,
+            title="Other Project",
+            description="Other description",
+        )
+        cls.other_project.technology.add(cls.django)
+
+    def test_project_pages_are_cached(self):
+        """
+        Project list, detail and technology pages are all cached.
+        """
+        for url in (
+            reverse("portfolio:projects"),
+            self.project.get_absolute_url(),
+            self.python.get_absolute_url(),
+        ):
+            self.assertNotCached(url)
+            self.assertCached(url)
+
+    def test_editing_a_technology_purges_pages_showing_it(self):
+        """
+        Renaming a technology purges the pages tagged with it and only
+        those.
+        """
+        detail = self.project.get_absolute_url()
+        other_detail = self.other_project.get_absolute_url()
+        self.client.get(detail)
+        self.client.get(other_detail)
+        self.python.name = "CPython"
+        self.python.save()
+        self.assertNotCached(detail)
+        self.assertCached(other_detail)
+
+    def test_adding_a_technology_purges_its_page(self):
+        """
+        Adding a technology to a project purges the technology's page.
+        """
+        url = self.django.get_absolute_url()
+        self.client.get(url)
+        self.project.technology.add(self.django)
+        response = self.client.get(url)
+        self.assertEqual(response["X-Page-Cache"], "MISS")
+        self.assertContains(response, "Test Project")
+
+    def test_clearing_a_technology_purges_pages_showing_it(self):
+        """
+        A reverse `clear()` purges the technology's pages.
+        """
+        url = self.python.get_absolute_url()
+        self.client.get(url)
+        self.python.projects.clear()
+        self.assertNotCached(url)
+
+    def test_image_purges_its_project(self):
+        """
+        Adding an image purges its project's pages.
+        """
+        detail = self.project.get_absolute_url()
+        other_detail = self.other_project.get_absolute_url()
+        self.client.get(detail)
+        self.client.get(other_detail)
+        ProjectImage.objects.create(project=self.project, image="image.png")
+        self.assertNotCached(detail)
+        self.assertCached(other_detail)
+
+    def test_deleting_a_project_purges_the_list(self):
+        """
+        A deleted project disappears from the list.
+        """
+        url = reverse("portfolio:projects")
+        self.client.get(url)
+        self.other_project.delete()
+        self.assertNotContains(self.client.get(url), "Other Project")
+
+
+class InvalidateTest(PageCacheTestCase):
+    """
+    Tests for `page_cache.invalidate`.
+    """
+
+    def test_versions_change_again_on_commit(self):
+        """
+        A page re-cached before the transaction commits is still purged.
+        """
+        first = page_cache.current_versions(["post:1"])
+        with self.captureOnCommitCallbacks(execute=True):
+            page_cache.invalidate("post:1")
+            during = page_cache.current_versions(["post:1"])
+        after = page_cache.current_versions(["post:1"])
+        self.assertNotEqual(first, during)
+        self.assertNotEqual(during, after)
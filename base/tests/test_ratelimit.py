@@ -0,0 +1,54 @@
+from django.core.cache import cache, caches
+from django.test import SimpleTestCase
+
+from base.ratelimit import TokenBucket
+
+
+class TokenBucketTest(SimpleTestCase):
+    """
+    Tests for `TokenBucket`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.bucket = TokenBucket("test", rate=1, capacity=3)
+
+    def test_burst_up_to_capacity(self):
+        """
+        `capacity` requests pass at once, the next one is rejected.
+        """
+        results = [self.bucket.consume("key", now=100) for _ in range(4)]
+        self.assertEqual(results[:3], [0, 0, 0])
+        self.assertEqual(results[3], 1)
+        self.assertEqual(self.bucket.dropped(), 1)
+
+    def test_tokens_refill_over_time(self):
+        """
+        An empty bucket regains `rate` tokens per second.
+        """
+        for _ in range(3):
+            self.bucket.consume("key", now=100)
+        self.assertGreater(self.bucket.consume("key", now=100.5), 0)
+        self.assertEqual(self.bucket.consume("key", now=101.5), 0)
+
+    def test_keys_have_separate_buckets(self):
+        """
+        Exhausting one key's bucket doesn't affect another key.
+        """
+        for _ in range(4):
+            self.bucket.consume("key", now=100)
+        self.assertEqual(self.bucket.consume("other", now=100), 0)
+
+    def test_buckets_are_kept_in_their_cache(self):
+        """
+        Buckets and their counters are kept in the cache named `alias`.
+        """
+        other = caches["throttle"]
+        self.addCleanup(other.clear)
+        bucket = TokenBucket("test", rate=1, capacity=1, alias="throttle")
+        for _ in range(2):
+            bucket.consume("key", now=100)
+        self.assertEqual(bucket.dropped(), 1)
+        self.assertIsNotNone(other.get(bucket.cache_key("key")))
+        self.assertIsNone(cache.get(bucket.cache_key("key")))
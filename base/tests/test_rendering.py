@@ -0,0 +1,106 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from accounts.models import CustomUser
+from base import rendering
+from blog.models import Post
+from portfolio.models import Project
+
+
+class RenderTextTest(TestCase):
+    """
+    Tests for `render_text` and `source_hash`.
+    """
+
+    def test_plain_paragraphs_match_linebreaks(self):
+        """
+        Plain text renders like the `linebreaks` filter, escaped.
+        """
+        self.assertEqual(
+            rendering.render_text("One\n\nTwo <b>"),
+            "<p>One</p>\n\n<p>Two &lt;b&gt;</p>",
+        )
+
+    def test_plain_lines_match_linebreaksbr(self):
+        """
+        The `LINES` style renders like the `linebreaksbr` filter.
+        """
+        self.assertEqual(
+            rendering.render_text("One\nTwo", rendering.LINES),
+            "One<br>Two",
+        )
+
+    @override_settings(RICH_TEXT_FORMAT="markdown")
+    def test_markdown_falls_back_to_plain_when_not_installed(self):
+        """
+        Asking for Markdown without the package renders plain text.
+        """
+        with mock.patch.object(rendering, "find_spec", return_value=None):
+            self.assertEqual(rendering.text_format(), "plain")
+            self.assertEqual(rendering.render_text("*a*"), "<p>*a*</p>")
+
+    def test_hash_changes_with_renderer_version(self):
+        """
+        Bumping `RENDERER_VERSION` invalidates every stored hash.
+        """
+        before = rendering.source_hash("text", rendering.PARAGRAPHS)
+        with mock.patch.object(rendering, "RENDERER_VERSION", "next"):
+            after = rendering.source_hash("text", rendering.PARAGRAPHS)
+        self.assertNotEqual(before, after)
+
+
+class StoredHtmlTest(TestCase):
+    """
+    Tests for the HTML stored on `Post` and `Project`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+
+    def test_post_body_is_rendered_on_save(self):
+        """
+        Saving a `Post` stores its rendered body.
+        """
+        post = Post.objects.create(title="T", body="Hello", author=self.author)
+        self.assertEqual(post.body_html, "<p>Hello</p>")
+
+    def test_unchanged_source_is_not_rerendered(self):
+        """
+        Saving without changing the body skips rendering.
+        """
+        post = Post.objects.create(title="T", body="Hello", author=self.author)
+        with mock.patch.object(rendering, "render_text") as render_text:
+            post.title = "New title"
+            post.save()
+        render_text.assert_not_called()
+
+    def test_project_description_is_rendered_on_save(self):
+        """
+        Saving a `Project` stores its rendered description.
+        """
+        project = Project.objects.create(
+            owner=self.author, title="P", description="a\nb"
+        )
+        self.assertEqual(project.description_html, "a<br>b")
+
+    def test_rerender_html_command_refreshes_stale_rows(self):
+        """
+        `rerender_html` re-renders rows whose hash is stale.
+        """
+        post = Post.objects.create(title="T", body="Hello", author=self.author)
+        Post.objects.filter(pk=post.pk).update(body_html="", body_html_hash="")
+        out = StringIO()
+        call_command("rerender_html", stdout=out)
+        post.refresh_from_db()
+        self.assertEqual(post.body_html, "<p>Hello</p>")
+        self.assertIn("Re-rendered 1 posts.", out.getvalue())
+        out = StringIO()
+        call_command("rerender_html", stdout=out)
+        self.assertIn("Re-rendered 0 posts.", out.getvalue())
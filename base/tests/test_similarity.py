@@ -0,0 +1,90 @@
+import random
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from base import similarity
+
+TEXTS = [
+    "Knapping flint into arrowheads",
+    "Pressure flaking obsidian arrowheads",
+    "Flint knapping for beginners",
+    "Sourdough bread recipe",
+]
+SETS = [{"stone"}, {"stone", "tools"}, {"stone"}, {"food"}]
+
+
+class SimilarityIndexTest(SimpleTestCase):
+    """
+    Tests for `base.similarity.SimilarityIndex`.
+    """
+
+    def index(self, **kwargs):
+        texts = [similarity.tokens(text) for text in TEXTS]
+        return similarity.SimilarityIndex([10, 20, 30, 40], texts, SETS, **kwargs)
+
+    def test_tokens_drop_stop_words_and_short_words(self):
+        """
+        Tokens are lowercased words of three letters or more.
+        """
+        self.assertEqual(
+            similarity.tokens("The Flint of a 2nd knapper, and its edge"),
+            ["flint", "knapper", "edge"],
+        )
+
+    def test_text_similarity(self):
+        """
+        Items sharing more distinctive words rank higher; unrelated items
+        are left out.
+        """
+        index = self.index()
+        self.assertEqual([pk for pk, _ in index.top_k(10, 3)], [30, 20])
+        self.assertEqual(index.top_k(40, 3), [])
+
+    def test_set_similarity_is_jaccard(self):
+        """
+        With only sets, scores are the Jaccard similarity of the sets.
+        """
+        index = similarity.SimilarityIndex([10, 20, 30, 40], sets=SETS)
+        self.assertEqual(index.top_k(10, 3), [(30, 1.0), (20, 0.5)])
+
+    def test_weights_mix_both_scores(self):
+        """
+        `set_weight` blends Jaccard into the text score.
+        """
+        text = dict(self.index().top_k(10, 3))
+        mixed = dict(self.index(set_weight=0.5).top_k(10, 3))
+        self.assertAlmostEqual(mixed[20], 0.5 * text[20] + 0.5 * 0.5)
+
+    def assertMatchesTopK(self, index, k):
+        expected = {pk: index.top_k(pk, k) for pk in index.ids}
+        batch = index.top_k_all(k)
+        self.assertEqual(batch.keys(), expected.keys())
+        for pk, neighbours in expected.items():
+            self.assertEqual([i for i, _ in batch[pk]], [i for i, _ in neighbours])
+            for (_, got), (_, want) in zip(batch[pk], neighbours):
+                self.assertAlmostEqual(got, want)
+
+    def test_top_k_all_matches_top_k(self):
+        """
+        The batch computation agrees with per-item scoring.
+        """
+        self.assertMatchesTopK(self.index(set_weight=0.3), 2)
+
+    def test_top_k_all_in_blocks(self):
+        """
+        Rows computed a few at a time give the same results, ties included.
+        """
+        rng = random.Random(0)
+        words = ["flint", "chert", "obsidian", "quartz", "basalt", "jasper"]
+        count = 60
+        index = similarity.SimilarityIndex(
+            range(1, count + 1),
+            [rng.choices(words, k=rng.randint(0, 4)) for _ in range(count)],
+            [set(rng.sample(words, rng.randint(0, 2))) for _ in range(count)],
+            set_weight=0.4,
+        )
+        # Every row costs at least `count` cells: three rows per block.
+        with mock.patch.object(similarity, "BLOCK_CELLS", 200):
+            self.assertMatchesTopK(index, 3)
+        self.assertEqual(similarity.SimilarityIndex([]).top_k_all(3), {})
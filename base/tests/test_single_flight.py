@@ -0,0 +1,156 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from base import single_flight
+
+
+@override_settings(
+    CACHE_LOCK_TIMEOUT=30,
+    CACHE_LOCK_WAIT=0.2,
+    CACHE_STALE_SECONDS=60,
+    CACHE_EARLY_EXPIRY_BETA=1.0,
+)
+class FetchTest(SimpleTestCase):
+    """
+    Tests for `single_flight.fetch`.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return f"value {self.calls}"
+
+    def expire(self, key):
+        """
+        Move the logical expiry of `key` into the past.
+        """
+        entry = cache.get(key)
+        entry["expires"] = time.time() - 1
+        cache.set(key, entry)
+
+    def test_value_is_computed_once(self):
+        """
+        A stored value is served until it expires.
+        """
+        self.assertEqual(
+            single_flight.fetch("key", self.compute, 60),
+            ("value 1", single_flight.MISS),
+        )
+        self.assertEqual(
+            single_flight.fetch("key", self.compute, 60),
+            ("value 1", single_flight.HIT),
+        )
+        self.assertEqual(self.calls, 1)
+
+    def test_expired_value_is_recomputed_by_lock_holder(self):
+        """
+        The request that takes the lock recomputes an expired value.
+        """
+        single_flight.fetch("key", self.compute, 60)
+        self.expire("key")
+        self.assertEqual(
+            single_flight.fetch("key", self.compute, 60),
+            ("value 2", single_flight.MISS),
+        )
+        self.assertIsNone(cache.get(single_flight.lock_key("key")))
+
+    def test_stale_value_is_served_while_locked(self):
+        """
+        Followers get the stale value while another process recomputes.
+        """
+        single_flight.fetch("key", self.compute, 60)
+        self.expire("key")
+        single_flight.acquire("key")
+        self.assertEqual(
+            single_flight.fetch("key", self.compute, 60),
+            ("value 1", single_flight.HIT),
+        )
+        self.assertEqual(self.calls, 1)
+
+    def test_rejected_value_is_served_stale_while_locked(self):
+        """
+        A value `is_current` rejects is reported as `STALE`.
+        """
+        single_flight.fetch("key", self.compute, 60)
+        single_flight.acquire("key")
+        self.assertEqual(
+            single_flight.fetch(
+                "key", self.compute, 60, is_current=lambda value: False
+            ),
+            ("value 1", single_flight.STALE),
+        )
+
+    def test_followers_wait_for_leader(self):
+        """
+        Without a stale value, followers wait for the leader's result.
+        """
+        single_flight.acquire("key")
+
+        def leader_finishes(seconds):
+            single_flight.store("key", "leader value", 60, 0.1)
+
+        with mock.patch.object(single_flight.time, "sleep", leader_finishes):
+            self.assertEqual(
+                single_flight.fetch("key", self.compute, 60),
+                ("leader value", single_flight.HIT),
+            )
+        self.assertEqual(self.calls, 0)
+
+    def test_followers_wait_is_bounded(self):
+        """
+        Followers compute the value themselves if the leader takes too long.
+        """
+        single_flight.acquire("key")
+        self.assertEqual(
+            single_flight.fetch("key", self.compute, 60),
+            ("value 1", single_flight.MISS),
+        )
+
+    def test_followers_stop_waiting_when_the_lock_is_released(self):
+        """
+        A leader releasing the lock without storing a value, as for errors
+        and uncacheable values, doesn't keep followers waiting.
+        """
+        token = single_flight.acquire("key")
+        sleeps = []
+
+        def leader_fails(seconds):
+            sleeps.append(seconds)
+            single_flight.release("key", token)
+
+        with mock.patch.object(single_flight.time, "sleep", leader_fails):
+            self.assertEqual(
+                single_flight.fetch("key", self.compute, 60),
+                ("value 1", single_flight.MISS),
+            )
+        self.assertEqual(len(sleeps), 1)
+
+    def test_value_is_refreshed_early_near_expiry(self):
+        """
+        A costly value close to expiry may be recomputed ahead of time.
+        """
+        single_flight.store("key", "old value", 60, 0.5)
+        entry = cache.get("key")
+        entry["expires"] = time.time() + 0.1
+        cache.set("key", entry)
+        with mock.patch.object(single_flight.random, "random", return_value=0.9):
+            self.assertEqual(
+                single_flight.fetch("key", self.compute, 60),
+                ("value 1", single_flight.MISS),
+            )
+
+    def test_uncacheable_value_is_not_stored(self):
+        """
+        `cacheable` can keep a computed value out of the cache.
+        """
+        single_flight.fetch(
+            "key", self.compute, 60, cacheable=lambda value: False
+        )
+        self.assertIsNone(cache.get("key"))
@@ -0,0 +1,171 @@
+import gzip
+import re
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog.models import Category, Post
+from portfolio.models import Project, Technology
+
+
+class SitemapTest(TestCase):
+    """
+    Tests for `base.sitemaps` and the site's sitemap sections.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        cls.category = Category.objects.create(name="Flint")
+        cls.empty_category = Category.objects.create(name="Obsidian")
+        cls.posts = [
+            Post.objects.create(
+                title=f"Post {number}", body=f"Body {number}", author=author
+            )
+            for number in range(3)
+        ]
+        cls.posts[2].categories.add(cls.category)
+        cls.technology = Technology.objects.create(name="Python")
+        cls.project = Project.objects.create(owner=author, title="Project")
+        cls.project.technology.add(cls.technology)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def locations(self, response):
+        return re.findall(r"<loc>(.*?)</loc>", response.content.decode())
+
+    def test_index_names_one_chunk_per_section(self):
+        """
+        With few rows every section fits in one chunk.
+        """
+        response = self.client.get(reverse("sitemap-index"))
+        self.assertEqual(response["Content-Type"], "application/xml")
+        self.assertEqual(
+            self.locations(response),
+            [
+                f"http://testserver/sitemap-{section}-0.xml"
+                for section in ("posts", "categories", "projects", "technologies")
+            ],
+        )
+
+    @override_settings(SITEMAP_CHUNK_SIZE=2)
+    def test_sections_are_split_by_id_range(self):
+        """
+        Each chunk holds the rows of `SITEMAP_CHUNK_SIZE` consecutive ids.
+        """
+        ids = [post.pk for post in self.posts]
+        index = self.locations(self.client.get(reverse("sitemap-index")))
+        chunks = sorted({(pk - 1) // 2 for pk in ids})
+        for chunk in chunks:
+            self.assertIn(f"http://testserver/sitemap-posts-{chunk}.xml", index)
+        listed = []
+        for chunk in chunks:
+            response = self.client.get(
+                reverse("sitemap-section", kwargs={"section": "posts", "chunk": chunk})
+            )
+            listed += self.locations(response)
+        self.assertEqual(
+            listed,
+            [f"http://testserver{post.get_absolute_url()}" for post in self.posts],
+        )
+
+    def test_section_lists_urls_with_lastmod(self):
+        """
+        Chunks list absolute URLs with the latest indexed timestamp.
+        """
+        response = self.client.get(
+            reverse("sitemap-section", kwargs={"section": "categories", "chunk": 0})
+        )
+        body = response.content.decode()
+        self.assertIn(
+            f"<loc>http://testserver{self.category.get_absolute_url()}</loc>"
+            f"<lastmod>{self.posts[2].date_posted.replace(microsecond=0).isoformat()}"
+            "</lastmod>",
+            body,
+        )
+        # Categories without posts have no `lastmod`.
+        self.assertIn(
+            f"<loc>http://testserver{self.empty_category.get_absolute_url()}</loc>"
+            "</url>",
+            body,
+        )
+        technologies = self.client.get(
+            reverse("sitemap-section", kwargs={"section": "technologies", "chunk": 0})
+        )
+        self.assertEqual(
+            self.locations(technologies),
+            [f"http://testserver{self.technology.get_absolute_url()}"],
+        )
+
+    def test_section_is_one_query(self):
+        """
+        A chunk is read with a single query.
+        """
+        with self.assertNumQueries(1):
+            self.client.get(
+                reverse("sitemap-section", kwargs={"section": "projects", "chunk": 0})
+            )
+
+    def test_gzip_is_sent_to_clients_accepting_it(self):
+        """
+        Chunks are stored gzipped and sent as they are.
+        """
+        url = reverse("sitemap-section", kwargs={"section": "posts", "chunk": 0})
+        plain = self.client.get(url)
+        zipped = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(zipped["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(zipped.content), plain.content)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_chunks_are_cached_until_content_changes(self):
+        """
+        Cached chunks need no queries and are replaced on changes.
+        """
+        url = reverse("sitemap-section", kwargs={"section": "posts", "chunk": 0})
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        post = Post.objects.create(
+            title="New Post", body="Body", author=self.posts[0].author
+        )
+        self.assertIn(
+            f"http://testserver{post.get_absolute_url()}",
+            self.locations(self.client.get(url)),
+        )
+
+    def test_unchanged_sitemap_returns_304(self):
+        """
+        A client holding the current ETag gets a 304 without queries.
+        """
+        url = reverse("sitemap-index")
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_section_returns_404(self):
+        """
+        Only the configured sections exist.
+        """
+        response = self.client.get(
+            reverse("sitemap-section", kwargs={"section": "users", "chunk": 0})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_empty_chunks_return_404(self):
+        """
+        Chunks the index doesn't name, such as those past the last one,
+        don't exist.
+        """
+        response = self.client.get(
+            reverse("sitemap-section", kwargs={"section": "posts", "chunk": 99})
+        )
+        self.assertEqual(response.status_code, 404)
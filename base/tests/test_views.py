@@ -0,0 +1,44 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser
+
+
+class SessionFragmentTest(TestCase):
+    """
+    Tests for `session_fragment`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username="testuser1",
+            password="testpassword1",
+        )
+
+    def test_fragment_is_private(self):
+        """
+        The fragment is never cached and sets the CSRF cookie.
+        """
+        response = self.client.get(reverse("session-fragment"))
+        self.assertIn("no-store", response["Cache-Control"])
+        self.assertIn("csrftoken", response.cookies)
+        self.assertTrue(response.json()["csrf_token"])
+
+    def test_anonymous_navbar(self):
+        """
+        Anonymous visitors get the login and signup links.
+        """
+        navbar = self.client.get(reverse("session-fragment")).json()["navbar"]
+        self.assertIn(reverse("login"), navbar)
+        self.assertNotIn("Greetings", navbar)
+
+    def test_authenticated_navbar(self):
+        """
+        Logged in users are greeted and get the logout link.
+        """
+        self.client.login(username="testuser1", password="testpassword1")
+        navbar = self.client.get(reverse("session-fragment")).json()["navbar"]
+        self.assertIn("Greetings, Testuser1!", navbar)
+        self.assertIn(reverse("logout"), navbar)
+        self.assertNotIn(reverse("login"), navbar)
@@ -0,0 +1,35 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.views.decorators.cache import never_cache
+
+from base import page_cache
+
+
+@staff_member_required
+def page_cache_stats(request):
+    """
+    Hit and miss counts of every view cached by `base.page_cache`.
+    """
+    return JsonResponse(page_cache.stats())
+
+
+@never_cache
+def session_fragment(request):
+    """
+    The per-visitor parts of pages rendered with `session_fragment` in
+    their context: the navbar links for the current user and a CSRF token
+    for the page's forms. Fetched by `static/fragments.js`, so the pages
+    themselves can be cached and shared by every visitor.
+    """
+    return JsonResponse(
+        {
+            "csrf_token": get_token(request),
+            "navbar": render_to_string(
+                "includes/navbar_links.html",
+                {"viewer": request.user},
+                request=request,
+            ),
+        }
+    )
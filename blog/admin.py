@@ -1,14 +1,18 @@
 from django.contrib import admin
 
+from blog import spam
 from blog.models import (
     Post,
     Category,
-    Comment
+    Comment,
+    SpamFilter,
 )
+from search.mixins import IndexedSearchMixin
+from search.models import SearchDocument
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         "title",
         "author",
@@ -24,6 +28,14 @@ class PostAdmin(admin.ModelAdmin):
         "title",
         "body",
     )
+    search_kind = SearchDocument.POST
+    list_select_related = ("author",)
+
+    def get_queryset(self, request):
+        """
+        Prefetch `categories` for `display_categories` in the change list.
+        """
+        return super().get_queryset(request).prefetch_related("categories")
 
 
 @admin.register(Category)
@@ -36,6 +48,7 @@ class CategoryAdmin(admin.ModelAdmin):
         "name",
         "date_created",
     )
+    prepopulated_fields = {"slug": ("name",)}
 
 
 @admin.register(Comment)
@@ -44,8 +57,11 @@ class CommentAdmin(admin.ModelAdmin):
         "author",
         "post",
         "date_posted",
+        "status",
+        "spam_score",
     )
     list_filter = (
+        "status",
         "author",
         "post",
         "date_posted",
@@ -55,3 +71,34 @@ class CommentAdmin(admin.ModelAdmin):
         "post",
         "date_posted",
     )
+    actions = ("approve_comments", "reject_comments")
+
+    @admin.action(description="Approve selected comments and retrain the filter")
+    def approve_comments(self, request, queryset):
+        changed = spam.moderate(queryset, Comment.APPROVED)
+        self.message_user(request, f"Approved {changed} comment(s).")
+
+    @admin.action(
+        description="Reject selected comments as spam and retrain the filter"
+    )
+    def reject_comments(self, request, queryset):
+        changed = spam.moderate(queryset, Comment.REJECTED)
+        self.message_user(request, f"Rejected {changed} comment(s).")
+
+
+@admin.register(SpamFilter)
+class SpamFilterAdmin(admin.ModelAdmin):
+    list_display = (
+        "trained_at",
+        "trained_on",
+    )
+    readonly_fields = (
+        "bias",
+        "trained_on",
+        "trained_at",
+    )
+    exclude = ("weights",)
+
+    def has_add_permission(self, request):
+        # Filters are only created by training, see `blog.spam.retrain`.
+        return False
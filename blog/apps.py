@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+
+    def ready(self):
+        # Connect the signal handlers that maintain denormalized counters
+        # and purge cached pages.
+        from blog import signals  # noqa F401
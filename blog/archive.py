@@ -0,0 +1,73 @@
+# blog/archive.py
+"""
+Year and month archives of `blog.Post`s.
+
+Months are those of `TIME_ZONE`. Their boundaries are computed in Python
+as aware datetimes, so archive pages select posts with a plain range on
+the indexed `date_posted` rather than converting every row's timestamp in
+SQL. The per-month counts shown by the archive widget are kept in
+`PostMonth`, recounted with the same range query whenever a post is added
+or removed.
+"""
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Post, PostMonth
+
+
+def local_month(moment):
+    """
+    Return the `(year, month)` of the aware datetime `moment` in
+    `TIME_ZONE`.
+    """
+    local = timezone.localtime(moment)
+    return local.year, local.month
+
+
+def month_bounds(year, month):
+    """
+    Return the aware datetimes starting `month` of `year` and the month
+    after it. Raises `ValueError` for dates `datetime` can't represent.
+    """
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def year_bounds(year):
+    """
+    Return the aware datetimes starting `year` and the year after it.
+    Raises `ValueError` for years `datetime` can't represent.
+    """
+    return (
+        timezone.make_aware(datetime(year, 1, 1)),
+        timezone.make_aware(datetime(year + 1, 1, 1)),
+    )
+
+
+def posts_between(start, end):
+    return Post.objects.filter(date_posted__gte=start, date_posted__lt=end)
+
+
+def refresh_months(moments):
+    """
+    Recount the posts of the months containing the datetimes `moments`.
+    """
+    for year, month in {local_month(moment) for moment in moments}:
+        count = posts_between(*month_bounds(year, month)).count()
+        with transaction.atomic():
+            if count:
+                PostMonth.objects.update_or_create(
+                    year=year, month=month, defaults={"post_count": count}
+                )
+            else:
+                PostMonth.objects.filter(year=year, month=month).delete()
+
+
+def months():
+    """
+    Return the `PostMonth`s with posts, newest first, in one query.
+    """
+    return list(PostMonth.objects.all())
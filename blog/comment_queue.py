@@ -0,0 +1,303 @@
+# blog/comment_queue.py
+"""
+Durable local queue for comment submissions.
+
+With `settings.BLOG_COMMENT_QUEUE_DIR` set, `blog_detail` doesn't write
+comments to the database while handling the POST. Each submission is
+written to its own file in that directory instead (atomically, via a
+rename), and `python manage.py process_comment_queue` applies them in
+batches: one transaction, one `bulk_create` and one cache invalidation per
+batch rather than per comment. This keeps comment bursts from queuing up
+on the database's write lock, which on SQLite also blocks readers.
+
+Submitters get a signed cookie listing their queued keys so they see
+their own comments (`pending_for()`) until the worker has applied them,
+and, with `settings.BLOG_SPAM_FILTER_ENABLED`, until `blog.spam` has
+approved them.
+
+Submissions that can't be applied (unreadable files, or data the database
+rejects) are moved to a `failed` subdirectory and logged rather than
+retried on every batch; see `fail()`.
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core import signing
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from base.page_cache import invalidate
+from blog.models import Comment, Post
+
+logger = logging.getLogger(__name__)
+
+COOKIE_NAME = "pending_comments"
+COOKIE_SALT = "blog.comment_queue"
+# Queued keys remembered per visitor.
+COOKIE_KEYS = 10
+# Subdirectory of the queue that submissions which can't be applied are
+# moved to.
+FAILED_DIR = "failed"
+REQUIRED_FIELDS = ("key", "post_id", "author", "body")
+# Errors caused by a submission's data rather than by the database being
+# unavailable.
+SUBMISSION_ERRORS = (DataError, IntegrityError, KeyError, TypeError, ValueError)
+
+
+def is_enabled():
+    return bool(settings.BLOG_COMMENT_QUEUE_DIR)
+
+
+def queue_dir():
+    path = settings.BLOG_COMMENT_QUEUE_DIR
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def enqueue(post_id, author, body, parent_id=None):
+    """
+    Durably queue a validated comment and return its key.
+    """
+    key = uuid.uuid4().hex
+    submission = {
+        "key": key,
+        "post_id": post_id,
+        "parent_id": parent_id,
+        "author": author,
+        "body": body,
+        "submitted_at": timezone.now().isoformat(),
+    }
+    directory = queue_dir()
+    # Zero-padded timestamps keep file names in submission order.
+    name = f"{time.time_ns():020d}-{key}.json"
+    with tempfile.NamedTemporaryFile(
+        "w", dir=directory, suffix=".tmp", delete=False
+    ) as file:
+        json.dump(submission, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(file.name, os.path.join(directory, name))
+    return key
+
+
+def queued_files(limit=None):
+    """
+    Return the paths of queued submissions, oldest first.
+    """
+    directory = queue_dir()
+    names = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    return [os.path.join(directory, name) for name in names[:limit]]
+
+
+def read(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def read_submission(path):
+    """
+    Return the submission queued at `path`, raising `ValueError` if it
+    isn't one.
+    """
+    submission = read(path)
+    if not isinstance(submission, dict) or not all(
+        field in submission for field in REQUIRED_FIELDS
+    ):
+        raise ValueError("Not a comment submission.")
+    return submission
+
+
+def process_batch(batch_size):
+    """
+    Apply up to `batch_size` queued comments and return how many
+    submissions were taken off the queue. Files are only removed after the
+    transaction commits, and submissions whose `ingest_key` already exists
+    are skipped, so a crash at any point neither loses nor duplicates
+    comments.
+
+    If the batch fails because of a submission's data, the submissions are
+    applied one at a time and the failing ones moved aside with `fail()`,
+    so one bad file doesn't hold up the queue.
+    """
+    paths = queued_files(batch_size)
+    if not paths:
+        return 0
+    batch = {}
+    for path in paths:
+        try:
+            batch[path] = read_submission(path)
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as error:
+            fail(path, error)
+    try:
+        apply(batch)
+    except SUBMISSION_ERRORS:
+        for path, submission in batch.items():
+            try:
+                apply({path: submission})
+            except SUBMISSION_ERRORS as error:
+                fail(path, error)
+    return len(paths)
+
+
+def apply(batch):
+    """
+    Save the submissions of `batch`, a dict of queue file paths and their
+    submissions, in one transaction, and remove the files once it commits.
+    """
+    if not batch:
+        return
+    paths, submissions = list(batch), list(batch.values())
+    keys = [submission["key"] for submission in submissions]
+
+    with transaction.atomic():
+        applied = set(
+            Comment.objects.filter(ingest_key__in=keys).values_list(
+                "ingest_key", flat=True
+            )
+        )
+        post_ids = set(
+            Post.objects.filter(
+                pk__in={submission["post_id"] for submission in submissions}
+            ).values_list("pk", flat=True)
+        )
+        parent_paths = dict(
+            Comment.objects.filter(
+                pk__in={submission.get("parent_id") for submission in submissions}
+            ).values_list("pk", "path")
+        )
+        # Comments on posts or replies to comments deleted since
+        # submission are dropped.
+        comments = Comment.objects.bulk_create(
+            Comment(
+                post_id=submission["post_id"],
+                parent_id=submission.get("parent_id"),
+                author=submission["author"],
+                body=submission["body"],
+                ingest_key=submission["key"],
+                status=initial_status(),
+            )
+            for submission in submissions
+            if submission["key"] not in applied
+            and submission["post_id"] in post_ids
+            and submission.get("parent_id") in {None, *parent_paths}
+        )
+        for comment in comments:
+            comment.path = Comment.child_path(
+                parent_paths.get(comment.parent_id, ""), comment.pk
+            )
+        Comment.objects.bulk_update(comments, ["path"])
+        added = defaultdict(list)
+        for comment in comments:
+            if comment.status == Comment.APPROVED:
+                added[comment.post_id].append(comment.date_posted)
+        for post_id, dates in added.items():
+            Post.objects.filter(pk=post_id).update(
+                comment_count=F("comment_count") + len(dates),
+                last_comment_at=Greatest(
+                    Coalesce("last_comment_at", Value(max(dates))),
+                    Value(max(dates)),
+                ),
+            )
+        invalidate(*(f"post:{post_id}" for post_id in added))
+        transaction.on_commit(lambda: remove(paths))
+
+
+def fail(path, error):
+    """
+    Move the queued submission at `path`, which can't be applied, to the
+    `failed` subdirectory for inspection, and log it.
+    """
+    directory = os.path.join(queue_dir(), FAILED_DIR)
+    os.makedirs(directory, exist_ok=True)
+    destination = os.path.join(directory, os.path.basename(path))
+    os.replace(path, destination)
+    logger.error(
+        "Comment submission %s can't be applied and was moved to %s: %r",
+        os.path.basename(path),
+        destination,
+        error,
+    )
+
+
+def initial_status():
+    """
+    Status of a visitor's new comment: held for `blog.spam` to score when
+    spam filtering is enabled.
+    """
+    if settings.BLOG_SPAM_FILTER_ENABLED:
+        return Comment.PENDING
+    return Comment.APPROVED
+
+
+def remove(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def remember(request, response, key):
+    """
+    Add `key` to the visitor's signed `pending_comments` cookie.
+    """
+    keys = [*pending_keys(request), key][-COOKIE_KEYS:]
+    response.set_signed_cookie(
+        COOKIE_NAME,
+        json.dumps(keys),
+        salt=COOKIE_SALT,
+        max_age=60 * 60,
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def pending_keys(request):
+    try:
+        value = request.get_signed_cookie(COOKIE_NAME, salt=COOKIE_SALT)
+        return json.loads(value)
+    except (KeyError, signing.BadSignature, ValueError):
+        return []
+
+
+def shows_pending():
+    """
+    Whether visitors' comments can be unpublished for a while after they
+    were submitted.
+    """
+    return is_enabled() or settings.BLOG_SPAM_FILTER_ENABLED
+
+
+def pending_for(request, post_id):
+    """
+    Return the visitor's comments on `post_id` that are still queued or
+    awaiting spam scoring, oldest first.
+    """
+    keys = set(pending_keys(request))
+    if not keys:
+        return []
+    pending = [
+        {"author": author, "body": body}
+        for author, body in Comment.objects.filter(
+            post_id=post_id, ingest_key__in=keys, status=Comment.PENDING
+        )
+        .order_by("pk")
+        .values_list("author", "body")
+    ]
+    if is_enabled():
+        for path in queued_files():
+            if path.rsplit("-", 1)[-1].removesuffix(".json") in keys:
+                submission = read(path)
+                if submission["post_id"] == post_id:
+                    pending.append(submission)
+    return pending
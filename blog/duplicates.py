@@ -0,0 +1,136 @@
+# blog/duplicates.py
+"""
+Near-duplicate detection for comment bodies.
+
+Each body is reduced to a 64-bit SimHash: every 3-word shingle is hashed,
+and bit `i` of the fingerprint is set if most shingle hashes have bit `i`
+set. Similar texts share most shingles, so their fingerprints differ in
+only a few bits.
+
+Recent fingerprints are kept per post in the
+`settings.BLOG_COMMENT_THROTTLE_CACHE` cache, split into 16-bit bands: two
+fingerprints within `BAND_COUNT - 1` bits of each other agree exactly on
+at least one band, so a lookup only compares against the fingerprints
+filed under the new one's four band values.
+
+Texts with fewer than `MIN_SHINGLES` shingles ("Thanks!", "Great post")
+are too short for their fingerprints to tell a repeat from a coincidence
+and are never rejected.
+"""
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from base.counters import increment
+
+KEY_PREFIX = "simhash"
+BITS = 64
+BAND_COUNT = 4
+BAND_BITS = BITS // BAND_COUNT
+SHINGLE_SIZE = 3
+# Texts need at least five words to be checked.
+MIN_SHINGLES = 3
+# Fingerprints remembered per band value.
+BAND_CAPACITY = 50
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+DROPPED_KEY = f"{KEY_PREFIX}:dropped"
+
+
+def throttle_cache():
+    return caches[settings.BLOG_COMMENT_THROTTLE_CACHE]
+
+
+def shingles(text):
+    words = WORD.findall(text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return [" ".join(words)]
+    return [
+        " ".join(words[start:start + SHINGLE_SIZE])
+        for start in range(len(words) - SHINGLE_SIZE + 1)
+    ]
+
+
+def simhash(text):
+    """
+    Return the 64-bit SimHash fingerprint of `text`.
+    """
+    features = shingles(text)
+    # Count set bits column by column over the binary strings; `str.count`
+    # does the per-bit work in C.
+    rows = [
+        format(
+            int.from_bytes(
+                hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big"
+            ),
+            "064b",
+        )
+        for feature in features
+    ]
+    half = len(rows) / 2
+    bits = "".join(
+        "1" if column.count("1") > half else "0" for column in zip(*rows)
+    )
+    return int(bits, 2)
+
+
+def bands(fingerprint):
+    mask = (1 << BAND_BITS) - 1
+    return [
+        (fingerprint >> (band * BAND_BITS)) & mask for band in range(BAND_COUNT)
+    ]
+
+
+def band_key(scope, band, value):
+    return f"{KEY_PREFIX}:{scope}:{band}:{value:04x}"
+
+
+def is_duplicate(text, scope, now=None):
+    """
+    Return `True` if a comment within `BLOG_COMMENT_DUPLICATE_DISTANCE`
+    bits of `text` was remembered under `scope` (a post) in the last
+    `BLOG_COMMENT_DUPLICATE_WINDOW` seconds. Otherwise remember `text`.
+    """
+    if len(shingles(text)) < MIN_SHINGLES:
+        return False
+    now = time.time() if now is None else now
+    cache = throttle_cache()
+    window = settings.BLOG_COMMENT_DUPLICATE_WINDOW
+    fingerprint = simhash(text)
+    keys = [
+        band_key(scope, band, value)
+        for band, value in enumerate(bands(fingerprint))
+    ]
+    found = cache.get_many(keys)
+    for entries in found.values():
+        for other, seen in entries:
+            if (
+                now - seen < window
+                and (fingerprint ^ other).bit_count()
+                <= settings.BLOG_COMMENT_DUPLICATE_DISTANCE
+            ):
+                increment(DROPPED_KEY, settings.BLOG_COMMENT_THROTTLE_CACHE)
+                return True
+    cache.set_many(
+        {
+            key: [
+                (other, seen)
+                for other, seen in found.get(key, [])
+                if now - seen < window
+            ][-(BAND_CAPACITY - 1):] + [(fingerprint, now)]
+            for key in keys
+        },
+        window,
+    )
+    return False
+
+
+def dropped():
+    """
+    Number of comments rejected as duplicates.
+    """
+    return throttle_cache().get(DROPPED_KEY, 0)
@@ -19,3 +19,8 @@ class CommentForm(forms.Form):
             }
         )
     )
+    # The `blog.Comment` being replied to, if any; see `comment_thread`.
+    parent = forms.IntegerField(
+        required=False,
+        widget=forms.HiddenInput,
+    )
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from base.page_cache import invalidate, object_tags
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate `excerpt`, `word_count` and `reading_time` for existing "
+        "`blog.Post`s in batches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of posts loaded and updated per batch.",
+        )
+        parser.add_argument(
+            "--missing-only",
+            action="store_true",
+            help="Only process posts that don't have an excerpt yet.",
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs.get("batch_size", 500)
+        posts = Post.objects.only("id", "body").order_by("pk")
+        if kwargs.get("missing_only", False):
+            posts = posts.filter(excerpt="").exclude(body="")
+        updated = 0
+        last_pk = 0
+        while True:
+            # Walk the primary key instead of using `OFFSET`, so every
+            # batch is an index range scan and memory stays bounded.
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            for post in batch:
+                post.update_summary()
+            Post.objects.bulk_update(
+                batch, ["excerpt", "word_count", "reading_time"]
+            )
+            # `bulk_update()` skips the signal handlers purging cached pages.
+            invalidate("post-feed", *object_tags("post", batch))
+            updated += len(batch)
+            last_pk = batch[-1].pk
+        self.stdout.write(f"Updated {updated} post(s).")
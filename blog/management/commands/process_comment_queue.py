@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import comment_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply comments queued in `BLOG_COMMENT_QUEUE_DIR` to the database "
+        "in batches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Maximum number of comments applied per transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before polling an empty queue again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of running as a worker.",
+        )
+
+    def handle(self, *args, **kwargs):
+        if not comment_queue.is_enabled():
+            raise CommandError("BLOG_COMMENT_QUEUE_DIR is not set.")
+        batch_size = kwargs.get("batch_size", 100)
+        interval = kwargs.get("interval", 1.0)
+        once = kwargs.get("once", False)
+        total = 0
+        while True:
+            processed = comment_queue.process_batch(batch_size)
+            total += processed
+            if processed:
+                self.stdout.write(f"Processed {processed} comment(s).")
+                continue
+            if once:
+                break
+            # Batches grow with the burst: while we sleep, submissions
+            # accumulate and are applied together on the next pass.
+            time.sleep(interval)
+        self.stdout.write(f"Processed {total} comment(s) in total.")
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import related
+
+
+class Command(BaseCommand):
+    help = "Recompute the related posts of every `blog.Post`"
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        count = related.rebuild()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Computed related posts for {count} post(s) in {elapsed:.3f}s."
+        )
@@ -0,0 +1,75 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import spam
+
+
+class Command(BaseCommand):
+    help = "Score pending comments for spam in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Maximum number of comments scored per transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait before looking for pending comments again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Score every pending comment and exit instead of running "
+            "as a worker.",
+        )
+        parser.add_argument(
+            "--benchmark",
+            type=int,
+            metavar="COUNT",
+            help="Time scoring COUNT synthetic comments with a synthetic "
+            "model, without touching the database, and exit.",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs.get("benchmark"):
+            self.benchmark(kwargs["benchmark"])
+            return
+        batch_size = kwargs.get("batch_size", 500)
+        interval = kwargs.get("interval", 5.0)
+        once = kwargs.get("once", False)
+        total = 0
+        while True:
+            scored = spam.score_pending(batch_size)
+            total += scored
+            if scored:
+                self.stdout.write(f"Scored {scored} comment(s).")
+                continue
+            if once:
+                break
+            time.sleep(interval)
+        self.stdout.write(f"Scored {total} comment(s) in total.")
+
+    def benchmark(self, count):
+        words = [f"word{number}" for number in range(5000)]
+        rng = random.Random(0)
+
+        def text():
+            return " ".join(rng.choices(words, k=40))
+
+        model = spam.Classifier.train(
+            [text() for _ in range(200)], [text() for _ in range(200)]
+        )
+        texts = [text() for _ in range(count)]
+        start = time.perf_counter()
+        model.scores(texts)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"Scored {count} comment(s) in {elapsed:.3f}s "
+            f"({count / elapsed:,.0f} comments/s)."
+        )
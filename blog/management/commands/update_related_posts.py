@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import related
+
+
+class Command(BaseCommand):
+    help = "Recompute the related posts of posts marked stale by changes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Maximum number of stale marks handled per index build.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait before looking for stale posts again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Update every stale post and exit instead of running as a "
+            "worker.",
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs.get("batch_size", 500)
+        interval = kwargs.get("interval", 5.0)
+        once = kwargs.get("once", False)
+        total = 0
+        while True:
+            updated = related.update_stale(batch_size)
+            total += updated
+            if updated:
+                self.stdout.write(f"Updated {updated} stale post(s).")
+                continue
+            if once:
+                break
+            time.sleep(interval)
+        self.stdout.write(f"Updated {total} stale post(s) in total.")
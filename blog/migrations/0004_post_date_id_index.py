@@ -0,0 +1,17 @@
+# Generated by Django 4.1.9 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_alter_category_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-date_posted', '-id'], name='blog_post_date_id_idx'),
+        ),
+    ]
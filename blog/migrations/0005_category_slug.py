@@ -0,0 +1,40 @@
+# Generated by Django 4.1.9 on 2026-10-18 13:05
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def populate_slugs(apps, schema_editor):
+    Category = apps.get_model("blog", "Category")
+    taken = set()
+    for category in Category.objects.order_by("pk"):
+        base = slugify(category.name)[:26] or "category"
+        slug = base
+        suffix = 2
+        while slug in taken:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        taken.add(slug)
+        category.slug = slug
+        category.save(update_fields=["slug"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_date_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(max_length=30, null=True, verbose_name='Category Slug'),
+        ),
+        migrations.RunPython(populate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(help_text='URL-safe identifier used in category page URLs.', max_length=30, unique=True, verbose_name='Category Slug'),
+        ),
+    ]
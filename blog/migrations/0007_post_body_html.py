@@ -0,0 +1,23 @@
+# Generated by Django 4.1.9 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_summary_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='body_html',
+            field=models.TextField(blank=True, editable=False, help_text='HTML rendered from the body when the Post is saved.', verbose_name='Rendered body of the Post'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='body_html_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Hash of the source of the rendered body'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.1.9 on 2026-10-18 12:26
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_comment_stats(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    stats = Post.objects.annotate(
+        counted=Count("comments"),
+        latest=Max("comments__date_posted"),
+    ).filter(counted__gt=0)
+    for post in stats.only("id").iterator():
+        Post.objects.filter(pk=post.pk).update(
+            comment_count=post.counted,
+            last_comment_at=post.latest,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_body_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of Comments on the Post'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Date of the latest Comment on the Post'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'date_posted', 'id'], name='blog_comment_post_date_idx'),
+        ),
+        migrations.RunPython(backfill_comment_stats, migrations.RunPython.noop),
+    ]
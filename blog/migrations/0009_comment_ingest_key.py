@@ -0,0 +1,18 @@
+# Generated by Django 4.1.9 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_comment_pagination_and_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='ingest_key',
+            field=models.CharField(blank=True, editable=False, help_text='Key of the queued submission this comment was created from.', max_length=32, null=True, unique=True, verbose_name='Ingest Key'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.1.9 on 2026-10-18 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_comment_ingest_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpamFilter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weights', models.BinaryField(help_text='One float32 log-likelihood ratio per feature bucket.', verbose_name='Weights')),
+                ('bias', models.FloatField(verbose_name='Bias')),
+                ('trained_on', models.PositiveIntegerField(help_text='Number of moderated comments the model was trained on.', verbose_name='Trained On')),
+                ('trained_at', models.DateTimeField(auto_now_add=True, verbose_name='Trained At')),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='blog_comment_post_date_idx',
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='spam_score',
+            field=models.FloatField(blank=True, editable=False, help_text='Probability that the comment is spam, see `blog.spam`.', null=True, verbose_name='Spam Score'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='approved', help_text="Only approved comments are shown. With spam filtering enabled, visitors' comments are pending until scored.", max_length=10, verbose_name='Status'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'status', 'date_posted', 'id'], name='blog_comment_post_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['status', 'id'], name='blog_comment_status_idx'),
+        ),
+    ]
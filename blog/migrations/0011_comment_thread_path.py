@@ -0,0 +1,43 @@
+# Generated by Django 4.1.9 on 2026-10-18 12:51
+
+from django.db import migrations, models
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, LPad
+import django.db.models.deletion
+
+
+def backfill_comment_paths(apps, schema_editor):
+    # Every existing comment is top-level; see `Comment.child_path`.
+    Comment = apps.get_model("blog", "Comment")
+    Comment.objects.update(
+        path=LPad(Cast("id", CharField()), 10, Value("0"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_comment_status_spam_score'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='blog_comment_post_status_idx',
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='blog.comment', verbose_name='Reply To'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, editable=False, help_text="The ids of the comment's ancestors and its own, so a thread sorts depth first by `path`.", max_length=255, verbose_name='Thread Path'),
+        ),
+        migrations.RunPython(backfill_comment_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'status', 'path'], name='blog_comment_post_path_idx'),
+        ),
+    ]
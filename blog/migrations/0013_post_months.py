@@ -0,0 +1,47 @@
+# Generated by Django 4.1.9 on 2026-10-18 13:06
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_post_months(apps, schema_editor):
+    # Months of `TIME_ZONE`; see `blog.archive`.
+    Post = apps.get_model("blog", "Post")
+    PostMonth = apps.get_model("blog", "PostMonth")
+    counts = Counter()
+    for date_posted in Post.objects.values_list("date_posted", flat=True).iterator():
+        local = timezone.localtime(date_posted)
+        counts[local.year, local.month] += 1
+    PostMonth.objects.bulk_create(
+        PostMonth(year=year, month=month, post_count=count)
+        for (year, month), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_related_posts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Year')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Month')),
+                ('post_count', models.PositiveIntegerField(verbose_name='Number of Posts')),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postmonth',
+            constraint=models.UniqueConstraint(fields=('year', 'month'), name='blog_postmonth_year_month_uniq'),
+        ),
+        migrations.RunPython(backfill_post_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.1.9 on 2026-10-18 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_months'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleRelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.PositiveIntegerField(verbose_name='Post ID')),
+            ],
+        ),
+    ]
@@ -1,9 +1,20 @@
 # blog/models.py
-from django.db import models
+from datetime import date
+
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.urls import reverse
+from django.utils.text import slugify
 
+from base.rendering import refresh_html
 from config.settings import AUTH_USER_MODEL
 
+# Length of the precomputed `Post.excerpt` shown on list pages.
+EXCERPT_LENGTH = 400
+# Reading speed used for `Post.reading_time`.
+WORDS_PER_MINUTE = 200
+
 
 class Category(models.Model):
     """
@@ -14,6 +25,12 @@ class Category(models.Model):
         verbose_name="Category Name",
         max_length=20,
     )
+    slug = models.SlugField(
+        verbose_name="Category Slug",
+        help_text="URL-safe identifier used in category page URLs.",
+        max_length=30,
+        unique=True,
+    )
     date_created = models.DateTimeField(
         verbose_name="Date the Category was created",
         auto_now_add=True,
@@ -25,6 +42,43 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Generate a unique `slug` from `name` the first time the `Category`
+        is saved.
+        """
+        if not self.slug:
+            self.slug = self.unique_slug(self.name)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def unique_slug(cls, name):
+        """
+        Return `slugify(name)`, suffixed with `-2`, `-3`, ... if it is
+        already taken.
+        """
+        base = slugify(name)[:26] or "category"
+        slug = base
+        suffix = 2
+        while cls.objects.filter(slug=slug).exists():
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        return slug
+
+    @staticmethod
+    def legacy_cache_key(name):
+        """
+        Return the cache key of the lookup of an old name-based category
+        URL asking for `name`; see `blog.views.legacy_category_slug`.
+        """
+        return f"blog:legacy-category:{slugify(name)}"
+
+    def get_absolute_url(self):
+        """
+        Returns the url to access the `blog.Post`s of this `blog.Category`.
+        """
+        return reverse("blog:blog-category", kwargs={"slug": self.slug})
+
 
 class Post(models.Model):
     """
@@ -38,10 +92,50 @@ class Post(models.Model):
     body = models.TextField(
         verbose_name="Body of the Post",
     )
+    body_html = models.TextField(
+        verbose_name="Rendered body of the Post",
+        help_text="HTML rendered from the body when the Post is saved.",
+        blank=True,
+        editable=False,
+    )
+    body_html_hash = models.CharField(
+        verbose_name="Hash of the source of the rendered body",
+        max_length=64,
+        blank=True,
+        editable=False,
+    )
+    excerpt = models.CharField(
+        verbose_name="Excerpt of the Post",
+        help_text="Generated from the body when the Post is saved.",
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+    )
+    word_count = models.PositiveIntegerField(
+        verbose_name="Word count of the Post",
+        default=0,
+        editable=False,
+    )
+    reading_time = models.PositiveIntegerField(
+        verbose_name="Reading time of the Post in minutes",
+        default=0,
+        editable=False,
+    )
     date_posted = models.DateTimeField(
         verbose_name="Date the Post was posted",
         auto_now_add=True,
     )
+    comment_count = models.PositiveIntegerField(
+        verbose_name="Number of Comments on the Post",
+        default=0,
+        editable=False,
+    )
+    last_comment_at = models.DateTimeField(
+        verbose_name="Date of the latest Comment on the Post",
+        blank=True,
+        null=True,
+        editable=False,
+    )
     author = models.ForeignKey(
         AUTH_USER_MODEL,
         verbose_name="Author of the Post",
@@ -53,13 +147,57 @@ class Post(models.Model):
         blank=True,
     )
 
+    class Meta:
+        indexes = [
+            # Supports the keyset pagination in `blog.pagination`, which
+            # orders and seeks on `(date_posted, id)`.
+            models.Index(
+                fields=["-date_posted", "-id"],
+                name="blog_post_date_id_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+        Regenerate the `excerpt`, `word_count` and `reading_time` from
+        `body` so list pages never have to load the full body, and
+        re-render `body_html` if `body` changed.
+        """
+        self.update_summary()
+        refresh_html(self, "body")
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "body" in update_fields:
+            kwargs["update_fields"] = {
+                *update_fields,
+                "excerpt",
+                "word_count",
+                "reading_time",
+                "body_html",
+                "body_html_hash",
+            }
+        super().save(*args, **kwargs)
+
+    def update_summary(self):
+        """
+        Set `excerpt`, `word_count` and `reading_time` from `body`.
+        """
+        self.excerpt = self.body[:EXCERPT_LENGTH]
+        self.word_count = len(self.body.split())
+        if self.word_count:
+            self.reading_time = max(1, round(self.word_count / WORDS_PER_MINUTE))
+        else:
+            self.reading_time = 0
+
     def display_categories(self):
         """
         Returns a comma-separated list of first 4 `blog.Category` names.
         """
+        # With `prefetch_related("categories")` the manager's `all()` returns
+        # the prefetched queryset, so the slice is taken from its cache
+        # instead of issuing a new `LIMIT 4` query per post.
         return ", ".join([category.name for category in self.categories.all()[:4]])
 
     display_categories.short_description = "Categories"
@@ -76,11 +214,41 @@ class Comment(models.Model):
     Model for `blog.Post` `blog.Comment`.
     """
 
+    PENDING = "pending"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (APPROVED, "Approved"),
+        (REJECTED, "Rejected"),
+    ]
+
+    # Width of one `path` segment: a zero-padded `id`.
+    PATH_SEGMENT = 10
+
     post = models.ForeignKey(
         Post,
         related_name="comments",
         on_delete=models.CASCADE,
     )
+    parent = models.ForeignKey(
+        "self",
+        verbose_name="Reply To",
+        related_name="replies",
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+    path = models.CharField(
+        verbose_name="Thread Path",
+        help_text=(
+            "The ids of the comment's ancestors and its own, so a thread "
+            "sorts depth first by `path`."
+        ),
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
     author = models.CharField(
         # TODO: Add `AUTH_USER_MODEL` relationship so only authenticated
         # users can comment.
@@ -93,6 +261,241 @@ class Comment(models.Model):
         verbose_name="Date the Comment was posted",
         auto_now_add=True,
     )
+    status = models.CharField(
+        verbose_name="Status",
+        help_text=(
+            "Only approved comments are shown. With spam filtering enabled, "
+            "visitors' comments are pending until scored."
+        ),
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=APPROVED,
+    )
+    spam_score = models.FloatField(
+        verbose_name="Spam Score",
+        help_text="Probability that the comment is spam, see `blog.spam`.",
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    ingest_key = models.CharField(
+        verbose_name="Ingest Key",
+        help_text="Key of the queued submission this comment was created from.",
+        max_length=32,
+        unique=True,
+        blank=True,
+        null=True,
+        editable=False,
+    )
+
+    class Meta:
+        indexes = [
+            # Supports fetching a post's approved comments, or one thread,
+            # page by page in `path` order, see `blog.pagination`.
+            models.Index(
+                fields=["post", "status", "path"],
+                name="blog_comment_post_path_idx",
+            ),
+            # Supports the spam scoring worker's scan of pending comments.
+            models.Index(
+                fields=["status", "id"],
+                name="blog_comment_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.body[:20]
+
+    @classmethod
+    def child_path(cls, parent_path, pk):
+        """
+        Return the `path` of the comment `pk` replying to the comment with
+        `parent_path` (`""` for a top-level comment).
+        """
+        return f"{parent_path}{pk:0{cls.PATH_SEGMENT}d}"
+
+    @property
+    def depth(self):
+        """
+        Number of ancestors; 0 for a top-level comment.
+        """
+        return max(len(self.path) // self.PATH_SEGMENT - 1, 0)
+
+    def thread(self):
+        """
+        This comment and all its replies, in `path` order. The subtree is
+        one index range: every descendant's `path` starts with this one's,
+        and `:` sorts right after the digits.
+        """
+        return Comment.objects.filter(
+            post_id=self.post_id, path__gte=self.path, path__lt=f"{self.path}:"
+        )
+
+    def save(self, *args, **kwargs):
+        """
+        Save the `Comment` and keep the denormalized `comment_count` /
+        `last_comment_at` of its `Post`, which only count approved comments,
+        in step in the same transaction. A new comment's `path` needs its
+        `id`, so it is filled in right after the insert.
+        """
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding and not self.path:
+                self.path = self.child_path(
+                    self.parent.path if self.parent_id else "", self.pk
+                )
+                Comment.objects.filter(pk=self.pk).update(path=self.path)
+            if not adding:
+                # The status may have changed.
+                refresh_comment_stats([self.post_id])
+            elif self.status == self.APPROVED:
+                Post.objects.filter(pk=self.post_id).update(
+                    comment_count=F("comment_count") + 1,
+                    last_comment_at=Greatest(
+                        Coalesce("last_comment_at", Value(self.date_posted)),
+                        Value(self.date_posted),
+                    ),
+                )
+
+
+def refresh_comment_stats(post_ids):
+    """
+    Recompute `comment_count` / `last_comment_at` of the `Post`s with
+    `post_ids` from their approved comments, for changes made in bulk.
+    """
+    approved = Comment.objects.filter(
+        post=OuterRef("pk"), status=Comment.APPROVED
+    ).order_by()
+    Post.objects.filter(pk__in=post_ids).update(
+        comment_count=Coalesce(
+            Subquery(
+                approved.values("post").annotate(count=Count("pk")).values("count")
+            ),
+            0,
+        ),
+        last_comment_at=Subquery(
+            approved.order_by("-date_posted").values("date_posted")[:1]
+        ),
+    )
+
+
+class SpamFilter(models.Model):
+    """
+    The trained spam model used by `blog.spam`. Only the latest row is
+    used; retraining replaces it.
+    """
+
+    weights = models.BinaryField(
+        verbose_name="Weights",
+        help_text="One float32 log-likelihood ratio per feature bucket.",
+    )
+    bias = models.FloatField(
+        verbose_name="Bias",
+    )
+    trained_on = models.PositiveIntegerField(
+        verbose_name="Trained On",
+        help_text="Number of moderated comments the model was trained on.",
+    )
+    trained_at = models.DateTimeField(
+        verbose_name="Trained At",
+        auto_now_add=True,
+    )
+
+    def __str__(self):
+        return f"Spam filter trained on {self.trained_on} comments"
+
+
+class RelatedPost(models.Model):
+    """
+    One of the `BLOG_RELATED_POSTS` posts most similar to `post`, best
+    first by `rank`. Maintained by `blog.related`; `blog_detail` reads a
+    post's neighbours from here with one indexed query.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name="Post",
+        on_delete=models.CASCADE,
+        related_name="related_posts",
+        # The unique constraint's index leads with `post`.
+        db_index=False,
+    )
+    related = models.ForeignKey(
+        Post,
+        verbose_name="Related Post",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    rank = models.PositiveSmallIntegerField(
+        verbose_name="Rank",
+    )
+    score = models.FloatField(
+        verbose_name="Score",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "rank"],
+                name="blog_relatedpost_post_rank_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} ({self.score:.3f})"
+
+
+class StaleRelatedPost(models.Model):
+    """
+    A post whose `RelatedPost` rows, or whose neighbours' rows, may be out
+    of date. Added by `blog.signals` and cleared by `blog.related` once the
+    lists are recomputed; a post may be marked several times.
+    """
+
+    # Not a foreign key: marks outlive the posts they name, which
+    # `blog.related` skips.
+    post_id = models.PositiveIntegerField(
+        verbose_name="Post ID",
+    )
+
+    def __str__(self):
+        return str(self.post_id)
+
+
+class PostMonth(models.Model):
+    """
+    Number of `Post`s published in a month of `TIME_ZONE`, for the archive
+    widget. Maintained by `blog.archive` as posts are added and removed.
+    """
+
+    year = models.PositiveSmallIntegerField(
+        verbose_name="Year",
+    )
+    month = models.PositiveSmallIntegerField(
+        verbose_name="Month",
+    )
+    post_count = models.PositiveIntegerField(
+        verbose_name="Number of Posts",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["year", "month"],
+                name="blog_postmonth_year_month_uniq",
+            ),
+        ]
+        ordering = ["-year", "-month"]
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d}: {self.post_count}"
+
+    @property
+    def first_day(self):
+        return date(self.year, self.month, 1)
+
+    def get_absolute_url(self):
+        return reverse(
+            "blog:archive-month", kwargs={"year": self.year, "month": self.month}
+        )
@@ -0,0 +1,162 @@
+# blog/pagination.py
+import base64
+import binascii
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    """
+    Encode a tuple of ordering key values into an opaque, URL-safe token.
+    """
+    raw = "|".join(
+        value.isoformat() if isinstance(value, datetime) else str(value)
+        for value in values
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, count):
+    """
+    Decode a token created by `encode_cursor()`. Returns a list of `count`
+    strings, or `None` if the token is malformed.
+    """
+    if not token:
+        return None
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    values = raw.split("|")
+    if len(values) != count:
+        return None
+    return values
+
+
+class KeysetPage:
+    """
+    A single page of results from `KeysetPaginator`.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor (keyset) paginator.
+
+    Instead of `OFFSET`, each page is selected with a `WHERE` clause on the
+    ordering `keys` of the last (or first) row of the neighbouring page, so
+    every page costs one index range scan no matter how deep it is. The
+    last key must be unique (normally `id`) so the ordering is total.
+    """
+
+    def __init__(self, queryset, per_page, keys=("date_posted", "id"),
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = keys
+        self.descending = descending
+
+    def _ordering(self, reverse=False):
+        prefix = "-" if self.descending != reverse else ""
+        return [f"{prefix}{key}" for key in self.keys]
+
+    def _parse(self, values):
+        """
+        Convert decoded cursor strings back into field values.
+        """
+        model = self.queryset.model
+        parsed = []
+        for key, value in zip(self.keys, values):
+            field = model._meta.get_field(key)
+            parsed.append(field.to_python(value))
+        return parsed
+
+    def _seek(self, values, forward):
+        """
+        Build the row-value comparison `(k1, k2, ...) < (v1, v2, ...)` as a
+        chain of `Q` objects, which every database backend can run off a
+        composite index on `keys`.
+        """
+        lookup = "lt" if self.descending == forward else "gt"
+        condition = Q()
+        for position in range(len(self.keys) - 1, -1, -1):
+            equal = {key: value for key, value in
+                     zip(self.keys[:position], values[:position])}
+            step = Q(**equal) & Q(
+                **{f"{self.keys[position]}__{lookup}": values[position]}
+            )
+            condition = step | condition if condition else step
+        return condition
+
+    def _cursor_for(self, obj):
+        return encode_cursor([getattr(obj, key) for key in self.keys])
+
+    def get_page(self, after=None, before=None):
+        """
+        Return the page following the `after` cursor, preceding the
+        `before` cursor, or the first page if neither is given. Malformed
+        cursors fall back to the first page.
+        """
+        after_values = decode_cursor(after, len(self.keys))
+        before_values = decode_cursor(before, len(self.keys))
+        try:
+            if after_values:
+                after_values = self._parse(after_values)
+            elif before_values:
+                before_values = self._parse(before_values)
+        except ValidationError:
+            after_values = before_values = None
+
+        if before_values and not after_values:
+            rows = list(
+                self.queryset.filter(self._seek(before_values, forward=False))
+                .order_by(*self._ordering(reverse=True))[: self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            rows.reverse()
+            has_next = True
+        else:
+            queryset = self.queryset
+            if after_values:
+                queryset = queryset.filter(self._seek(after_values, forward=True))
+            rows = list(
+                queryset.order_by(*self._ordering())[: self.per_page + 1]
+            )
+            has_next = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            has_previous = bool(after_values)
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_next:
+                next_cursor = self._cursor_for(rows[-1])
+            if has_previous:
+                previous_cursor = self._cursor_for(rows[0])
+        return KeysetPage(rows, next_cursor, previous_cursor)
@@ -0,0 +1,130 @@
+# blog/related.py
+"""
+Precomputed "related posts" for `blog_detail`.
+
+Posts are compared with `base.similarity.SimilarityIndex`: TF-IDF cosine
+similarity of their title (counted twice) and body, mixed with the
+Jaccard similarity of their categories by `BLOG_RELATED_CATEGORY_WEIGHT`.
+Each post's `BLOG_RELATED_POSTS` best neighbours are stored as
+`RelatedPost` rows, so the page reads them with one indexed query;
+rewriting a post's rows bumps its `related-post:<id>` page cache tag.
+
+`rebuild()` recomputes every post in one batch. When posts or their
+categories change, `blog.signals` only marks them stale with
+`mark_stale()`, in the transaction of the change, so saving a post doesn't
+build the index. `python manage.py update_related_posts` runs
+`update_stale()` as a worker: one index is built per batch of marks, and
+`update()` only rewrites the neighbours of the changed posts and of the
+posts whose lists they enter or leave. The IDF weights of other pairs
+drift slightly as posts are added; `python manage.py
+rebuild_related_posts` (run on release) resets them.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from base.page_cache import invalidate
+from base.similarity import SimilarityIndex, stale_items, tokens
+from blog.models import Post, RelatedPost, StaleRelatedPost
+
+
+def build_index():
+    """
+    Return a `SimilarityIndex` of every post, read with two queries.
+    """
+    categories = defaultdict(list)
+    through = Post.categories.through.objects.values_list("post_id", "category_id")
+    for post_id, category_id in through.iterator():
+        categories[post_id].append(category_id)
+    ids, texts = [], []
+    posts = Post.objects.order_by("pk").values_list("pk", "title", "body")
+    for pk, title, body in posts.iterator():
+        ids.append(pk)
+        texts.append(tokens(f"{title} {title} {body}"))
+    return SimilarityIndex(
+        ids,
+        texts,
+        [categories[pk] for pk in ids],
+        set_weight=settings.BLOG_RELATED_CATEGORY_WEIGHT,
+    )
+
+
+def rows(neighbours):
+    return [
+        RelatedPost(post_id=pk, related_id=related_id, rank=rank, score=score)
+        for pk, related in neighbours.items()
+        for rank, (related_id, score) in enumerate(related)
+    ]
+
+
+def rebuild():
+    """
+    Recompute the related posts of every post. Returns the number of posts.
+    """
+    # Posts marked after this point are computed again by `update_stale()`.
+    last_mark = StaleRelatedPost.objects.order_by("-pk").values_list(
+        "pk", flat=True
+    ).first()
+    neighbours = build_index().top_k_all(settings.BLOG_RELATED_POSTS)
+    with transaction.atomic():
+        if last_mark is not None:
+            StaleRelatedPost.objects.filter(pk__lte=last_mark).delete()
+        RelatedPost.objects.all().delete()
+        RelatedPost.objects.bulk_create(rows(neighbours), batch_size=500)
+        invalidate(*(f"related-post:{pk}" for pk in neighbours))
+    return len(neighbours)
+
+
+def update(post_ids):
+    """
+    Bring the related posts up to date after the posts with `post_ids` were
+    saved, deleted or recategorized. Returns the ids of the posts whose
+    related posts were rewritten.
+    """
+    k = settings.BLOG_RELATED_POSTS
+    index = build_index()
+    stored = defaultdict(list)
+    for pk, related_id, score in RelatedPost.objects.values_list(
+        "post_id", "related_id", "score"
+    ).iterator():
+        stored[pk].append((related_id, score))
+
+    stale = stale_items(index, post_ids, stored, k)
+    if not stale:
+        return stale
+
+    neighbours = {pk: index.top_k(pk, k) for pk in stale}
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=stale).delete()
+        RelatedPost.objects.bulk_create(rows(neighbours))
+        invalidate(*(f"related-post:{pk}" for pk in stale))
+    return stale
+
+
+def mark_stale(post_ids):
+    """
+    Note that the related posts of `post_ids`, and the lists they appear
+    in, need `update()`.
+    """
+    StaleRelatedPost.objects.bulk_create(
+        StaleRelatedPost(post_id=pk) for pk in set(post_ids)
+    )
+
+
+def update_stale(batch_size=None):
+    """
+    Run `update()` for up to `batch_size` of the posts marked stale and
+    clear their marks. Returns the number of marks cleared.
+    """
+    marks = list(
+        StaleRelatedPost.objects.order_by("pk").values_list("pk", "post_id")[
+            :batch_size
+        ]
+    )
+    if not marks:
+        return 0
+    with transaction.atomic():
+        update({post_id for _, post_id in marks})
+        StaleRelatedPost.objects.filter(pk__in=[pk for pk, _ in marks]).delete()
+    return len(marks)
@@ -0,0 +1,165 @@
+# blog/signals.py
+from django.core.cache import cache
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from base.page_cache import invalidate
+from blog import archive, related
+from blog.models import (
+    Category,
+    Comment,
+    Post,
+    RelatedPost,
+    refresh_comment_stats,
+)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    """
+    Keep the `PostMonth` rollup of the archive widget in step with new
+    posts; `date_posted` is only set when a post is created.
+    """
+    if created:
+        archive.refresh_months([instance.date_posted])
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    archive.refresh_months([instance.date_posted])
+
+
+@receiver(post_delete, sender=Comment)
+def update_post_comment_stats(sender, instance, **kwargs):
+    """
+    Keep `Post.comment_count` / `last_comment_at` in step with deleted
+    comments. `post_delete` is sent inside the deletion's transaction, so
+    the counters commit or roll back together with the delete.
+    """
+    refresh_comment_stats([instance.post_id])
+
+
+# Cached pages (`base.page_cache`) are tagged with the posts and categories
+# they show; list pages are also tagged "posts" so new posts appear. Feeds
+# and sitemaps list every post with its categories, so any change to either
+# bumps "post-feed".
+
+
+@receiver(post_save, sender=Post)
+def purge_saved_post(sender, instance, created, **kwargs):
+    invalidate(
+        "post-feed", f"post:{instance.pk}", *(["posts"] if created else [])
+    )
+
+
+@receiver(post_delete, sender=Post)
+def purge_deleted_post(sender, instance, **kwargs):
+    invalidate("posts", "post-feed", f"post:{instance.pk}")
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def purge_post_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    # Pages that showed a removed relation are purged through the tag of
+    # `instance`; pages gaining one through the tags in `pk_set`.
+    if reverse:
+        # `instance` is a `Category`; `pk_set` holds `Post` ids.
+        tags = [f"category:{instance.pk}", *(f"post:{pk}" for pk in pk_set or ())]
+    else:
+        tags = [f"post:{instance.pk}", *(f"category:{pk}" for pk in pk_set or ())]
+    invalidate("post-feed", *tags)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def purge_category(sender, instance, **kwargs):
+    invalidate("post-feed", f"category:{instance.pk}")
+
+
+# Old name-based category URLs (`blog_category_legacy`) resolve through
+# cached lookups keyed by the slugified name asked for, which matches a
+# category by its name or its slug. Both the previous and the new values
+# of a saved category are dropped.
+
+
+@receiver(pre_save, sender=Category)
+def note_category_names(sender, instance, raw=False, **kwargs):
+    instance._previous_names = []
+    if instance.pk is not None and not raw:
+        instance._previous_names = list(
+            Category.objects.filter(pk=instance.pk).values_list("name", "slug").first()
+            or []
+        )
+
+
+@receiver([post_save, post_delete], sender=Category)
+def drop_legacy_category_lookups(sender, instance, **kwargs):
+    names = {instance.name, instance.slug, *getattr(instance, "_previous_names", [])}
+    cache.delete_many([Category.legacy_cache_key(name) for name in names if name])
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def purge_comment_post(sender, instance, **kwargs):
+    invalidate(f"post:{instance.post_id}")
+
+
+# Related posts (`blog.related`) are marked stale when a post's title, body
+# or categories change, and recomputed by the `update_related_posts`
+# worker. Deleting a post or a category removes rows the neighbour lists
+# were built from, so the posts affected are noted in `pre_delete` and
+# marked once the rows are gone.
+
+RELATED_FIELDS = {"title", "body"}
+
+
+@receiver(post_save, sender=Post)
+def update_related_posts(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not RELATED_FIELDS & set(update_fields)):
+        return
+    related.mark_stale([instance.pk])
+
+
+@receiver(pre_delete, sender=Post)
+def note_posts_related_to_deleted_post(sender, instance, **kwargs):
+    instance._related_post_ids = list(
+        RelatedPost.objects.filter(related=instance).values_list("post_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def update_posts_related_to_deleted_post(sender, instance, **kwargs):
+    related.mark_stale(getattr(instance, "_related_post_ids", []))
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def update_related_post_categories(sender, instance, action, reverse, pk_set,
+                                   **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            related.mark_stale([instance.pk])
+        return
+    # `instance` is a `Category`; a `clear()` has no `pk_set`.
+    if action == "pre_clear":
+        instance._related_post_ids = list(
+            instance.posts.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        related.mark_stale(getattr(instance, "_related_post_ids", []))
+    elif action in ("post_add", "post_remove"):
+        related.mark_stale(pk_set or [])
+
+
+@receiver(pre_delete, sender=Category)
+def note_category_posts(sender, instance, **kwargs):
+    instance._related_post_ids = list(instance.posts.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def update_category_posts(sender, instance, **kwargs):
+    related.mark_stale(getattr(instance, "_related_post_ids", []))
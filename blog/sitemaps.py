@@ -0,0 +1,29 @@
+# blog/sitemaps.py
+from django.urls import reverse
+
+from base.sitemaps import Section
+from blog.models import Category, Post
+
+
+class PostSitemap(Section):
+    model = Post
+    lastmod = "date_posted"
+    tags = ("post-feed",)
+
+    def location(self, pk):
+        # As `Post.get_absolute_url()`, without loading the post.
+        return reverse("blog:blog-detail", kwargs={"pk": pk})
+
+
+class CategorySitemap(Section):
+    """
+    Category pages, last modified when their latest post was published.
+    """
+
+    model = Category
+    fields = ("slug",)
+    lastmod = "posts__date_posted"
+    tags = ("post-feed",)
+
+    def location(self, slug):
+        return reverse("blog:blog-category", kwargs={"slug": slug})
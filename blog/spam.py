@@ -0,0 +1,196 @@
+# blog/spam.py
+"""
+Naive Bayes spam scoring for `blog.Comment`s.
+
+Comments are turned into hashed bags of words: every token is mapped to
+one of `FEATURES` buckets by CRC32, so the vocabulary never has to be
+stored. Training counts bucket occurrences in approved (ham) and rejected
+(spam) comments and keeps one log-likelihood ratio per bucket; a score is
+the sigmoid of the prior log-odds plus the ratios of a comment's tokens.
+
+Training and scoring are vectorized with NumPy, which scores tens of
+thousands of comments per second.
+"""
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from base.page_cache import invalidate
+from blog.models import Comment, SpamFilter, refresh_comment_stats
+
+FEATURES = 1 << 16
+MASK = FEATURES - 1
+
+TOKEN = re.compile(r"https?://|\w+", re.UNICODE)
+
+# Logits are clipped so `exp()` can't overflow.
+MAX_LOGIT = 30.0
+
+
+def features(text):
+    """
+    Return the bucket of every token of `text`.
+    """
+    return [
+        zlib.crc32(token.encode()) & MASK for token in TOKEN.findall(text.lower())
+    ]
+
+
+def comment_text(author, body):
+    return f"{author}\n{body}"
+
+
+class Classifier:
+    """
+    A trained model: one weight per feature bucket and a bias.
+    """
+
+    def __init__(self, weights, bias):
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def train(cls, spam_texts, ham_texts):
+        """
+        Fit the model to labelled texts, with add-one smoothing.
+        """
+        spam = [bucket for text in spam_texts for bucket in features(text)]
+        ham = [bucket for text in ham_texts for bucket in features(text)]
+        bias = float(np.log((len(spam_texts) + 1) / (len(ham_texts) + 1)))
+        spam_counts = np.bincount(np.array(spam, dtype=np.int64), minlength=FEATURES)
+        ham_counts = np.bincount(np.array(ham, dtype=np.int64), minlength=FEATURES)
+        weights = np.log((spam_counts + 1) / (len(spam) + FEATURES)) - np.log(
+            (ham_counts + 1) / (len(ham) + FEATURES)
+        )
+        return cls(weights.astype(np.float32), bias)
+
+    def scores(self, texts):
+        """
+        Return the spam probability of each of `texts`.
+        """
+        buckets = [features(text) for text in texts]
+        indices = np.fromiter(
+            (bucket for text in buckets for bucket in text), dtype=np.int64
+        )
+        documents = np.repeat(np.arange(len(buckets)), [len(text) for text in buckets])
+        logits = self.bias + np.bincount(
+            documents, weights=self.weights[indices], minlength=len(buckets)
+        )
+        logits = np.clip(logits, -MAX_LOGIT, MAX_LOGIT)
+        return (1 / (1 + np.exp(-logits))).tolist()
+
+    def to_bytes(self):
+        return self.weights.astype(np.float32).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, bias):
+        return cls(np.frombuffer(data, dtype=np.float32), bias)
+
+
+_loaded = {}
+
+
+def classifier():
+    """
+    Return the current `Classifier`, or `None` if none has been trained.
+    The weights are only loaded from the database when they change.
+    """
+    latest = SpamFilter.objects.order_by("-pk").values_list("pk", "trained_at").first()
+    if latest is None:
+        return None
+    if _loaded.get("version") != latest:
+        spam_filter = SpamFilter.objects.get(pk=latest[0])
+        _loaded["classifier"] = Classifier.from_bytes(
+            bytes(spam_filter.weights), spam_filter.bias
+        )
+        _loaded["version"] = latest
+    return _loaded["classifier"]
+
+
+def retrain():
+    """
+    Train a new model from every approved and rejected `Comment` and make
+    it the current one. Returns the new `SpamFilter`, or `None` if there
+    are no examples of one of the two classes yet.
+    """
+    moderated = Comment.objects.filter(
+        status__in=[Comment.APPROVED, Comment.REJECTED]
+    ).values_list("status", "author", "body")
+    spam_texts, ham_texts = [], []
+    for status, author, body in moderated.iterator():
+        texts = spam_texts if status == Comment.REJECTED else ham_texts
+        texts.append(comment_text(author, body))
+    if not spam_texts or not ham_texts:
+        return None
+    model = Classifier.train(spam_texts, ham_texts)
+    spam_filter = SpamFilter.objects.create(
+        weights=model.to_bytes(),
+        bias=model.bias,
+        trained_on=len(spam_texts) + len(ham_texts),
+    )
+    SpamFilter.objects.exclude(pk=spam_filter.pk).delete()
+    return spam_filter
+
+
+def moderate(comments, status):
+    """
+    Set the `status` of the `comments` queryset, as a moderator's decision,
+    and retrain the model so it learns from it. Returns the number of
+    comments changed.
+    """
+    with transaction.atomic():
+        post_ids = set(comments.values_list("post_id", flat=True))
+        changed = comments.update(status=status)
+        refresh_comment_stats(post_ids)
+        invalidate(*(f"post:{post_id}" for post_id in post_ids))
+    retrain()
+    return changed
+
+
+def decide(score):
+    """
+    Return the `Comment.status` for a spam probability: clear ham is
+    approved, clear spam rejected, and the rest left for a moderator.
+    """
+    if score < settings.BLOG_SPAM_APPROVE_BELOW:
+        return Comment.APPROVED
+    if score >= settings.BLOG_SPAM_REJECT_FROM:
+        return Comment.REJECTED
+    return Comment.PENDING
+
+
+def score_pending(batch_size):
+    """
+    Score up to `batch_size` pending comments that haven't been scored yet
+    and return how many were. Until a model has been trained, comments are
+    approved unscored.
+    """
+    comments = list(
+        Comment.objects.filter(status=Comment.PENDING, spam_score__isnull=True)
+        .only("pk", "post_id", "author", "body", "status")
+        .order_by("pk")[:batch_size]
+    )
+    if not comments:
+        return 0
+    model = classifier()
+    if model is None:
+        for comment in comments:
+            comment.status = Comment.APPROVED
+    else:
+        scores = model.scores(
+            comment_text(comment.author, comment.body) for comment in comments
+        )
+        for comment, score in zip(comments, scores):
+            comment.spam_score = score
+            comment.status = decide(score)
+    approved = {
+        comment.post_id for comment in comments if comment.status == Comment.APPROVED
+    }
+    with transaction.atomic():
+        Comment.objects.bulk_update(comments, ["spam_score", "status"])
+        refresh_comment_stats(approved)
+        invalidate(*(f"post:{post_id}" for post_id in approved))
+    return len(comments)
@@ -97,6 +97,8 @@ class TestCommentAdmin(TestCase):
                 "author",
                 "post",
                 "date_posted",
+                "status",
+                "spam_score",
             ),
         )
 
@@ -107,6 +109,7 @@ class TestCommentAdmin(TestCase):
         self.assertEqual(
             CommentAdmin.list_filter,
             (
+                "status",
                 "author",
                 "post",
                 "date_posted",
@@ -0,0 +1,117 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog import archive
+from blog.models import Post, PostMonth
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+class ArchiveTest(TestCase):
+    """
+    Tests for `blog.archive` and the archive views.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        cls.january = cls.post_at("January", datetime(2023, 1, 15, 12))
+        # 03:00 UTC on February 1st is still January 31st in New York.
+        cls.late_january = cls.post_at(
+            "Late January", datetime(2023, 2, 1, 3, tzinfo=ZoneInfo("UTC"))
+        )
+        cls.march = cls.post_at("March", datetime(2023, 3, 1, 0, 30))
+        cls.next_year = cls.post_at("Next Year", datetime(2024, 6, 1, 12))
+
+    @classmethod
+    def post_at(cls, title, moment):
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=NEW_YORK)
+        post = Post.objects.create(title=title, body="Body", author=cls.author)
+        # `date_posted` is `auto_now_add`; move the post and recount.
+        old = post.date_posted
+        Post.objects.filter(pk=post.pk).update(date_posted=moment)
+        archive.refresh_months([old, moment])
+        post.date_posted = moment
+        return post
+
+    def counts(self):
+        return list(PostMonth.objects.values_list("year", "month", "post_count"))
+
+    def test_rollup_counts_local_months(self):
+        """
+        Posts are counted in their month in `TIME_ZONE`, newest first.
+        """
+        self.assertEqual(
+            self.counts(), [(2024, 6, 1), (2023, 3, 1), (2023, 1, 2)]
+        )
+
+    def test_rollup_follows_new_and_deleted_posts(self):
+        """
+        Creating and deleting posts updates the rollup.
+        """
+        post = Post.objects.create(title="Now", body="Body", author=self.author)
+        year, month = archive.local_month(post.date_posted)
+        self.assertIn((year, month, 1), self.counts())
+        post.delete()
+        self.march.delete()
+        self.assertEqual(self.counts(), [(2024, 6, 1), (2023, 1, 2)])
+
+    def test_month_bounds_are_local_midnights(self):
+        """
+        Months start at midnight in `TIME_ZONE`, across DST changes too.
+        """
+        start, end = archive.month_bounds(2023, 3)
+        self.assertEqual(start, datetime(2023, 3, 1, tzinfo=NEW_YORK))
+        self.assertEqual(end.utcoffset().total_seconds(), -4 * 3600)
+        self.assertEqual(archive.month_bounds(2023, 12)[1].year, 2024)
+
+    def test_month_page_lists_posts_of_the_local_month(self):
+        """
+        The month page selects posts with a range query and one query for
+        the widget.
+        """
+        url = reverse("blog:archive-month", kwargs={"year": 2023, "month": 1})
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(
+            list(response.context["posts"]), [self.late_january, self.january]
+        )
+        self.assertContains(response, "January 2023")
+        self.assertContains(response, 'href="/blog/archive/2023/3/"')
+
+    def test_year_page_lists_posts_of_the_year(self):
+        """
+        The year page shows every post of the year, newest first.
+        """
+        response = self.client.get(reverse("blog:archive-year", kwargs={"year": 2023}))
+        self.assertEqual(
+            list(response.context["posts"]),
+            [self.march, self.late_january, self.january],
+        )
+
+    def test_months_without_posts_are_not_found(self):
+        """
+        Empty and impossible months return a 404.
+        """
+        for kwargs in ({"year": 2023, "month": 2}, {"year": 2023, "month": 13}):
+            with self.subTest(**kwargs):
+                response = self.client.get(reverse("blog:archive-month", kwargs=kwargs))
+                self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("blog:archive-year", kwargs={"year": 1999}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_index_shows_archive_widget(self):
+        """
+        The blog index links every month with its post count.
+        """
+        response = self.client.get(reverse("blog:index"))
+        self.assertContains(response, 'href="/blog/archive/2024/6/"')
+        self.assertContains(response, "(2)")
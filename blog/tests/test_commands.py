@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import CustomUser
+from base import page_cache
+from blog.models import Post
+
+
+class BackfillPostExcerptsCommandTest(TestCase):
+    """
+    Test the `backfill_post_excerpts` management command.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create posts and then blank their summaries, as if they were
+        created before the summary fields existed.
+        """
+        author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        for number in range(5):
+            Post.objects.create(
+                title=f"Test Post {number}",
+                body=f"Body of post number {number}",
+                author=author,
+            )
+        Post.objects.update(excerpt="", word_count=0, reading_time=0)
+
+    def test_command_fills_summaries_in_batches(self):
+        """
+        Every post gets its summary, however small the batches.
+        """
+        out = StringIO()
+        call_command("backfill_post_excerpts", batch_size=2, stdout=out)
+        self.assertIn("Updated 5 post(s).", out.getvalue())
+        for post in Post.objects.all():
+            self.assertEqual(post.excerpt, post.body)
+            self.assertEqual(post.word_count, 5)
+            self.assertEqual(post.reading_time, 1)
+
+    def test_command_missing_only_skips_filled_posts(self):
+        """
+        `--missing-only` leaves posts that already have an excerpt alone.
+        """
+        Post.objects.filter(title="Test Post 0").update(excerpt="Kept")
+        out = StringIO()
+        call_command("backfill_post_excerpts", missing_only=True, stdout=out)
+        self.assertIn("Updated 4 post(s).", out.getvalue())
+        self.assertEqual(Post.objects.get(title="Test Post 0").excerpt, "Kept")
+
+    def test_command_purges_cached_post_pages(self):
+        """
+        `bulk_update()` skips the signals, so the command invalidates the
+        pages showing the posts itself.
+        """
+        post = Post.objects.first()
+        tags = ["post-feed", f"post:{post.pk}"]
+        before = page_cache.current_versions(tags)
+        call_command("backfill_post_excerpts", stdout=StringIO())
+        after = page_cache.current_versions(tags)
+        for tag in tags:
+            self.assertNotEqual(before[tag], after[tag])
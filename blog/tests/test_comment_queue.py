@@ -0,0 +1,201 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog import comment_queue
+from blog.models import Comment, Post
+
+
+class CommentQueueTest(TestCase):
+    """
+    Tests for `blog.comment_queue` and the `process_comment_queue` command.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        cls.post = Post.objects.create(
+            title="Test Post",
+            body="Test body",
+            author=author,
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            BLOG_COMMENT_QUEUE_DIR=directory.name
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.url = reverse("blog:blog-detail", kwargs={"pk": self.post.pk})
+
+    def submit(self, author="Visitor", body="Nice post"):
+        return self.client.post(self.url, {"author": author, "body": body})
+
+    def drain(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return comment_queue.process_batch(100)
+
+    def test_post_queues_comment_without_writing_it(self):
+        """
+        A valid comment is queued, not saved during the request.
+        """
+        response = self.submit()
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response["Location"].startswith(f"{self.url}?posted="))
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(len(comment_queue.queued_files()), 1)
+
+    def test_invalid_comment_is_not_queued(self):
+        """
+        The form is still validated before queueing.
+        """
+        response = self.client.post(self.url, {"author": "Visitor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(comment_queue.queued_files(), [])
+
+    def test_batch_creates_comments_and_updates_counts(self):
+        """
+        Queued comments are created together and counted on their post.
+        """
+        self.submit(body="First")
+        self.submit(body="Second")
+        self.assertEqual(self.drain(), 2)
+        self.assertEqual(
+            list(Comment.objects.order_by("pk").values_list("body", flat=True)),
+            ["First", "Second"],
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertIsNotNone(self.post.last_comment_at)
+        self.assertEqual(comment_queue.queued_files(), [])
+
+    def test_reprocessing_does_not_duplicate(self):
+        """
+        A submission applied before a crash is not applied twice.
+        """
+        self.submit()
+        paths = comment_queue.queued_files()
+        with self.captureOnCommitCallbacks(execute=False):
+            comment_queue.process_batch(100)
+        self.assertEqual(comment_queue.queued_files(), paths)
+        self.drain()
+        self.assertEqual(Comment.objects.count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_comment_on_deleted_post_is_dropped(self):
+        """
+        Submissions for posts deleted in the meantime are discarded.
+        """
+        self.submit()
+        self.post.delete()
+        self.assertEqual(self.drain(), 1)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_unprocessable_submissions_are_moved_aside(self):
+        """
+        Files that can't be applied go to `failed/` and are logged; the
+        rest of their batch is still applied.
+        """
+        directory = comment_queue.queue_dir()
+        self.submit(body="First")
+        for name, content in (
+            ("00000000000000000001-broken.json", "{not json"),
+            ("00000000000000000002-partial.json", '{"key": "partial"}'),
+        ):
+            with open(os.path.join(directory, name), "w") as file:
+                file.write(content)
+        key = comment_queue.enqueue("not-a-number", "Visitor", "Bad post")
+        self.submit(body="Last")
+        with self.assertLogs("blog.comment_queue", "ERROR") as logs:
+            self.assertEqual(self.drain(), 5)
+        self.assertEqual(len(logs.output), 3)
+        self.assertEqual(
+            sorted(Comment.objects.values_list("body", flat=True)),
+            ["First", "Last"],
+        )
+        self.assertEqual(comment_queue.queued_files(), [])
+        failed = os.listdir(os.path.join(directory, comment_queue.FAILED_DIR))
+        self.assertEqual(len(failed), 3)
+        self.assertTrue(any(name.endswith(f"-{key}.json") for name in failed))
+        self.assertEqual(self.drain(), 0)
+
+    def test_author_sees_queued_comment(self):
+        """
+        The submitter's cookie lists their queued comments until applied.
+        """
+        self.submit(body="Mine")
+        pending_url = reverse("blog:pending-comments", kwargs={"pk": self.post.pk})
+        response = self.client.get(pending_url)
+        self.assertEqual(
+            response.json(),
+            {"comments": [{"author": "Visitor", "body": "Mine"}]},
+        )
+        self.assertIn("no-store", response["Cache-Control"])
+        self.drain()
+        self.assertEqual(self.client.get(pending_url).json(), {"comments": []})
+
+    def test_other_visitors_do_not_see_queued_comment(self):
+        """
+        Without the cookie no queued comments are returned.
+        """
+        self.submit()
+        self.client.cookies.clear()
+        response = self.client.get(
+            reverse("blog:pending-comments", kwargs={"pk": self.post.pk})
+        )
+        self.assertEqual(response.json(), {"comments": []})
+
+    def test_queue_files_are_written_atomically(self):
+        """
+        No temporary files are left behind.
+        """
+        self.submit()
+        names = os.listdir(comment_queue.queue_dir())
+        self.assertTrue(all(name.endswith(".json") for name in names))
+
+
+class ProcessCommentQueueCommandTest(TransactionTestCase):
+    """
+    Tests for the `process_comment_queue` command, whose transactions
+    must really commit for queue files to be removed.
+    """
+
+    def test_command_drains_queue(self):
+        """
+        `process_comment_queue --once` applies everything and exits.
+        """
+        author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        post = Post.objects.create(title="Test Post", body="Body", author=author)
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(BLOG_COMMENT_QUEUE_DIR=directory):
+                comment_queue.enqueue(post.pk, "Visitor", "First")
+                comment_queue.enqueue(post.pk, "Visitor", "Second")
+                out = StringIO()
+                call_command(
+                    "process_comment_queue", "--once", "--batch-size=1", stdout=out
+                )
+                self.assertEqual(comment_queue.queued_files(), [])
+        self.assertIn("Processed 2 comment(s) in total.", out.getvalue())
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_command_requires_queue_dir(self):
+        """
+        The worker refuses to run when comments aren't queued.
+        """
+        with override_settings(BLOG_COMMENT_QUEUE_DIR=None):
+            with self.assertRaises(CommandError):
+                call_command("process_comment_queue", "--once")
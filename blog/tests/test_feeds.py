@@ -0,0 +1,112 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog.models import Category, Post
+
+
+class PostFeedTest(TestCase):
+    """
+    Tests for the Atom and RSS feeds of `blog.Post`s.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        cls.category = Category.objects.create(name="Flint")
+        cls.other_category = Category.objects.create(name="Obsidian")
+        cls.posts = [
+            Post.objects.create(
+                title=f"Post {number}", body=f"Body {number}", author=author
+            )
+            for number in range(3)
+        ]
+        cls.posts[0].categories.add(cls.category)
+        cls.posts[1].categories.add(cls.other_category)
+
+    def get(self, url, **headers):
+        response = self.client.get(url, **headers)
+        if response.streaming:
+            response.body = b"".join(response.streaming_content).decode()
+        return response
+
+    def test_atom_feed_lists_every_post_newest_first(self):
+        """
+        The Atom feed has one entry per post, newest first.
+        """
+        response = self.get(reverse("blog:post-feed", args=["atom"]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Content-Type"], "application/atom+xml; charset=utf-8"
+        )
+        self.assertEqual(response.body.count("<entry>"), 3)
+        self.assertLess(response.body.index("Post 2"), response.body.index("Post 0"))
+        self.assertIn(
+            f"http://testserver{self.posts[0].get_absolute_url()}", response.body
+        )
+        self.assertIn('<category term="Flint"', response.body)
+
+    def test_rss_feed(self):
+        """
+        The RSS feed has one item per post.
+        """
+        response = self.get(reverse("blog:post-feed", args=["rss"]))
+        self.assertEqual(response["Content-Type"], "application/rss+xml; charset=utf-8")
+        self.assertEqual(response.body.count("<item>"), 3)
+
+    def test_category_feed_only_lists_its_posts(self):
+        """
+        A category's feed only has that category's posts.
+        """
+        response = self.get(
+            reverse("blog:category-feed", args=[self.category.slug, "atom"])
+        )
+        self.assertEqual(response.body.count("<entry>"), 1)
+        self.assertIn("Post 0", response.body)
+
+    def test_conditional_get_returns_304_in_one_query(self):
+        """
+        A client holding the current ETag gets a 304 after one query.
+        """
+        url = reverse("blog:post-feed", args=["atom"])
+        etag = self.get(url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_editing_a_post_changes_etag(self):
+        """
+        Edits that don't change `date_posted` still change the ETag.
+        """
+        url = reverse("blog:post-feed", args=["atom"])
+        etag = self.get(url)["ETag"]
+        self.posts[0].title = "Renamed"
+        self.posts[0].save()
+        response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Renamed", response.body)
+
+    def test_unknown_format_and_category_return_404(self):
+        """
+        Only Atom and RSS feeds of existing categories exist.
+        """
+        self.assertEqual(
+            self.client.get(reverse("blog:post-feed", args=["json"])).status_code, 404
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse("blog:category-feed", args=["missing", "atom"])
+            ).status_code,
+            404,
+        )
+
+    def test_index_links_to_feeds(self):
+        """
+        The blog index advertises its feeds.
+        """
+        response = self.client.get(reverse("blog:index"))
+        self.assertContains(response, reverse("blog:post-feed", args=["atom"]))
+        self.assertContains(response, reverse("blog:post-feed", args=["rss"]))
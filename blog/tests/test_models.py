@@ -49,6 +49,28 @@ class CategoryModelTest(TestCase):
         self.category = Category.objects.create(name="Test Category")
         self.assertEqual(str(self.category), "Test Category")
 
+    def test_slug_is_generated_from_name(self):
+        """
+        `slug` should be generated from `name` when left blank.
+        """
+        category = Category.objects.create(name="Web Design")
+        self.assertEqual(category.slug, "web-design")
+
+    def test_slug_is_unique(self):
+        """
+        Categories whose names slugify the same get distinct slugs.
+        """
+        Category.objects.create(name="Web Design")
+        category = Category.objects.create(name="Web design!")
+        self.assertEqual(category.slug, "web-design-2")
+
+    def test_get_absolute_url_method(self):
+        """
+        `get_absolute_url` should return the slug-based category URL.
+        """
+        category = Category.objects.create(name="Python")
+        self.assertEqual(category.get_absolute_url(), "/blog/category/python/")
+
     def test_verbose_name_plural(self):
         """
         `verbose_name_plural` should be 'Categories'.
@@ -154,6 +176,42 @@ class PostModelTest(TestCase):
         self.post = Post.objects.create(author=self.author, title="Test Post")
         self.assertEqual(str(self.post), "Test Post")
 
+    def test_save_generates_summary_fields(self):
+        """
+        Saving a `Post` should fill `excerpt`, `word_count` and
+        `reading_time` from `body`.
+        """
+        self.author = get_user_model().objects.create_user(
+            username="DezziKitten",
+            email="DezziKitten@meowmeow.scratch",
+            password="MeowMeow42",
+        )
+        body = "meow " * 450
+        self.post = Post.objects.create(
+            author=self.author, title="Test Post", body=body
+        )
+        self.assertEqual(self.post.excerpt, body[:400])
+        self.assertEqual(self.post.word_count, 450)
+        self.assertEqual(self.post.reading_time, 2)
+
+    def test_save_with_update_fields_refreshes_summary(self):
+        """
+        `save(update_fields=["body"])` should also store the new summary.
+        """
+        self.author = get_user_model().objects.create_user(
+            username="DezziKitten",
+            email="DezziKitten@meowmeow.scratch",
+            password="MeowMeow42",
+        )
+        self.post = Post.objects.create(author=self.author, title="Test Post")
+        self.assertEqual(self.post.reading_time, 0)
+        self.post.body = "A short body"
+        self.post.save(update_fields=["body"])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.excerpt, "A short body")
+        self.assertEqual(self.post.word_count, 3)
+        self.assertEqual(self.post.reading_time, 1)
+
     def test_display_categories_method(self):
         """
         `display_categories` method should return a comma-separated list of
@@ -178,6 +236,25 @@ class PostModelTest(TestCase):
             ("Test Category 1, Test Category 2, " "Test Category 3, Test Category 4"),
         )
 
+    def test_display_categories_uses_prefetched_categories(self):
+        """
+        `display_categories` should not query the database when the
+        categories were prefetched.
+        """
+        self.author = get_user_model().objects.create_user(
+            username="DezziKitten",
+            email="DezziKitten@meowmeow.scratch",
+            password="MeowMeow42",
+        )
+        self.post = Post.objects.create(author=self.author, title="Test Post")
+        for number in range(5):
+            self.post.categories.add(
+                Category.objects.create(name=f"Test Category {number}")
+            )
+        post = Post.objects.prefetch_related("categories").get(pk=self.post.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(post.display_categories().split(", ")), 4)
+
     def test_display_categories_short_description(self):
         """
         `display_categories` short_description should be 'Categories'.
@@ -268,3 +345,44 @@ class CommentModelTest(TestCase):
         )
         self.assertEqual(str(self.post_09_char), "Test Post")
         self.assertEqual(str(self.post_23_char), "Test Post - 23 chars"[:20])
+
+    def test_saving_a_comment_updates_post_stats(self):
+        """
+        Creating comments should bump the post's `comment_count` and
+        `last_comment_at`.
+        """
+        self.author = get_user_model().objects.create_user(
+            username="DezziKitten",
+            email="DezziKitten@meowmeow.scratch",
+            password="MeowMeow42",
+        )
+        self.post = Post.objects.create(author=self.author, title="Test Post")
+        Comment.objects.create(post=self.post, author="A", body="First")
+        latest = Comment.objects.create(post=self.post, author="B", body="Second")
+        latest.body = "Edited"
+        latest.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(self.post.last_comment_at, latest.date_posted)
+
+    def test_deleting_a_comment_updates_post_stats(self):
+        """
+        Deleting comments should decrement `comment_count` and move
+        `last_comment_at` back to the latest remaining comment.
+        """
+        self.author = get_user_model().objects.create_user(
+            username="DezziKitten",
+            email="DezziKitten@meowmeow.scratch",
+            password="MeowMeow42",
+        )
+        self.post = Post.objects.create(author=self.author, title="Test Post")
+        first = Comment.objects.create(post=self.post, author="A", body="First")
+        second = Comment.objects.create(post=self.post, author="B", body="Second")
+        second.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self.post.last_comment_at, first.date_posted)
+        Comment.objects.all().delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+        self.assertIsNone(self.post.last_comment_at)
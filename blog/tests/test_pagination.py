@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from blog.models import Post
+from blog.pagination import KeysetPaginator, decode_cursor, encode_cursor
+
+
+class CursorEncodingTest(TestCase):
+    """
+    Tests for `encode_cursor` and `decode_cursor`.
+    """
+
+    def test_round_trip(self):
+        """
+        A decoded cursor should contain the string form of every value.
+        """
+        now = timezone.now()
+        token = encode_cursor([now, 42])
+        self.assertEqual(decode_cursor(token, 2), [now.isoformat(), "42"])
+
+    def test_malformed_token_returns_none(self):
+        """
+        Garbage and wrongly sized tokens should decode to `None`.
+        """
+        self.assertIsNone(decode_cursor("not a cursor!", 2))
+        self.assertIsNone(decode_cursor(encode_cursor([1, 2, 3]), 2))
+        self.assertIsNone(decode_cursor("", 2))
+
+
+class KeysetPaginatorTest(TestCase):
+    """
+    Tests for `KeysetPaginator`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create seven posts, two of which share a `date_posted` so the `id`
+        tie-breaker is exercised.
+        """
+        cls.author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        base = timezone.now()
+        cls.posts = []
+        for number in range(7):
+            post = Post.objects.create(
+                title=f"Post {number}",
+                body="Body",
+                author=cls.author,
+            )
+            cls.posts.append(post)
+        # Posts 3 and 4 get the same timestamp.
+        offsets = [0, 1, 2, 3, 3, 4, 5]
+        for post, offset in zip(cls.posts, offsets):
+            Post.objects.filter(pk=post.pk).update(
+                date_posted=base + timedelta(minutes=offset)
+            )
+        cls.expected = list(
+            Post.objects.order_by("-date_posted", "-id").values_list("id", flat=True)
+        )
+
+    def paginator(self):
+        return KeysetPaginator(Post.objects.all(), per_page=3)
+
+    def test_first_page(self):
+        """
+        The first page has the newest posts, a next cursor and no previous
+        cursor.
+        """
+        page = self.paginator().get_page()
+        self.assertEqual([post.id for post in page], self.expected[:3])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test_walk_forward_visits_every_post_once(self):
+        """
+        Following `next_cursor` should visit every post exactly once, in
+        order.
+        """
+        seen = []
+        page = self.paginator().get_page()
+        seen.extend(post.id for post in page)
+        while page.has_next():
+            page = self.paginator().get_page(after=page.next_cursor)
+            seen.extend(post.id for post in page)
+        self.assertEqual(seen, self.expected)
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test_walk_backward_returns_previous_page(self):
+        """
+        `previous_cursor` should lead back to the page before.
+        """
+        first = self.paginator().get_page()
+        second = self.paginator().get_page(after=first.next_cursor)
+        back = self.paginator().get_page(before=second.previous_cursor)
+        self.assertEqual([post.id for post in back], self.expected[:3])
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_invalid_cursor_returns_first_page(self):
+        """
+        An unparseable cursor should fall back to the first page.
+        """
+        page = self.paginator().get_page(after=encode_cursor(["nope", "x"]))
+        self.assertEqual([post.id for post in page], self.expected[:3])
+
+    def test_page_is_a_single_query(self):
+        """
+        Every page, however deep, is fetched with a single query.
+        """
+        first = self.paginator().get_page()
+        second = self.paginator().get_page(after=first.next_cursor)
+        with self.assertNumQueries(1):
+            self.paginator().get_page(after=second.next_cursor)
@@ -0,0 +1,159 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog import related
+from blog.models import Category, Post, RelatedPost, StaleRelatedPost
+
+
+def neighbours(post):
+    return list(
+        RelatedPost.objects.filter(post=post)
+        .order_by("rank")
+        .values_list("related_id", flat=True)
+    )
+
+
+@override_settings(BLOG_RELATED_POSTS=2, BLOG_RELATED_CATEGORY_WEIGHT=0.3)
+class RelatedPostsTest(TestCase):
+    """
+    Tests for `blog.related` and the signals keeping it up to date.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        cls.stone = Category.objects.create(name="Stone")
+        cls.flint = Post.objects.create(
+            title="Knapping flint",
+            body="Striking flint cores to make arrowheads.",
+            author=cls.author,
+        )
+        cls.obsidian = Post.objects.create(
+            title="Knapping obsidian",
+            body="Obsidian arrowheads are sharper than flint.",
+            author=cls.author,
+        )
+        cls.bread = Post.objects.create(
+            title="Sourdough",
+            body="Feeding a sourdough starter.",
+            author=cls.author,
+        )
+        related.update_stale()
+
+    def test_saving_posts_computes_neighbours(self):
+        """
+        Posts are related by shared words once the posts marked stale as
+        they are saved are updated.
+        """
+        self.assertEqual(neighbours(self.flint), [self.obsidian.pk])
+        self.assertEqual(neighbours(self.obsidian), [self.flint.pk])
+        self.assertEqual(neighbours(self.bread), [])
+
+    def test_new_post_enters_existing_lists(self):
+        """
+        A new similar post is added to the lists it belongs in.
+        """
+        post = Post.objects.create(
+            title="Sourdough loaves",
+            body="Baking loaves with a sourdough starter.",
+            author=self.author,
+        )
+        related.update_stale()
+        self.assertEqual(neighbours(self.bread), [post.pk])
+        self.assertEqual(neighbours(post), [self.bread.pk])
+
+    def test_editing_a_post_updates_lists(self):
+        """
+        A post no longer similar is dropped from other posts' lists.
+        """
+        self.obsidian.title = "Baking"
+        self.obsidian.body = "A sourdough starter."
+        self.obsidian.save()
+        related.update_stale()
+        self.assertEqual(neighbours(self.flint), [])
+        self.assertEqual(neighbours(self.bread), [self.obsidian.pk])
+
+    def test_categories_relate_posts(self):
+        """
+        Shared categories relate posts without shared words.
+        """
+        self.stone.posts.add(self.flint, self.bread)
+        related.update_stale()
+        self.assertIn(self.bread.pk, neighbours(self.flint))
+        self.stone.posts.clear()
+        related.update_stale()
+        self.assertNotIn(self.bread.pk, neighbours(self.flint))
+        self.bread.categories.add(self.stone)
+        self.flint.categories.add(self.stone)
+        related.update_stale()
+        self.assertIn(self.flint.pk, neighbours(self.bread))
+        self.stone.delete()
+        related.update_stale()
+        self.assertEqual(neighbours(self.bread), [])
+
+    def test_deleting_a_post_refills_lists(self):
+        """
+        Lists that held a deleted post are recomputed without it.
+        """
+        self.obsidian.delete()
+        related.update_stale()
+        self.assertEqual(neighbours(self.flint), [])
+
+    def test_rebuild_matches_incremental_updates(self):
+        """
+        A full rebuild yields the lists kept by the signals.
+        """
+        before = {post.pk: neighbours(post) for post in Post.objects.all()}
+        out = StringIO()
+        call_command("rebuild_related_posts", stdout=out)
+        self.assertIn("3 post(s)", out.getvalue())
+        self.assertEqual(
+            {post.pk: neighbours(post) for post in Post.objects.all()}, before
+        )
+
+    def test_changes_only_mark_posts_stale(self):
+        """
+        Saving a post doesn't build the index; the worker command does,
+        once per batch of marks.
+        """
+        with mock.patch.object(related, "build_index") as build_index:
+            self.flint.title = "Knapping chert"
+            self.flint.save()
+            self.bread.categories.add(self.stone)
+        build_index.assert_not_called()
+        self.assertEqual(
+            sorted(StaleRelatedPost.objects.values_list("post_id", flat=True)),
+            sorted([self.flint.pk, self.bread.pk]),
+        )
+        out = StringIO()
+        with mock.patch.object(
+            related, "build_index", wraps=related.build_index
+        ) as build_index:
+            call_command("update_related_posts", "--once", stdout=out)
+        build_index.assert_called_once()
+        self.assertIn("Updated 2 stale post(s) in total.", out.getvalue())
+        self.assertFalse(StaleRelatedPost.objects.exists())
+
+    def test_update_skips_unrelated_posts(self):
+        """
+        Only the lists a changed post can affect are rewritten.
+        """
+        self.assertEqual(related.update([self.bread.pk]), {self.bread.pk})
+
+    def test_blog_detail_shows_related_posts_with_one_query(self):
+        """
+        The panel lists related posts with one more query than without.
+        """
+        url = reverse("blog:blog-detail", kwargs={"pk": self.flint.pk})
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.context["related_posts"], [self.obsidian])
+        self.assertContains(response, self.obsidian.get_absolute_url())
@@ -0,0 +1,207 @@
+from io import StringIO
+
+from django.contrib.admin.sites import AdminSite
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog import spam
+from blog.admin import CommentAdmin
+from blog.models import Comment, Post, SpamFilter
+
+HAM = [
+    "Great write up, the section on flint knapping was really helpful",
+    "Thanks for sharing, I tried the pressure flaking tip and it worked",
+    "Nice post, looking forward to the next one about obsidian",
+]
+SPAM = [
+    "Cheap pills buy now http://spam.example best price pills",
+    "Win money fast casino bonus http://casino.example click now",
+    "Buy cheap watches http://watches.example best price click",
+]
+
+
+class ClassifierTest(TestCase):
+    """
+    Tests for `blog.spam.Classifier`.
+    """
+
+    def test_scores_separate_spam_from_ham(self):
+        """
+        Texts resembling the spam examples score higher than ham-like ones.
+        """
+        model = spam.Classifier.train(SPAM, HAM)
+        ham_score, spam_score = model.scores(
+            ["Helpful post about knapping obsidian", "Buy cheap pills click now"]
+        )
+        self.assertLess(ham_score, 0.5)
+        self.assertGreater(spam_score, 0.9)
+
+    def test_stored_model_gives_the_same_scores(self):
+        """
+        A model restored from its bytes scores texts as the original.
+        """
+        texts = ["Buy cheap pills", "Thanks for the post", ""]
+        model = spam.Classifier.train(SPAM, HAM)
+        restored = spam.Classifier.from_bytes(model.to_bytes(), model.bias)
+        for expected, restored_score in zip(
+            model.scores(texts), restored.scores(texts)
+        ):
+            self.assertAlmostEqual(expected, restored_score, places=5)
+
+    def test_benchmark_command(self):
+        """
+        `score_comments --benchmark` reports throughput.
+        """
+        out = StringIO()
+        call_command("score_comments", "--benchmark=100", stdout=out)
+        self.assertIn("comments/s", out.getvalue())
+
+
+@override_settings(BLOG_SPAM_FILTER_ENABLED=True)
+class SpamFilteringTest(TestCase):
+    """
+    Tests for scoring and moderating `blog.Comment`s.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+            is_staff=True,
+            is_superuser=True,
+        )
+        cls.post = Post.objects.create(
+            title="Test Post",
+            body="Test body",
+            author=cls.author,
+        )
+
+    def setUp(self):
+        self.url = reverse("blog:blog-detail", kwargs={"pk": self.post.pk})
+
+    def train(self):
+        for body in HAM:
+            Comment.objects.create(post=self.post, author="Reader", body=body)
+        for body in SPAM:
+            Comment.objects.create(
+                post=self.post, author="Seller", body=body, status=Comment.REJECTED
+            )
+        spam.retrain()
+
+    def moderate(self, action, comments):
+        request = RequestFactory().post("/")
+        request.user = self.author
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        getattr(CommentAdmin(Comment, AdminSite()), action)(request, comments)
+
+    def test_submitted_comment_is_held_until_scored(self):
+        """
+        A visitor's comment isn't shown or counted before it is scored.
+        """
+        self.client.post(self.url, {"author": "Visitor", "body": "Nice post"})
+        comment = Comment.objects.get()
+        self.assertEqual(comment.status, Comment.PENDING)
+        response = self.client.get(self.url)
+        self.assertNotContains(response, "Nice post")
+        self.assertEqual(response.context["post"].comment_count, 0)
+
+    def test_author_sees_comment_awaiting_scoring(self):
+        """
+        The submitter's cookie lists their comment until it is scored.
+        """
+        self.client.post(self.url, {"author": "Visitor", "body": "Mine"})
+        pending_url = reverse("blog:pending-comments", kwargs={"pk": self.post.pk})
+        self.assertEqual(
+            self.client.get(pending_url).json(),
+            {"comments": [{"author": "Visitor", "body": "Mine"}]},
+        )
+        spam.score_pending(100)
+        self.assertEqual(self.client.get(pending_url).json(), {"comments": []})
+
+    def test_unscored_comments_are_approved_without_a_model(self):
+        """
+        Until a model has been trained, comments are published unscored.
+        """
+        self.client.post(self.url, {"author": "Visitor", "body": "Nice post"})
+        self.assertEqual(spam.score_pending(100), 1)
+        comment = Comment.objects.get()
+        self.assertEqual(comment.status, Comment.APPROVED)
+        self.assertIsNone(comment.spam_score)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertContains(self.client.get(self.url), "Nice post")
+
+    def test_scoring_approves_ham_and_rejects_spam(self):
+        """
+        Scored comments are published or rejected by their spam score.
+        """
+        self.train()
+        ham = Comment.objects.create(
+            post=self.post,
+            author="Reader",
+            body="Thanks, helpful post about knapping obsidian",
+            status=Comment.PENDING,
+        )
+        junk = Comment.objects.create(
+            post=self.post,
+            author="Seller",
+            body="Buy cheap pills http://spam.example click now",
+            status=Comment.PENDING,
+        )
+        self.assertEqual(spam.score_pending(100), 2)
+        ham.refresh_from_db()
+        junk.refresh_from_db()
+        self.assertEqual(ham.status, Comment.APPROVED)
+        self.assertEqual(junk.status, Comment.REJECTED)
+        self.assertGreater(junk.spam_score, ham.spam_score)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, len(HAM) + 1)
+        response = self.client.get(self.url)
+        self.assertContains(response, ham.body)
+        self.assertNotContains(response, junk.body)
+
+    def test_approve_action_publishes_and_retrains(self):
+        """
+        Approving comments in the admin publishes them and trains a model.
+        """
+        Comment.objects.create(
+            post=self.post, author="Seller", body=SPAM[0], status=Comment.REJECTED
+        )
+        held = Comment.objects.create(
+            post=self.post, author="Reader", body=HAM[0], status=Comment.PENDING
+        )
+        self.moderate("approve_comments", Comment.objects.filter(pk=held.pk))
+        held.refresh_from_db()
+        self.assertEqual(held.status, Comment.APPROVED)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(SpamFilter.objects.get().trained_on, 2)
+
+    def test_reject_action_hides_comments(self):
+        """
+        Rejecting approved comments removes them from the page and count.
+        """
+        self.train()
+        comment = Comment.objects.filter(status=Comment.APPROVED).first()
+        self.moderate("reject_comments", Comment.objects.filter(pk=comment.pk))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, len(HAM) - 1)
+        self.assertNotContains(self.client.get(self.url), comment.body)
+        self.assertEqual(SpamFilter.objects.count(), 1)
+
+    def test_command_scores_pending_comments(self):
+        """
+        `score_comments --once` scores everything pending and exits.
+        """
+        Comment.objects.create(
+            post=self.post, author="Reader", body="Hello", status=Comment.PENDING
+        )
+        out = StringIO()
+        call_command("score_comments", "--once", stdout=out)
+        self.assertIn("Scored 1 comment(s) in total.", out.getvalue())
+        self.assertFalse(Comment.objects.filter(status=Comment.PENDING).exists())
@@ -0,0 +1,191 @@
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog import comment_queue
+from blog.models import Comment, Post
+
+
+class CommentThreadTest(TestCase):
+    """
+    Tests for threaded `blog.Comment` replies.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        cls.post = Post.objects.create(
+            title="Test Post",
+            body="Test body",
+            author=author,
+        )
+        cls.other_post = Post.objects.create(
+            title="Other Post",
+            body="Other body",
+            author=author,
+        )
+        # first
+        #   first.1
+        #     first.1.1
+        #   first.2
+        # second
+        cls.first = cls.reply("first")
+        cls.first_1 = cls.reply("first.1", cls.first)
+        cls.second = cls.reply("second")
+        cls.first_2 = cls.reply("first.2", cls.first)
+        cls.first_1_1 = cls.reply("first.1.1", cls.first_1)
+
+    @classmethod
+    def reply(cls, body, parent=None):
+        return Comment.objects.create(
+            post=cls.post, author="Reader", body=body, parent=parent
+        )
+
+    def bodies(self, comments):
+        return [comment.body for comment in comments]
+
+    def test_path_and_depth(self):
+        """
+        A reply's path extends its parent's, one segment per level.
+        """
+        self.assertEqual(self.first.path, f"{self.first.pk:010d}")
+        self.assertTrue(self.first_1_1.path.startswith(self.first_1.path))
+        self.assertEqual(
+            [self.first.depth, self.first_1.depth, self.first_1_1.depth], [0, 1, 2]
+        )
+
+    def test_thread_is_subtree_in_depth_first_order(self):
+        """
+        `Comment.thread()` returns a comment and all its replies, each
+        followed by its own replies.
+        """
+        self.assertEqual(
+            self.bodies(self.first.thread().order_by("path")),
+            ["first", "first.1", "first.1.1", "first.2"],
+        )
+        self.assertEqual(self.bodies(self.second.thread()), ["second"])
+
+    def test_blog_detail_shows_replies_under_their_parent(self):
+        """
+        `blog_detail` lists every thread depth first.
+        """
+        response = self.client.get(
+            reverse("blog:blog-detail", kwargs={"pk": self.post.pk})
+        )
+        self.assertEqual(
+            self.bodies(response.context["comments"]),
+            ["first", "first.1", "first.1.1", "first.2", "second"],
+        )
+        self.assertContains(
+            response,
+            reverse(
+                "blog:comment-thread",
+                kwargs={"pk": self.post.pk, "comment_pk": self.first_1.pk},
+            ),
+        )
+
+    def test_blog_detail_query_count_does_not_grow_with_threads(self):
+        """
+        Deep and wide threads render in the same number of queries.
+        """
+        parent = self.first_1_1
+        for number in range(5):
+            parent = self.reply(f"deep {number}", parent)
+            self.reply(f"wide {number}", self.second)
+        with self.assertNumQueries(4):
+            self.client.get(reverse("blog:blog-detail", kwargs={"pk": self.post.pk}))
+
+    @override_settings(BLOG_COMMENTS_PER_PAGE=2)
+    def test_comment_thread_view_pages_subtree(self):
+        """
+        `comment_thread` shows one subtree, paged with cursors, in three
+        queries.
+        """
+        url = reverse(
+            "blog:comment-thread",
+            kwargs={"pk": self.post.pk, "comment_pk": self.first.pk},
+        )
+        with self.assertNumQueries(3):
+            first = self.client.get(url)
+        second = self.client.get(
+            url, {"comments_after": first.context["comment_page"].next_cursor}
+        )
+        self.assertEqual(self.bodies(first.context["comments"]), ["first", "first.1"])
+        self.assertEqual(
+            self.bodies(second.context["comments"]), ["first.1.1", "first.2"]
+        )
+        self.assertFalse(second.context["comment_page"].has_next())
+        self.assertContains(first, f'value="{self.first.pk}"')
+
+    def test_comment_thread_view_hides_unapproved_and_foreign_comments(self):
+        """
+        Threads of comments that aren't shown, or belong to another post,
+        are not found.
+        """
+        Comment.objects.filter(pk=self.second.pk).update(status=Comment.REJECTED)
+        for post, comment in [(self.post, self.second), (self.other_post, self.first)]:
+            response = self.client.get(
+                reverse(
+                    "blog:comment-thread",
+                    kwargs={"pk": post.pk, "comment_pk": comment.pk},
+                )
+            )
+            self.assertEqual(response.status_code, 404)
+
+    def test_post_reply(self):
+        """
+        Submitting the form with `parent` adds a reply to that comment.
+        """
+        response = self.client.post(
+            reverse("blog:blog-detail", kwargs={"pk": self.post.pk}),
+            {"author": "Replier", "body": "A reply", "parent": self.first_2.pk},
+        )
+        self.assertEqual(response.status_code, 302)
+        reply = Comment.objects.get(body="A reply")
+        self.assertEqual(reply.parent, self.first_2)
+        self.assertEqual(reply.path, Comment.child_path(self.first_2.path, reply.pk))
+
+    def test_reply_to_comment_on_other_post_is_rejected(self):
+        """
+        Replies must stay within the post.
+        """
+        response = self.client.post(
+            reverse("blog:blog-detail", kwargs={"pk": self.other_post.pk}),
+            {"author": "Replier", "body": "A reply", "parent": self.first.pk},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "can&#x27;t be replied to")
+        self.assertFalse(Comment.objects.filter(body="A reply").exists())
+
+    @override_settings(BLOG_COMMENT_MAX_DEPTH=2)
+    def test_reply_beyond_max_depth_is_rejected(self):
+        """
+        Threads can't grow deeper than `BLOG_COMMENT_MAX_DEPTH`.
+        """
+        response = self.client.post(
+            reverse("blog:blog-detail", kwargs={"pk": self.post.pk}),
+            {"author": "Replier", "body": "A reply", "parent": self.first_1_1.pk},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Comment.objects.filter(body="A reply").exists())
+
+    def test_queued_reply_gets_thread_path(self):
+        """
+        Replies applied by `process_comment_queue` are placed in the thread.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(BLOG_COMMENT_QUEUE_DIR=directory):
+                comment_queue.enqueue(
+                    self.post.pk, "Replier", "Queued reply", parent_id=self.first.pk
+                )
+                with self.captureOnCommitCallbacks(execute=True):
+                    comment_queue.process_batch(100)
+        self.assertEqual(
+            self.bodies(self.first.thread().order_by("path")),
+            ["first", "first.1", "first.1.1", "first.2", "Queued reply"],
+        )
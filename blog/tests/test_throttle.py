@@ -0,0 +1,211 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog import duplicates, throttle
+from blog.models import Comment, Post
+
+COMMENT = (
+    "Knapping flint takes patience, a good hammerstone and a steady hand "
+    "to get long thin flakes off the core."
+)
+
+
+@override_settings(
+    BLOG_COMMENT_THROTTLE_ENABLED=True,
+    BLOG_COMMENT_DUPLICATE_DISTANCE=3,
+    BLOG_COMMENT_DUPLICATE_WINDOW=600,
+)
+class DuplicatesTest(SimpleTestCase):
+    """
+    Tests for `blog.duplicates`.
+    """
+
+    def setUp(self):
+        cache = caches[settings.BLOG_COMMENT_THROTTLE_CACHE]
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_similar_texts_have_close_fingerprints(self):
+        """
+        Changing a word flips far fewer bits than an unrelated text.
+        """
+        original = duplicates.simhash(COMMENT)
+        edited = duplicates.simhash(COMMENT.replace("steady", "calm"))
+        other = duplicates.simhash("Projects written in Django and Python.")
+        self.assertLess(
+            (original ^ edited).bit_count(), (original ^ other).bit_count()
+        )
+
+    def test_repeated_comment_is_duplicate(self):
+        """
+        The same text, differing in case and punctuation, is caught.
+        """
+        self.assertFalse(duplicates.is_duplicate(COMMENT, 1, now=100))
+        self.assertTrue(duplicates.is_duplicate(COMMENT.upper() + "!!", 1, now=101))
+        self.assertEqual(duplicates.dropped(), 1)
+
+    def test_different_comment_is_not_duplicate(self):
+        """
+        Unrelated comments pass.
+        """
+        self.assertFalse(duplicates.is_duplicate(COMMENT, 1, now=100))
+        self.assertFalse(
+            duplicates.is_duplicate(
+                "Which stone works best for beginners?", 1, now=101
+            )
+        )
+
+    def test_duplicates_are_checked_per_post(self):
+        """
+        The same comment on another post is not a repeat.
+        """
+        self.assertFalse(duplicates.is_duplicate(COMMENT, 1, now=100))
+        self.assertFalse(duplicates.is_duplicate(COMMENT, 2, now=101))
+
+    def test_short_comments_are_never_duplicates(self):
+        """
+        Texts too short to fingerprint reliably always pass.
+        """
+        for _ in range(2):
+            self.assertFalse(duplicates.is_duplicate("Thanks!", 1, now=100))
+            self.assertFalse(duplicates.is_duplicate("Great post, thanks", 1, now=100))
+
+    def test_duplicates_expire(self):
+        """
+        A text may be repeated once the window has passed.
+        """
+        self.assertFalse(duplicates.is_duplicate(COMMENT, 1, now=100))
+        self.assertFalse(duplicates.is_duplicate(COMMENT, 1, now=800))
+
+
+class ClientIpTest(SimpleTestCase):
+    """
+    Tests for `throttle.client_ip`.
+    """
+
+    def test_remote_addr_without_proxies(self):
+        """
+        `X-Forwarded-For` is ignored unless proxies are trusted.
+        """
+        request = RequestFactory().get(
+            "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="1.2.3.4"
+        )
+        with override_settings(TRUSTED_PROXY_COUNT=0):
+            self.assertEqual(throttle.client_ip(request), "10.0.0.1")
+
+    def test_forwarded_address_behind_proxy(self):
+        """
+        Behind one proxy the last forwarded address is the client's; earlier
+        entries may be forged.
+        """
+        request = RequestFactory().get(
+            "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="6.6.6.6, 1.2.3.4"
+        )
+        with override_settings(TRUSTED_PROXY_COUNT=1):
+            self.assertEqual(throttle.client_ip(request), "1.2.3.4")
+
+    def test_blank_forwarded_entries_are_skipped(self):
+        """
+        Empty and whitespace-only entries don't count as proxies.
+        """
+        request = RequestFactory().get(
+            "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="1.2.3.4, , "
+        )
+        with override_settings(TRUSTED_PROXY_COUNT=1):
+            self.assertEqual(throttle.client_ip(request), "1.2.3.4")
+
+
+@override_settings(
+    BLOG_COMMENT_THROTTLE_ENABLED=True,
+    BLOG_COMMENT_RATE_LIMITS={
+        "ip": {"rate": 0.001, "capacity": 5},
+        "post": {"rate": 0.001, "capacity": 1},
+    },
+)
+class RetryAfterTest(SimpleTestCase):
+    """
+    Tests for `throttle.retry_after`.
+    """
+
+    def setUp(self):
+        cache = caches[settings.BLOG_COMMENT_THROTTLE_CACHE]
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_rejected_comment_spends_no_token(self):
+        """
+        A comment rejected by the post's bucket spends nothing from the IP's.
+        """
+        request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(throttle.retry_after(request, 1), 0)
+        for _ in range(3):
+            self.assertGreater(throttle.retry_after(request, 1), 0)
+        ip_bucket = throttle.buckets()["ip"]
+        tokens, _ = ip_bucket.cache.get(ip_bucket.cache_key("10.0.0.1"))
+        self.assertEqual(tokens, 4)
+        self.assertEqual(throttle.dropped()["post"], 3)
+        self.assertEqual(throttle.dropped()["ip"], 0)
+
+
+@override_settings(
+    BLOG_COMMENT_THROTTLE_ENABLED=True,
+    BLOG_COMMENT_RATE_LIMITS={
+        "ip": {"rate": 0.001, "capacity": 2},
+        "post": {"rate": 0.001, "capacity": 100},
+    },
+)
+class CommentThrottleViewTest(TestCase):
+    """
+    Tests for throttling in the `blog_detail` view.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+            is_staff=True,
+        )
+        cls.author = author
+        cls.post = Post.objects.create(title="Test Post", body="Body", author=author)
+
+    def setUp(self):
+        cache = caches[settings.BLOG_COMMENT_THROTTLE_CACHE]
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.url = reverse("blog:blog-detail", kwargs={"pk": self.post.pk})
+
+    def test_flood_is_rejected_without_queries(self):
+        """
+        Once an IP's bucket is empty, comments get a 429 before any query.
+        """
+        for number in range(2):
+            self.client.post(self.url, {"author": "A", "body": f"Comment {number}"})
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, {"author": "A", "body": "More"})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_duplicate_comment_is_rejected(self):
+        """
+        A repeated comment is answered with a form error and not saved.
+        """
+        self.client.post(self.url, {"author": "A", "body": COMMENT})
+        response = self.client.post(self.url, {"author": "B", "body": COMMENT})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "This comment repeats a recent comment.")
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_drop_counters_are_exposed_to_staff(self):
+        """
+        `comment-throttle-stats` reports rejected comments per reason.
+        """
+        for number in range(3):
+            self.client.post(self.url, {"author": "A", "body": f"Comment {number}"})
+        self.client.force_login(self.author)
+        stats = self.client.get(reverse("blog:comment-throttle-stats")).json()
+        self.assertEqual(stats, {"ip": 1, "post": 0, "duplicate": 0})
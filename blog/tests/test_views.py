@@ -1,4 +1,5 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from blog.models import (
@@ -79,7 +80,7 @@ class BlogCategoryViewTest(TestCase):
         location.
         """
         response = self.client.get(
-            f"/blog/{self.test_category_01.name}/")
+            f"/blog/category/{self.test_category_01.slug}/")
         self.assertEqual(response.status_code, 200)
 
     def test_blog_category_view_url_accessible_by_name(self):
@@ -90,7 +91,7 @@ class BlogCategoryViewTest(TestCase):
         response = self.client.get(
             reverse(
                 "blog:blog-category",
-                kwargs={'category': self.test_category_01.name})
+                kwargs={'slug': self.test_category_01.slug})
         )
         self.assertEqual(response.status_code, 200)
 
@@ -101,7 +102,7 @@ class BlogCategoryViewTest(TestCase):
         response = self.client.get(
             reverse(
                 "blog:blog-category",
-                kwargs={'category': self.test_category_01.name})
+                kwargs={'slug': self.test_category_01.slug})
         )
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "blog/blog_category.html")
@@ -113,7 +114,7 @@ class BlogCategoryViewTest(TestCase):
         response = self.client.get(
             reverse(
                 "blog:blog-category",
-                kwargs={'category': self.test_category_01.name})
+                kwargs={'slug': self.test_category_01.slug})
         )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(
@@ -127,14 +128,113 @@ class BlogCategoryViewTest(TestCase):
         response = self.client.get(
             reverse(
                 "blog:blog-category",
-                kwargs={'category': self.test_category_01.name})
+                kwargs={'slug': self.test_category_01.slug})
         )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(
-            response.context["category"], self.test_category_01.name)
+            response.context["category"], self.test_category_01)
         self.assertEqual(
             response.context["posts"][0].title, self.test_post_01.title)
 
+    def test_blog_category_view_matches_exact_category_only(self):
+        """
+        Test that a category page does not include posts of categories
+        whose names merely contain the same text.
+        """
+        other_category = Category.objects.create(name="Test Category 011")
+        Post.objects.create(
+            title="Other Post",
+            body="Other Post Body",
+            author=self.author_01,
+        ).categories.add(other_category)
+        response = self.client.get(self.test_category_01.get_absolute_url())
+        self.assertEqual(
+            [post.title for post in response.context["posts"]],
+            [self.test_post_01.title],
+        )
+
+    def test_blog_category_view_unknown_slug_returns_404(self):
+        """
+        Test that an unknown slug returns a 404.
+        """
+        response = self.client.get(
+            reverse("blog:blog-category", kwargs={"slug": "no-such-category"})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class BlogCategoryLegacyViewTest(TestCase):
+    """
+    Test the redirects from old name-based category URLs.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_category_01 = Category.objects.create(name="Web Design")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_legacy_url_redirects_permanently_to_slug_url(self):
+        """
+        Test that `/blog/<name>/` answers with a cacheable 301.
+        """
+        response = self.client.get("/blog/Web Design/")
+        self.assertRedirects(
+            response,
+            "/blog/category/web-design/",
+            status_code=301,
+        )
+        self.assertIn("max-age=", response["Cache-Control"])
+
+    def test_legacy_url_lookup_is_cached(self):
+        """
+        Test that repeated requests for the same old URL skip the database.
+        """
+        self.client.get("/blog/web design/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/blog/web design/")
+        self.assertEqual(response.status_code, 301)
+
+    def test_misses_are_not_cached(self):
+        """
+        Test that a category created after a miss is found at once.
+        """
+        self.assertEqual(self.client.get("/blog/Game Design/").status_code, 404)
+        Category.objects.create(name="Game Design")
+        self.assertRedirects(
+            self.client.get("/blog/Game Design/"),
+            "/blog/category/game-design/",
+            status_code=301,
+        )
+
+    def test_saved_and_deleted_categories_drop_cached_lookups(self):
+        """
+        Test that renamed, reslugged and deleted categories aren't
+        redirected to from stale cached lookups.
+        """
+        self.client.get("/blog/Web Design/")
+        self.test_category_01.slug = "web"
+        self.test_category_01.save()
+        self.assertRedirects(
+            self.client.get("/blog/Web Design/"),
+            "/blog/category/web/",
+            status_code=301,
+        )
+        self.test_category_01.name = "Design"
+        self.test_category_01.save()
+        self.assertEqual(self.client.get("/blog/Web Design/").status_code, 404)
+        self.client.get("/blog/Design/")
+        self.test_category_01.delete()
+        self.assertEqual(self.client.get("/blog/Design/").status_code, 404)
+
+    def test_legacy_url_for_partial_name_returns_404(self):
+        """
+        Test that substrings of a category name no longer match.
+        """
+        response = self.client.get("/blog/Web/")
+        self.assertEqual(response.status_code, 404)
+
 
 class BlogDetailViewTest(TestCase):
     """
@@ -201,6 +301,28 @@ class BlogDetailViewTest(TestCase):
             1,
         )
 
+    def test_commenter_is_redirected_past_shared_caches(self):
+        """
+        Test that a commenter is sent back to a URL no cache has seen, and
+        that the page there isn't kept by shared caches.
+        """
+        url = reverse("blog:blog-detail", kwargs={'pk': self.test_post_01.id})
+        response = self.client.post(
+            url, data={"author": "Test Author", "body": "Test Comment Body"}
+        )
+        location = response["Location"]
+        self.assertTrue(location.startswith(f"{url}?posted="))
+        self.assertTrue(location.endswith("#comments"))
+        again = self.client.post(
+            url, data={"author": "Test Author", "body": "Another Comment"}
+        )
+        self.assertNotEqual(again["Location"], location)
+        self.assertIn("public", self.client.get(url)["Cache-Control"])
+        response = self.client.get(location)
+        self.assertContains(response, "Test Comment Body")
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("no-cache", response["Cache-Control"])
+
     def test_blog_detail_view_uses_correct_template(self):
         """
         Test that the `blog_detail` view uses the correct template.
@@ -231,3 +353,167 @@ class BlogDetailViewTest(TestCase):
         response = self.client.get(
             reverse("blog:blog-detail", kwargs={'pk': self.test_post_01.id}))
         self.assertEqual(response.status_code, 200)
+
+
+class BlogIndexPaginationTest(TestCase):
+    """
+    Test the cursor pagination of the `blog_index` view.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create more posts than fit on one page.
+        """
+        cls.author_01 = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        for number in range(5):
+            Post.objects.create(
+                title=f"Test Post {number}",
+                body="Test Post Body",
+                author=cls.author_01,
+            )
+
+    @override_settings(BLOG_POSTS_PER_PAGE=2)
+    def test_blog_index_view_limits_posts_per_page(self):
+        """
+        Test that `blog_index` shows at most `BLOG_POSTS_PER_PAGE` posts.
+        """
+        response = self.client.get(reverse("blog:index"))
+        self.assertEqual(len(response.context["posts"]), 2)
+        self.assertTrue(response.context["page"].has_next())
+        self.assertContains(response, "?after=")
+
+    @override_settings(BLOG_POSTS_PER_PAGE=2)
+    def test_blog_index_view_follows_next_cursor(self):
+        """
+        Test that the `after` cursor selects the following page.
+        """
+        first = self.client.get(reverse("blog:index"))
+        second = self.client.get(
+            reverse("blog:index"),
+            {"after": first.context["page"].next_cursor},
+        )
+        first_titles = [post.title for post in first.context["posts"]]
+        second_titles = [post.title for post in second.context["posts"]]
+        self.assertEqual(first_titles, ["Test Post 4", "Test Post 3"])
+        self.assertEqual(second_titles, ["Test Post 2", "Test Post 1"])
+        self.assertTrue(second.context["page"].has_previous())
+
+
+class BlogListQueryCountTest(TestCase):
+    """
+    Test that the blog list views render in a constant number of queries.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create several posts, each with several categories.
+        """
+        cls.author_01 = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        cls.categories = [
+            Category.objects.create(name=f"Category {number}") for number in range(3)
+        ]
+        for number in range(6):
+            post = Post.objects.create(
+                title=f"Test Post {number}",
+                body="Test Post Body",
+                author=cls.author_01,
+            )
+            post.categories.set(cls.categories)
+
+    def test_blog_index_view_defers_body(self):
+        """
+        Test that list pages don't load the full `body`.
+        """
+        response = self.client.get(reverse("blog:index"))
+        for post in response.context["posts"]:
+            self.assertIn("body", post.get_deferred_fields())
+
+    def test_blog_index_view_query_count(self):
+        """
+        Test that `blog_index` fetches posts, authors and categories in two
+        queries, and the archive widget's month counts in one more.
+        """
+        with self.assertNumQueries(3):
+            self.client.get(reverse("blog:index"))
+
+    def test_blog_category_view_query_count(self):
+        """
+        Test that `blog_category` fetches the category, then posts, authors
+        and categories in three queries.
+        """
+        with self.assertNumQueries(3):
+            self.client.get(
+                reverse(
+                    "blog:blog-category",
+                    kwargs={"slug": self.categories[0].slug},
+                )
+            )
+
+
+class BlogDetailCommentPaginationTest(TestCase):
+    """
+    Test the cursor pagination of comments on the `blog_detail` view.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_01 = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        cls.test_post_01 = Post.objects.create(
+            title="Test Post Title",
+            body="Test Post Body",
+            author=cls.author_01,
+        )
+        for number in range(5):
+            Comment.objects.create(
+                post=cls.test_post_01,
+                author=f"Commenter {number}",
+                body=f"Comment {number}",
+            )
+
+    @override_settings(BLOG_COMMENTS_PER_PAGE=2)
+    def test_blog_detail_view_pages_comments_oldest_first(self):
+        """
+        Test that comments are shown oldest first, a page at a time.
+        """
+        url = reverse("blog:blog-detail", kwargs={"pk": self.test_post_01.pk})
+        first = self.client.get(url)
+        second = self.client.get(
+            url, {"comments_after": first.context["comment_page"].next_cursor}
+        )
+        self.assertEqual(
+            [comment.body for comment in first.context["comments"]],
+            ["Comment 0", "Comment 1"],
+        )
+        self.assertEqual(
+            [comment.body for comment in second.context["comments"]],
+            ["Comment 2", "Comment 3"],
+        )
+        self.assertContains(first, "?comments_after=")
+        self.assertContains(first, "Comments (5):")
+
+    def test_blog_detail_view_query_count(self):
+        """
+        Test that the detail page needs four queries however many comments
+        and related posts the post has.
+        """
+        url = reverse("blog:blog-detail", kwargs={"pk": self.test_post_01.pk})
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+    def test_blog_detail_view_unknown_post_returns_404(self):
+        """
+        Test that a missing post returns a 404.
+        """
+        response = self.client.get(reverse("blog:blog-detail", kwargs={"pk": 999}))
+        self.assertEqual(response.status_code, 404)
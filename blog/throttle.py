@@ -0,0 +1,79 @@
+# blog/throttle.py
+"""
+Rate limits and duplicate suppression for comment submissions, checked
+before `blog_detail` touches the database. Every visitor IP and every post
+has its own token bucket, configured by `settings.BLOG_COMMENT_RATE_LIMITS`.
+
+Every comment POST writes to the buckets and `blog.duplicates`, so both
+are kept in the `settings.BLOG_COMMENT_THROTTLE_CACHE` cache, which must be
+a fast one shared by every worker process (Redis), never the database cache.
+A local-memory cache would give each process its own buckets.
+"""
+import time
+
+from django.conf import settings
+
+from base.ratelimit import TokenBucket
+from blog import duplicates
+
+
+def buckets():
+    return {
+        scope: TokenBucket(
+            f"comments:{scope}", alias=settings.BLOG_COMMENT_THROTTLE_CACHE, **limit
+        )
+        for scope, limit in settings.BLOG_COMMENT_RATE_LIMITS.items()
+    }
+
+
+def client_ip(request):
+    """
+    Return the visitor's IP address. Behind `settings.TRUSTED_PROXY_COUNT`
+    proxies it is the address the outermost proxy saw, taken from the end
+    of `X-Forwarded-For` where clients can't forge it.
+    """
+    proxies = settings.TRUSTED_PROXY_COUNT
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    addresses = [address.strip() for address in forwarded.split(",")]
+    addresses = [address for address in addresses if address]
+    if proxies and len(addresses) >= proxies:
+        return addresses[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def retry_after(request, post_id):
+    """
+    Spend a token for a comment on `post_id` from the visitor's IP and from
+    the post. Returns `0` if the comment may be processed, otherwise the
+    seconds to wait; a rejected comment spends no token from any bucket.
+    """
+    if not settings.BLOG_COMMENT_THROTTLE_ENABLED:
+        return 0
+    keys = {"ip": client_ip(request), "post": post_id}
+    limits = buckets()
+    now = time.time()
+    waits = {scope: bucket.wait(keys[scope], now) for scope, bucket in limits.items()}
+    if any(waits.values()):
+        for scope, wait in waits.items():
+            if wait:
+                limits[scope].drop()
+        return max(waits.values())
+    return max(bucket.consume(keys[scope], now) for scope, bucket in limits.items())
+
+
+def is_duplicate(body, post_id):
+    """
+    Return `True` if `body` nearly repeats a recent comment on `post_id`.
+    """
+    return settings.BLOG_COMMENT_THROTTLE_ENABLED and duplicates.is_duplicate(
+        body, post_id
+    )
+
+
+def dropped():
+    """
+    Number of comments each limit, and the duplicate check, has rejected.
+    """
+    counts = {scope: bucket.dropped() for scope, bucket in buckets().items()}
+    counts["duplicate"] = duplicates.dropped()
+    return counts
@@ -6,5 +6,46 @@ app_name = 'blog'
 urlpatterns = [
     path('', views.blog_index, name='index'),
     path('<int:pk>/', views.blog_detail, name='blog-detail'),
-    path('<category>/', views.blog_category, name='blog-category'),
+    path('feed/<str:feed_format>/', views.post_feed, name='post-feed'),
+    path(
+        '<int:pk>/comments/<int:comment_pk>/',
+        views.comment_thread,
+        name='comment-thread',
+    ),
+    path(
+        '<int:pk>/comments/pending/',
+        views.pending_comments,
+        name='pending-comments',
+    ),
+    path(
+        'comments/throttle/',
+        views.comment_throttle_stats,
+        name='comment-throttle-stats',
+    ),
+    path(
+        'archive/<int:year>/',
+        views.archive_year,
+        name='archive-year',
+    ),
+    path(
+        'archive/<int:year>/<int:month>/',
+        views.archive_month,
+        name='archive-month',
+    ),
+    path(
+        'category/<slug:slug>/',
+        views.blog_category,
+        name='blog-category',
+    ),
+    path(
+        'category/<slug:slug>/feed/<str:feed_format>/',
+        views.category_feed,
+        name='category-feed',
+    ),
+    # Category pages used to be addressed by name; redirect them.
+    path(
+        '<category>/',
+        views.blog_category_legacy,
+        name='blog-category-legacy',
+    ),
 ]
@@ -1,62 +1,469 @@
-from django.shortcuts import render, redirect
+import math
+import uuid
 
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Count, Max, Prefetch
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.formats import date_format
+from django.utils.text import slugify
+
+from base.feeds import CHUNK_ITEMS, feed_response
+from base.page_cache import add_cache_tags, cache_anonymous_page, object_tags
+from base.single_flight import fetch
 from config.settings import THE_SITE_NAME
-from blog.models import Post, Comment
+from blog import archive, comment_queue, throttle
+from blog.models import Category, Post, Comment, RelatedPost
 from blog.forms import CommentForm
+from blog.pagination import KeysetPaginator
+
+
+def with_list_relations(posts):
+    """
+    Fetch the `author` and `categories` of `posts` up front so the list
+    templates render in a constant number of queries. The full `body` is
+    deferred; list templates show the precomputed `excerpt`.
+    """
+    return posts.defer("body").select_related("author").prefetch_related(
+        Prefetch(
+            "categories",
+            queryset=Category.objects.only("id", "name", "slug"),
+        )
+    )
+
+
+def paginate_posts(request, posts):
+    """
+    Return the page of `posts` selected by the `after` / `before` cursors
+    in the query string.
+    """
+    paginator = KeysetPaginator(posts, settings.BLOG_POSTS_PER_PAGE)
+    return paginator.get_page(
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
+
+
+def paginate_comments(request, comments):
+    """
+    Return the page of approved `comments`, in thread order, selected by
+    the `comments_after` / `comments_before` cursors. Each page is one range
+    scan of the `(post, status, path)` index, replies included.
+    """
+    paginator = KeysetPaginator(
+        comments.filter(status=Comment.APPROVED),
+        settings.BLOG_COMMENTS_PER_PAGE,
+        keys=("path",),
+        descending=False,
+    )
+    return paginator.get_page(
+        after=request.GET.get("comments_after"),
+        before=request.GET.get("comments_before"),
+    )
+
+
+def reply_parent(post, parent_id):
+    """
+    Return the approved `blog.Comment` on `post` with `parent_id` that can
+    be replied to, or `None`.
+    """
+    return (
+        Comment.objects.filter(pk=parent_id, post=post, status=Comment.APPROVED)
+        .only("pk", "post_id", "path")
+        .first()
+    )
+
 
+def add_post_list_tags(request, posts):
+    """
+    Tag a cached list page with the posts and categories it shows.
+    """
+    add_cache_tags(request, *object_tags("post", posts))
+    for post in posts:
+        add_cache_tags(request, *object_tags("category", post.categories.all()))
 
+
+@cache_anonymous_page("blog:index")
 def blog_index(request):
     """
     View for the `blog.Post` list view.
     """
-    posts = Post.objects.all().order_by("-date_posted")
+    page = paginate_posts(request, with_list_relations(Post.objects.all()))
+    add_cache_tags(request, "posts")
+    add_post_list_tags(request, page.object_list)
     context = {
         "the_site_name": THE_SITE_NAME,
         "page_title": "Knappings",
-        "posts": posts,
+        "posts": page.object_list,
+        "page": page,
+        "archive_months": archive.months(),
     }
     return render(request, "blog/blog_index.html", context)
 
 
-def blog_category(request, category):
+@cache_anonymous_page("blog:blog-category")
+def blog_category(request, slug):
     """
-    View for the `blog.Post` list view filtered by `category`.
+    View for the `blog.Post` list view filtered by `blog.Category` `slug`.
     """
-    posts = Post.objects.filter(categories__name__icontains=category).order_by(
-        "-date_posted"
-    )
+    category = get_object_or_404(Category, slug=slug)
+    page = paginate_posts(request, with_list_relations(category.posts.all()))
+    add_cache_tags(request, f"category:{category.pk}")
+    add_post_list_tags(request, page.object_list)
     context = {
         "the_site_name": THE_SITE_NAME,
         "page_title": "Flynnt Knappings",
         "category": category,
-        "posts": posts,
+        "posts": page.object_list,
+        "page": page,
     }
     return render(request, "blog/blog_category.html", context)
 
 
+def archive_page(request, start, end, months, heading):
+    """
+    Render the posts published from `start` until `end` under `heading`,
+    with the archive widget's `months`.
+    """
+    posts = with_list_relations(archive.posts_between(start, end))
+    page = paginate_posts(request, posts)
+    # The rollup only changes when posts are added or removed, which bumps
+    # "posts".
+    add_cache_tags(request, "posts")
+    add_post_list_tags(request, page.object_list)
+    context = {
+        "the_site_name": THE_SITE_NAME,
+        "page_title": "Knappings",
+        "heading": heading,
+        "posts": page.object_list,
+        "page": page,
+        "archive_months": months,
+    }
+    return render(request, "blog/blog_archive.html", context)
+
+
+@cache_anonymous_page("blog:archive-year")
+def archive_year(request, year):
+    """
+    View for the `blog.Post`s published in `year`.
+    """
+    months = archive.months()
+    try:
+        start, end = archive.year_bounds(year)
+    except ValueError:
+        raise Http404("No such year.")
+    if not any(month.year == year for month in months):
+        raise Http404("No posts in this year.")
+    return archive_page(request, start, end, months, str(year))
+
+
+@cache_anonymous_page("blog:archive-month")
+def archive_month(request, year, month):
+    """
+    View for the `blog.Post`s published in `month` of `year`.
+    """
+    months = archive.months()
+    try:
+        start, end = archive.month_bounds(year, month)
+    except ValueError:
+        raise Http404("No such month.")
+    if not any((row.year, row.month) == (year, month) for row in months):
+        raise Http404("No posts in this month.")
+    return archive_page(
+        request, start, end, months, date_format(start, "YEAR_MONTH_FORMAT")
+    )
+
+
+def post_feed_items(request, posts):
+    """
+    Yield the feed items of `posts`, newest first, fetched in chunks so
+    the archive is never loaded at once.
+    """
+    posts = (
+        posts.select_related("author")
+        .only("id", "title", "excerpt", "date_posted", "author__username")
+        .prefetch_related(
+            Prefetch("categories", queryset=Category.objects.only("id", "name"))
+        )
+        .order_by("-date_posted", "-id")
+    )
+    for post in posts.iterator(chunk_size=CHUNK_ITEMS):
+        yield {
+            "title": post.title,
+            "link": request.build_absolute_uri(post.get_absolute_url()),
+            "description": post.excerpt,
+            "pubdate": post.date_posted,
+            "author_name": str(post.author),
+            "categories": [category.name for category in post.categories.all()],
+        }
+
+
+def post_feed_response(request, feed_format, posts, tags, **feed_kwargs):
+    """
+    Return the `feed_format` feed of `posts`; see `base.feeds`.
+    """
+    stats = posts.aggregate(latest=Max("date_posted"), count=Count("id"))
+    return feed_response(
+        request,
+        feed_format,
+        items=post_feed_items(request, posts),
+        last_modified=stats["latest"],
+        count=stats["count"],
+        tags=tags,
+        feed_url=request.build_absolute_uri(),
+        **feed_kwargs,
+    )
+
+
+def post_feed(request, feed_format):
+    """
+    Atom or RSS feed of every `blog.Post`.
+    """
+    return post_feed_response(
+        request,
+        feed_format,
+        Post.objects.all(),
+        ["post-feed"],
+        title=f"{THE_SITE_NAME} - Knappings",
+        link=request.build_absolute_uri(reverse("blog:index")),
+        description="Every post on the blog.",
+    )
+
+
+def category_feed(request, slug, feed_format):
+    """
+    Atom or RSS feed of the `blog.Post`s in a `blog.Category`.
+    """
+    category = get_object_or_404(Category.objects.only("id", "name", "slug"), slug=slug)
+    return post_feed_response(
+        request,
+        feed_format,
+        category.posts.all(),
+        ["post-feed", f"category:{category.pk}"],
+        title=f"{THE_SITE_NAME} - {category.name}",
+        link=request.build_absolute_uri(category.get_absolute_url()),
+        description=f"Posts in {category.name}.",
+    )
+
+
+def legacy_category_slug(name):
+    """
+    Return the `slug` of the `blog.Category` an old name-based URL refers
+    to, or `None`. Lookups are cached since crawlers keep requesting old
+    URLs long after they have moved; misses aren't, so a new category is
+    found at once, and `blog.signals` drops the entries of a category when
+    it is saved or deleted.
+    """
+
+    def lookup():
+        category = (
+            Category.objects.filter(name__iexact=name).only("slug").first()
+            or Category.objects.filter(slug=slugify(name)).only("slug").first()
+        )
+        return category.slug if category else ""
+
+    slug, _ = fetch(
+        Category.legacy_cache_key(name),
+        lookup,
+        settings.BLOG_LEGACY_CATEGORY_CACHE_SECONDS,
+        cacheable=bool,
+    )
+    return slug or None
+
+
+# Query parameter making the page a commenter is redirected to unique, so
+# no shared or browser cache can answer it with a copy from before the POST.
+POSTED_PARAMETER = "posted"
+
+
+def posted_redirect(post):
+    """
+    Redirect the author of a comment back to the comments of `post`.
+    """
+    url = reverse("blog:blog-detail", kwargs={"pk": post.pk})
+    return redirect(f"{url}?{POSTED_PARAMETER}={uuid.uuid4().hex}#comments")
+
+
+def patch_shared_cache_control(request, response):
+    """
+    Let shared caches keep `response` for a while, unless it is the page a
+    commenter was sent back to by `posted_redirect`, which must be fresh.
+    """
+    if POSTED_PARAMETER in request.GET:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.BLOG_DETAIL_SHARED_CACHE_SECONDS,
+        )
+
+
+def blog_category_legacy(request, category):
+    """
+    Permanently redirect old `/blog/<category name>/` URLs to the
+    slug-based category page.
+    """
+    slug = legacy_category_slug(category)
+    if slug is None:
+        raise Http404("No Category matches the given query.")
+    response = redirect("blog:blog-category", slug=slug, permanent=True)
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=settings.BLOG_LEGACY_CATEGORY_CACHE_SECONDS,
+    )
+    return response
+
+
+@cache_anonymous_page("blog:blog-detail", shared=True)
 def blog_detail(request, pk):
     """
     View for the `blog.Post` detail view.
+
+    The page doesn't depend on the visitor: the navbar links and the
+    comment form's CSRF token are fetched from `session_fragment`, so a GET
+    never touches the session and the page can be kept by shared caches.
     """
-    post = Post.objects.get(pk=pk)
+    if request.method == "POST":
+        # Floods are turned away before anything reaches the database.
+        wait = throttle.retry_after(request, pk)
+        if wait:
+            response = HttpResponse(
+                "Too many comments, please try again later.", status=429
+            )
+            response["Retry-After"] = math.ceil(wait)
+            return response
+
+    post = get_object_or_404(
+        Post.objects.select_related("author").prefetch_related("categories"),
+        pk=pk,
+    )
 
     form = CommentForm(request.POST or None)
     if request.method == "POST":
+        parent = None
+        if form.is_valid() and form.cleaned_data["parent"]:
+            parent = reply_parent(post, form.cleaned_data["parent"])
+            if parent is None or parent.depth >= settings.BLOG_COMMENT_MAX_DEPTH:
+                form.add_error(None, "This comment can't be replied to.")
+        if form.is_valid() and throttle.is_duplicate(
+            form.cleaned_data["body"], post.pk
+        ):
+            form.add_error("body", "This comment repeats a recent comment.")
         if form.is_valid():
+            response = posted_redirect(post)
+            if comment_queue.is_enabled():
+                # Applied in batches by `process_comment_queue`; the
+                # cookie lets the author see it in the meantime.
+                key = comment_queue.enqueue(
+                    post.pk,
+                    form.cleaned_data["author"],
+                    form.cleaned_data["body"],
+                    parent_id=parent.pk if parent else None,
+                )
+                comment_queue.remember(request, response, key)
+                return response
             comment = Comment(
                 author=form.cleaned_data["author"],
                 body=form.cleaned_data["body"],
                 post=post,
+                parent=parent,
+                status=comment_queue.initial_status(),
             )
+            if comment.status == Comment.PENDING:
+                # Published once `score_comments` has scored it.
+                comment.ingest_key = uuid.uuid4().hex
+                comment_queue.remember(request, response, comment.ingest_key)
             comment.save()
-            return redirect("blog:blog-detail", pk=post.pk)
+            return response
 
-    comments = Comment.objects.filter(post=post)
+    # Threads are shown oldest first, each followed by its replies.
+    comment_page = paginate_comments(request, Comment.objects.filter(post=post))
+    # Precomputed by `blog.related`; one lookup on the `(post, rank)` index.
+    related_posts = [
+        row.related
+        for row in RelatedPost.objects.filter(post=post)
+        .select_related("related")
+        .only("related__title", "related__date_posted")
+        .order_by("rank")
+    ]
+    # Comments are tagged through their post; see `blog.signals`.
+    add_cache_tags(request, f"post:{post.pk}", f"related-post:{post.pk}")
+    add_cache_tags(request, *object_tags("category", post.categories.all()))
+    add_cache_tags(request, *object_tags("post", related_posts))
     context = {
         "the_site_name": THE_SITE_NAME,
         "page_title": "Knappings",
         "post": post,
-        "comments": comments,
+        "comments": comment_page.object_list,
+        "comment_page": comment_page,
         "form": form,
+        "related_posts": related_posts,
+        "max_comment_depth": settings.BLOG_COMMENT_MAX_DEPTH,
+        "session_fragment": True,
+        "show_pending_comments": comment_queue.shows_pending(),
     }
-    return render(request, "blog/blog_detail.html", context)
+    response = render(request, "blog/blog_detail.html", context)
+    if request.method == "GET":
+        patch_shared_cache_control(request, response)
+    return response
+
+
+@cache_anonymous_page("blog:comment-thread", shared=True)
+def comment_thread(request, pk, comment_pk):
+    """
+    View for one `blog.Comment` and its replies, with a form to reply to
+    it. Like `blog_detail`, the page is the same for every visitor.
+    """
+    post = get_object_or_404(Post.objects.only("id", "title"), pk=pk)
+    root = get_object_or_404(
+        Comment, pk=comment_pk, post=post, status=Comment.APPROVED
+    )
+    comment_page = paginate_comments(request, root.thread())
+    add_cache_tags(request, f"post:{post.pk}")
+    context = {
+        "the_site_name": THE_SITE_NAME,
+        "page_title": "Knappings",
+        "post": post,
+        "root": root,
+        "comments": comment_page.object_list,
+        "comment_page": comment_page,
+        "form": CommentForm(initial={"parent": root.pk}),
+        "can_reply": root.depth < settings.BLOG_COMMENT_MAX_DEPTH,
+        "max_comment_depth": settings.BLOG_COMMENT_MAX_DEPTH,
+        "session_fragment": True,
+    }
+    response = render(request, "blog/comment_thread.html", context)
+    patch_shared_cache_control(request, response)
+    return response
+
+
+def pending_comments(request, pk):
+    """
+    The visitor's own comments on a `blog.Post` that are still queued or
+    awaiting spam scoring, so `blog_detail` can show them before they are
+    published.
+    """
+    pending = comment_queue.pending_for(request, pk)
+    response = JsonResponse(
+        {
+            "comments": [
+                {"author": comment["author"], "body": comment["body"]}
+                for comment in pending
+            ]
+        }
+    )
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+@staff_member_required
+def comment_throttle_stats(request):
+    """
+    Number of comments rejected by each rate limit and as duplicates.
+    """
+    return JsonResponse(throttle.dropped())
@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
 import os
+import sys
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -37,6 +39,11 @@ ENVIRONMENT = os.environ.get("ENVIRONMENT", "development")
 # `False`
 DEBUG = ENVIRONMENT != "production"
 
+# `True` while `manage.py test` runs. Features that keep per-visitor state in
+# the cache across requests are off by default then, so tests don't affect
+# each other; their own tests turn them back on.
+TESTING = sys.argv[1:2] == ["test"]
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -58,13 +65,16 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.admindocs",
+    "base.apps.BaseConfig",
     "blog.apps.BlogConfig",
     "portfolio.apps.PortfolioConfig",
+    "search.apps.SearchConfig",
     "storages",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "base.middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -148,6 +158,174 @@ AUTH_USER_MODEL = "accounts.CustomUser"
 LOGIN_REDIRECT_URL = "home"
 LOGOUT_REDIRECT_URL = "home"
 
+# Number of `blog.Post`s shown per page on the blog list pages.
+BLOG_POSTS_PER_PAGE = int(os.environ.get("BLOG_POSTS_PER_PAGE", 10))
+
+# Directory of the durable comment queue (`blog.comment_queue`). When set,
+# comment POSTs are queued there and applied in batches by
+# `python manage.py process_comment_queue`, which must run on the same
+# machine. Unset, comments are saved during the request.
+BLOG_COMMENT_QUEUE_DIR = os.environ.get("BLOG_COMMENT_QUEUE_DIR")
+
+# Comment throttling (`blog.throttle`, `blog.duplicates`), checked before
+# a comment touches the database. Each IP may post a burst of `capacity`
+# comments and then `rate` per second; each post accepts a burst of
+# `capacity` comments from everyone, then `rate` per second.
+BLOG_COMMENT_THROTTLE_ENABLED = not TESTING
+BLOG_COMMENT_RATE_LIMITS = {
+    "ip": {"rate": 1 / 30, "capacity": 5},
+    "post": {"rate": 1 / 2, "capacity": 30},
+}
+# Comments within this many bits (at most 3) of the SimHash of a comment
+# seen in the last `BLOG_COMMENT_DUPLICATE_WINDOW` seconds are rejected.
+BLOG_COMMENT_DUPLICATE_DISTANCE = 3
+BLOG_COMMENT_DUPLICATE_WINDOW = 60 * 10
+# Cache alias of the rate limit buckets and recent comment fingerprints.
+# They are written on every comment POST and must be seen by every worker, so
+# in production it is Redis, never the database cache or a per-process one;
+# see `CACHES` below.
+BLOG_COMMENT_THROTTLE_CACHE = "throttle"
+# Number of proxies in front of the app that append to `X-Forwarded-For`.
+TRUSTED_PROXY_COUNT = int(os.environ.get("TRUSTED_PROXY_COUNT", 0))
+
+# Spam filtering (`blog.spam`). When enabled, visitors' comments are held
+# as pending until `python manage.py score_comments` has scored them:
+# scores below `BLOG_SPAM_APPROVE_BELOW` are published, scores from
+# `BLOG_SPAM_REJECT_FROM` rejected, and the rest left for a moderator.
+BLOG_SPAM_FILTER_ENABLED = (
+    os.environ.get("BLOG_SPAM_FILTER_ENABLED", "False") == "True"
+)
+BLOG_SPAM_APPROVE_BELOW = 0.5
+BLOG_SPAM_REJECT_FROM = 0.9
+
+# How long shared caches (a CDN or proxy) may keep a `blog_detail` page.
+# The page is the same for every visitor; see `base.views.session_fragment`.
+BLOG_DETAIL_SHARED_CACHE_SECONDS = 60
+
+# Number of `blog.Comment`s shown per page on `blog_detail`.
+BLOG_COMMENTS_PER_PAGE = int(os.environ.get("BLOG_COMMENTS_PER_PAGE", 25))
+# Deepest reply level allowed; `Comment.path` has room for 25 levels.
+BLOG_COMMENT_MAX_DEPTH = 8
+
+# Related posts (`blog.related`): how many are shown on `blog_detail`, and
+# the weight of category overlap against text similarity (0 to 1).
+BLOG_RELATED_POSTS = 5
+BLOG_RELATED_CATEGORY_WEIGHT = 0.3
+
+# How long redirects from old name-based category URLs are cached.
+BLOG_LEGACY_CATEGORY_CACHE_SECONDS = 60 * 60 * 24
+
+# Widths of the resized copies of uploaded portfolio images
+# (`portfolio.renditions`), offered to browsers through `srcset`.
+PORTFOLIO_IMAGE_WIDTHS = (320, 640, 960, 1280)
+
+# Number of similar projects (`portfolio.related`) shown on a project page.
+PORTFOLIO_RELATED_PROJECTS = 4
+
+# On-the-fly resized portfolio images (`portfolio.resizer`): the largest
+# width or height that may be asked for, the local directory of recently
+# served files and its size budget, the threads rendering missing files,
+# how many renders may be pending before requests get a 503, and how long
+# a request waits for its render.
+PORTFOLIO_RESIZE_MAX_SIZE = 2560
+PORTFOLIO_RESIZE_CACHE_DIR = os.environ.get(
+    "PORTFOLIO_RESIZE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "portfolio-resize"),
+)
+PORTFOLIO_RESIZE_CACHE_BYTES = int(
+    os.environ.get("PORTFOLIO_RESIZE_CACHE_BYTES", 256 * 1024 * 1024)
+)
+PORTFOLIO_RESIZE_WORKERS = int(os.environ.get("PORTFOLIO_RESIZE_WORKERS", 2))
+PORTFOLIO_RESIZE_MAX_PENDING = 16
+PORTFOLIO_RESIZE_TIMEOUT = 20
+
+# Source format of `blog.Post.body` and `portfolio.Project.description`:
+# "plain" (line breaks only) or "markdown" (needs the `markdown` package,
+# and `pygments` for code highlighting).
+RICH_TEXT_FORMAT = os.environ.get("RICH_TEXT_FORMAT", "plain")
+
+# Cache full pages for anonymous visitors (`base.page_cache`). Off under
+# `manage.py test` so view tests see freshly rendered pages; the page cache
+# tests turn it back on.
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", str(not TESTING)) == "True"
+# How long anonymous pages are kept by `base.page_cache`. Entries are
+# invalidated by model signals long before this when content changes.
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+# Part of every page, feed and sitemap cache key, so a deploy never serves
+# markup cached by the previous release. Heroku's dyno metadata provides the
+# slug commit; without either, a digest of the templates and code is used.
+PAGE_CACHE_VERSION = os.environ.get(
+    "PAGE_CACHE_VERSION", os.environ.get("HEROKU_SLUG_COMMIT", "")
+)
+# Atom/RSS feed bodies (`base.feeds`) are cached with the page cache under
+# their ETag, if they are no larger than this.
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_CACHE_MAX_BYTES = 1024 * 1024
+# Sitemaps (`base.sitemaps`): ids per sitemap chunk, at most the 50,000
+# URLs the protocol allows, and how long gzipped chunks are cached.
+SITEMAP_CHUNK_SIZE = 50000
+SITEMAP_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Stampede protection for cached pages and values (`base.single_flight`):
+# Seconds a worker may hold the lock while recomputing one key.
+CACHE_LOCK_TIMEOUT = 30
+# Seconds a request without a cached value waits for another worker's
+# recompute before computing the value itself.
+CACHE_LOCK_WAIT = 2
+# Seconds an expired value is still served while it is recomputed.
+CACHE_STALE_SECONDS = 60 * 5
+# How eagerly values are recomputed before they expire; 1.0 is the
+# recommended default, higher values refresh earlier.
+CACHE_EARLY_EXPIRY_BETA = 1.0
+
+# Number of results shown per page by the `search` app.
+SEARCH_RESULTS_PER_PAGE = int(os.environ.get("SEARCH_RESULTS_PER_PAGE", 10))
+
+########################################################################
+# Query budget settings (`base.middleware.QueryBudgetMiddleware`):
+# Maximum number of SQL queries each URL name may run per request.
+# Authenticated requests spend two of these on the session and the user.
+# Streaming responses are exempt; the feed budgets cover their 304s and
+# cached bodies.
+QUERY_BUDGETS = {
+    "blog:index": 5,
+    "blog:archive-year": 5,
+    "blog:archive-month": 5,
+    "blog:blog-category": 4,
+    "blog:blog-category-legacy": 4,
+    "blog:blog-detail": 8,
+    "blog:comment-thread": 5,
+    "blog:pending-comments": 2,
+    "blog:post-feed": 1,
+    "blog:category-feed": 2,
+    "portfolio:projects": 4,
+    "portfolio:project-create": 8,
+    "portfolio:project-update": 12,
+    "portfolio:project-detail": 6,
+    "portfolio:technology-projects": 4,
+    "portfolio:project-feed": 1,
+    "portfolio:technology-feed": 2,
+    "search:index": 5,
+    "session-fragment": 3,
+    "sitemap-index": 4,
+    "sitemap-section": 1,
+    "login": 6,
+    "signup": 6,
+    "edit": 8,
+    "detail": 6,
+}
+# A normalized query run more than this many times in one request is
+# reported as an N+1.
+QUERY_REPEAT_THRESHOLD = 5
+# Raise `QueryBudgetExceeded` on violations in development, log them in
+# production.
+QUERY_BUDGET_RAISE = DEBUG
+# Fraction of requests that are instrumented.
+QUERY_BUDGET_SAMPLE_RATE = float(
+    os.environ.get("QUERY_BUDGET_SAMPLE_RATE", 1.0 if DEBUG else 0.05)
+)
+########################################################################
+
 ########################################################################
 # Email settings:
 EMAIL_HOST = os.getenv("EMAIL_HOST")
@@ -174,6 +352,26 @@ AWS_MEDIA_URL = "https://%s/" % AWS_S3_CUSTOM_DOMAIN
 DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
 ########################################################################
 
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+        },
+    },
+    "loggers": {
+        "base": {
+            "handlers": ["console"],
+            "level": "INFO" if ENVIRONMENT == "production" else "WARNING",
+        },
+        "blog": {
+            "handlers": ["console"],
+            "level": "INFO" if ENVIRONMENT == "production" else "WARNING",
+        },
+    },
+}
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.0/howto/deployment/checklist/
 
@@ -184,6 +382,23 @@ if ENVIRONMENT == "production":
     # only.
     SECRET_KEY = os.environ.get("SECRET_KEY")
     MIDDLEWARE = MIDDLEWARE + ["whitenoise.middleware.WhiteNoiseMiddleware"]
+    # Heroku's router appends the client address to `X-Forwarded-For`.
+    TRUSTED_PROXY_COUNT = int(os.environ.get("TRUSTED_PROXY_COUNT", 1))
+    # Every gunicorn worker must see the same cache, or page cache
+    # invalidations would only reach the worker that saved the change.
+    # The table is created by `createcachetable` in the release phase.
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        },
+        # Shared by every gunicorn worker and dyno, so the comment rate
+        # limits hold across all of them.
+        "throttle": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("REDISCLOUD_URL"),
+        },
+    }
     database_config_variables = get_database_config_variables(
         os.environ.get("DATABASE_URL")
     )
@@ -212,6 +427,15 @@ else:
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        "throttle": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "throttle",
+        },
+    }
 
 # To create a new `SECRET_KEY`:
 """
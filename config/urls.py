@@ -20,6 +20,19 @@ from django.conf.urls.static import static
 from django.conf import settings
 from django.views.generic.base import RedirectView
 
+from base.sitemaps import sitemap_index, sitemap_section
+from base.views import page_cache_stats, session_fragment
+from blog.sitemaps import CategorySitemap, PostSitemap
+from portfolio.resizer import resized_image
+from portfolio.sitemaps import ProjectSitemap, TechnologySitemap
+
+sitemaps = {
+    "posts": PostSitemap(),
+    "categories": CategorySitemap(),
+    "projects": ProjectSitemap(),
+    "technologies": TechnologySitemap(),
+}
+
 urlpatterns = [
     path(
         "",
@@ -30,6 +43,11 @@ urlpatterns = [
         "admin/doc/",
         include("django.contrib.admindocs.urls"),
     ),
+    path(
+        "admin/page-cache/",
+        page_cache_stats,
+        name="page-cache-stats",
+    ),
     path(
         "admin/",
         admin.site.urls,
@@ -50,6 +68,32 @@ urlpatterns = [
         "portfolio/",
         include("portfolio.urls"),
     ),
+    path(
+        "search/",
+        include("search.urls"),
+    ),
+    path(
+        "fragments/session/",
+        session_fragment,
+        name="session-fragment",
+    ),
+    path(
+        "sitemap.xml",
+        sitemap_index,
+        {"sitemaps": sitemaps},
+        name="sitemap-index",
+    ),
+    path(
+        "sitemap-<slug:section>-<int:chunk>.xml",
+        sitemap_section,
+        {"sitemaps": sitemaps},
+        name="sitemap-section",
+    ),
+    path(
+        "media/r/<int:width>x<int:height>/<path:name>",
+        resized_image,
+        name="resized-image",
+    ),
 ]
 
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
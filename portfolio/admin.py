@@ -1,6 +1,15 @@
 from django.contrib import admin
+from django.template.defaultfilters import filesizeformat
 
 from portfolio.models import Technology, Project, ProjectImage
+from search.mixins import IndexedSearchMixin
+from search.models import SearchDocument
+
+
+def image_dimensions(width, height, size):
+    if width is None:
+        return "-"
+    return f"{width} x {height}, {filesizeformat(size)}"
 
 
 @admin.register(Technology)
@@ -20,7 +29,7 @@ class TechnologyAdmin(admin.ModelAdmin):
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(IndexedSearchMixin, admin.ModelAdmin):
     """
     `ModelAdmin` class for the `Project` model.
     """
@@ -29,19 +38,45 @@ class ProjectAdmin(admin.ModelAdmin):
         "truncated_description",
         "display_technologies",
         "main_image",
+        "main_image_dimensions",
         "created_at",
     )
+    search_fields = (
+        "title",
+        "description",
+    )
+    search_kind = SearchDocument.PROJECT
     readonly_fields = (
         "created_at",
         "updated_at",
+        "main_image_width",
+        "main_image_height",
+        "main_image_size",
+        "main_image_format",
+        "main_image_sha256",
     )
 
+    def get_queryset(self, request):
+        """
+        Prefetch `technology` for `display_technologies` in the change list.
+        """
+        return super().get_queryset(request).prefetch_related("technology")
+
     def truncated_description(self, obj):
         """
         Truncate `description` to 30 characters.
         """
         return obj.description[:30]
 
+    @admin.display(description="Main Image Size")
+    def main_image_dimensions(self, obj):
+        """
+        The recorded dimensions and file size, without opening the image.
+        """
+        return image_dimensions(
+            obj.main_image_width, obj.main_image_height, obj.main_image_size
+        )
+
 
 @admin.register(ProjectImage)
 class ProjectImageAdmin(admin.ModelAdmin):
@@ -51,9 +86,22 @@ class ProjectImageAdmin(admin.ModelAdmin):
     list_display = (
         "project",
         "image",
+        "image_dimensions",
         "caption",
     )
     readonly_fields = (
         "created_at",
         "updated_at",
+        "image_width",
+        "image_height",
+        "image_size",
+        "image_format",
+        "image_sha256",
     )
+
+    @admin.display(description="Image Size")
+    def image_dimensions(self, obj):
+        """
+        The recorded dimensions and file size, without opening the image.
+        """
+        return image_dimensions(obj.image_width, obj.image_height, obj.image_size)
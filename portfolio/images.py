@@ -0,0 +1,173 @@
+# portfolio/images.py
+"""
+Processing of uploaded portfolio images.
+
+An upload is read once, from the request's file, before it is saved to
+storage: its metadata (dimensions, byte size, format and SHA-256) and
+placeholder (`portfolio.placeholders`) are set on the row being saved and
+its renditions (`portfolio.renditions`) are rendered from the same
+decoded image; they are saved next to the original once its final name
+is known. Nothing is read back from the storage, which may be S3, and pages
+take the dimensions from the row rather than from the file.
+
+Metadata fields are named after the image field: `<field>_width`,
+`<field>_height`, `<field>_size`, `<field>_format` and `<field>_sha256`.
+Dimensions are those of the image as displayed, after its EXIF
+orientation.
+
+Replacing or removing an image releases the files of the previous one
+once the save is committed; see `portfolio.storage`.
+"""
+import hashlib
+
+from django.db import transaction
+from PIL import Image
+
+from base.page_cache import invalidate
+from portfolio import placeholders, renditions
+
+METADATA = ("width", "height", "size", "format", "sha256")
+
+# EXIF orientations that swap width and height.
+TRANSPOSED = {5, 6, 7, 8}
+ORIENTATION = 0x0112
+
+CHUNK_SIZE = 64 * 1024
+
+
+def is_new_upload(field_file):
+    """
+    Return whether `field_file` holds a file that saving the row will
+    upload to storage.
+    """
+    return bool(field_file) and not field_file._committed
+
+
+def inspect(source):
+    """
+    Return the metadata of the image file `source`, reading it in chunks
+    and decoding only its header.
+    """
+    source.seek(0)
+    digest, size = hashlib.sha256(), 0
+    while chunk := source.read(CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    source.seek(0)
+    with Image.open(source) as image:
+        width, height = image.size
+        if image.getexif().get(ORIENTATION) in TRANSPOSED:
+            width, height = height, width
+        image_format = image.format or ""
+    source.seek(0)
+    return {
+        "width": width,
+        "height": height,
+        "size": size,
+        "format": image_format,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def stored_files(name, rendition_list):
+    """
+    Return the names of an image `name` and of its renditions.
+    """
+    names = [name] if name else []
+    for rendition in rendition_list or []:
+        names += [rendition[key] for key in ("webp", "fallback") if key in rendition]
+    return names
+
+
+def release_later(storage, names):
+    """
+    Release `names` from `storage` once the current transaction commits.
+    Storages without reference counting keep their files, as before.
+    """
+    if names and hasattr(storage, "release"):
+        transaction.on_commit(lambda: storage.release(names))
+
+
+def invalidate_pages(model, pks):
+    """
+    Make cached pages showing the images of the `model` rows `pks` stale:
+    those of their projects. Needed after `update()` and `bulk_update()`,
+    which skip the signal handlers that do so.
+    """
+    if any(field.name == "project" for field in model._meta.fields):
+        pks = model._default_manager.filter(pk__in=pks).values_list(
+            "project_id", flat=True
+        )
+    invalidate(*(f"project:{pk}" for pk in set(pks)))
+
+
+def metadata_fields(field_name, metadata):
+    return {f"{field_name}_{key}": metadata.get(key) for key in METADATA}
+
+
+class Upload:
+    """
+    The processing of `instance`'s image `field_name` around a save:
+
+        upload = Upload(instance, "main_image")
+        super().save(...)
+        upload.finish()
+
+    Creating it reads a new upload and sets its metadata and placeholder on
+    `instance`, or clears them and the renditions if the image was removed.
+    `finish()` saves the renditions, records them on the row and releases
+    the files of the image it replaced.
+    """
+
+    def __init__(self, instance, field_name):
+        self.instance = instance
+        self.field_name = field_name
+        self.rendered = None
+        self.previous = []
+        field_file = getattr(instance, field_name)
+        # Rows had an image stored if its hash was recorded.
+        replaced = getattr(instance, f"{field_name}_sha256") and (
+            is_new_upload(field_file) or not field_file
+        )
+        if replaced and instance.pk is not None:
+            self.previous = self.previous_files()
+        if is_new_upload(field_file):
+            source = field_file.file
+            metadata = inspect(source)
+            image = renditions.decode(source)
+            source.seek(0)
+            self.set(metadata, placeholders.placeholder(image))
+            self.rendered = list(renditions.render(image))
+        elif not field_file:
+            self.set({"format": "", "sha256": ""}, "")
+
+    def previous_files(self):
+        row = (
+            type(self.instance)
+            ._default_manager.filter(pk=self.instance.pk)
+            .values_list(self.field_name, f"{self.field_name}_renditions")
+            .first()
+        )
+        return stored_files(*row) if row else []
+
+    def set(self, metadata, placeholder):
+        for attribute, value in metadata_fields(self.field_name, metadata).items():
+            setattr(self.instance, attribute, value)
+        setattr(self.instance, f"{self.field_name}_placeholder", placeholder)
+        setattr(self.instance, f"{self.field_name}_renditions", [])
+
+    def finish(self):
+        field_file = getattr(self.instance, self.field_name)
+        release_later(field_file.storage, self.previous)
+        if self.rendered is None:
+            return
+        rendition_list = renditions.store(
+            field_file.storage, field_file.name, self.rendered
+        )
+        attribute = f"{self.field_name}_renditions"
+        setattr(self.instance, attribute, rendition_list)
+        type(self.instance)._default_manager.filter(pk=self.instance.pk).update(
+            **{attribute: rendition_list}
+        )
+        # Pages rendered since the save's signals ran lack the renditions.
+        invalidate_pages(type(self.instance), [self.instance.pk])
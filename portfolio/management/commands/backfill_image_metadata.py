@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from portfolio import images
+from portfolio.models import IMAGE_FIELDS
+
+
+def read_metadata(storage, name):
+    """
+    Return the metadata of the stored image `name`, or the error met
+    reading it. Files are read in chunks and only the image header is
+    decoded, so each worker holds little more than one chunk.
+    """
+    try:
+        with storage.open(name) as source:
+            return images.inspect(source)
+    except (OSError, ValueError, Image.DecompressionBombError) as error:
+        return error
+
+
+class Command(BaseCommand):
+    help = "Record the dimensions, size, format and hash of stored portfolio images"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing-only",
+            action="store_true",
+            help="Only read images without recorded metadata.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Number of images read from storage at a time.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of rows read and updated at a time.",
+        )
+
+    def handle(self, *args, **kwargs):
+        missing_only = kwargs.get("missing_only", False)
+        batch_size = kwargs["batch_size"]
+        # Reading is network bound, so threads suffice.
+        with ThreadPoolExecutor(max_workers=kwargs["workers"]) as pool:
+            for model, field_name in IMAGE_FIELDS:
+                rows = model.objects.exclude(**{field_name: ""}).exclude(
+                    **{f"{field_name}__isnull": True}
+                )
+                if missing_only:
+                    rows = rows.filter(**{f"{field_name}_sha256": ""})
+                rows = rows.order_by("pk").only("pk", field_name).iterator(
+                    chunk_size=batch_size
+                )
+                fields = list(images.metadata_fields(field_name, {}))
+                updated = failed = 0
+                while batch := list(islice(rows, batch_size)):
+                    results = pool.map(
+                        lambda row: read_metadata(
+                            getattr(row, field_name).storage,
+                            getattr(row, field_name).name,
+                        ),
+                        batch,
+                    )
+                    changed = []
+                    for row, result in zip(batch, results):
+                        if isinstance(result, Exception):
+                            failed += 1
+                            self.stderr.write(f"{model.__name__} {row.pk}: {result}")
+                            continue
+                        for attribute, value in images.metadata_fields(
+                            field_name, result
+                        ).items():
+                            setattr(row, attribute, value)
+                        changed.append(row)
+                    model.objects.bulk_update(changed, fields)
+                    images.invalidate_pages(model, [row.pk for row in changed])
+                    updated += len(changed)
+                self.stdout.write(
+                    f"Recorded metadata of {updated} {model.__name__}(s), "
+                    f"{failed} failed."
+                )
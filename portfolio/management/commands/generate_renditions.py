@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from PIL import Image
+
+from portfolio import images, placeholders, renditions
+from portfolio.models import IMAGE_FIELDS
+
+
+def generate(model_label, field_name, name):
+    """
+    Run in a worker process: render the renditions and placeholder of the
+    image `name` of the field, save the renditions and return
+    `(renditions, placeholder)`. Workers only touch the storage, never the
+    database connection inherited from the parent, which updates the rows
+    and counts the references to the saved files (`portfolio.storage`).
+    """
+    from django.apps import apps
+
+    storage = apps.get_model(model_label)._meta.get_field(field_name).storage
+    with storage.open(name) as source:
+        image = renditions.decode(source)
+    return (
+        renditions.store(
+            getattr(storage, "uncounted", storage), name, renditions.render(image)
+        ),
+        placeholders.placeholder(image),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate responsive renditions and placeholders of portfolio images "
+        "in a process pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing-only",
+            action="store_true",
+            help="Only process images without renditions or a placeholder.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of worker processes.",
+        )
+
+    def handle(self, *args, **kwargs):
+        missing_only = kwargs.get("missing_only", False)
+        with ProcessPoolExecutor(max_workers=kwargs["workers"]) as pool:
+            for model, field_name in IMAGE_FIELDS:
+                rows = model.objects.exclude(**{field_name: ""}).exclude(
+                    **{f"{field_name}__isnull": True}
+                )
+                if missing_only:
+                    rows = rows.filter(
+                        Q(**{f"{field_name}_renditions": []})
+                        | Q(**{f"{field_name}_placeholder": ""})
+                    )
+                rows = list(
+                    rows.values_list("pk", field_name, f"{field_name}_renditions")
+                )
+                futures = {
+                    pk: pool.submit(generate, model._meta.label, field_name, name)
+                    for pk, name, _ in rows
+                }
+                previous = {pk: rendition_list for pk, _, rendition_list in rows}
+                storage = model._meta.get_field(field_name).storage
+                failed = 0
+                updated = []
+                for pk, future in futures.items():
+                    try:
+                        result = future.result()
+                    except (OSError, ValueError, Image.DecompressionBombError) as error:
+                        failed += 1
+                        self.stderr.write(f"{model.__name__} {pk}: {error}")
+                        continue
+                    updated.append(pk)
+                    rendition_list, placeholder = result
+                    with transaction.atomic():
+                        if hasattr(storage, "retain"):
+                            storage.retain(images.stored_files("", rendition_list))
+                        model.objects.filter(pk=pk).update(
+                            **{
+                                f"{field_name}_renditions": rendition_list,
+                                f"{field_name}_placeholder": placeholder,
+                            }
+                        )
+                        images.release_later(
+                            storage, images.stored_files("", previous[pk])
+                        )
+                images.invalidate_pages(model, updated)
+                self.stdout.write(
+                    f"Generated renditions for {len(rows) - failed} "
+                    f"{model.__name__}(s), {failed} failed."
+                )
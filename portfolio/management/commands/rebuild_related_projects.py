@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio import related
+
+
+class Command(BaseCommand):
+    help = "Recompute the related projects of every `portfolio.Project`"
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        count = related.rebuild()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Computed related projects for {count} project(s) in {elapsed:.3f}s."
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.9 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0010_project_repository_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False, help_text='HTML rendered from the description when the project is saved.', verbose_name='Rendered Project Description'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='description_html_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Rendered Project Description Hash'),
+        ),
+    ]
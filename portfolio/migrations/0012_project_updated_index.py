@@ -0,0 +1,17 @@
+# Generated by Django 4.1.9 on 2026-10-18 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0011_project_description_html'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['updated_at', 'id'], name='portfolio_project_updated_idx'),
+        ),
+    ]
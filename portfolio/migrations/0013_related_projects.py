@@ -0,0 +1,28 @@
+# Generated by Django 4.1.9 on 2026-10-18 13:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0012_project_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Rank')),
+                ('score', models.FloatField(help_text="Jaccard similarity of the projects' technologies.", verbose_name='Score')),
+                ('project', models.ForeignKey(db_index=False, help_text='Project the related project is shown on.', on_delete=django.db.models.deletion.CASCADE, related_name='related_projects', to='portfolio.project', verbose_name='Project')),
+                ('related', models.ForeignKey(help_text='Project sharing technologies with the project.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portfolio.project', verbose_name='Related Project')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='relatedproject',
+            constraint=models.UniqueConstraint(fields=('project', 'rank'), name='portfolio_relatedproject_project_rank_uniq'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.9 on 2026-10-18 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0013_related_projects'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='main_image_renditions',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Resized copies of the main image; see `portfolio.renditions`.', verbose_name='Main Image Renditions'),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Resized copies of the image; see `portfolio.renditions`.', verbose_name='Image Renditions'),
+        ),
+    ]
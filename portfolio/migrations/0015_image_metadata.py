@@ -0,0 +1,63 @@
+# Generated by Django 4.1.9 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0014_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='main_image_format',
+            field=models.CharField(blank=True, editable=False, max_length=10, verbose_name='Main Image Format'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='main_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Height in pixels, as displayed.', null=True, verbose_name='Main Image Height'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='main_image_sha256',
+            field=models.CharField(blank=True, editable=False, help_text="Hash of the uploaded file's content.", max_length=64, verbose_name='Main Image SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='main_image_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, help_text='Size of the uploaded file in bytes.', null=True, verbose_name='Main Image Size'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='main_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Width in pixels, as displayed; see `portfolio.images`.', null=True, verbose_name='Main Image Width'),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_format',
+            field=models.CharField(blank=True, editable=False, max_length=10, verbose_name='Image Format'),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Height in pixels, as displayed.', null=True, verbose_name='Image Height'),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_sha256',
+            field=models.CharField(blank=True, editable=False, help_text="Hash of the uploaded file's content.", max_length=64, verbose_name='Image SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, help_text='Size of the uploaded file in bytes.', null=True, verbose_name='Image Size'),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Width in pixels, as displayed; see `portfolio.images`.', null=True, verbose_name='Image Width'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.9 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0015_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='main_image_placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Tiny WebP `data:` URI shown while the image loads; see `portfolio.placeholders`.', verbose_name='Main Image Placeholder'),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Tiny WebP `data:` URI shown while the image loads; see `portfolio.placeholders`.', verbose_name='Image Placeholder'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.9 on 2026-10-18 13:20
+
+from django.db import migrations, models
+import portfolio.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0016_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Name of the file in storage, after its content hash.', max_length=255, unique=True, verbose_name='Name')),
+                ('size', models.PositiveBigIntegerField(help_text='Size of the file in bytes.', verbose_name='Size')),
+                ('references', models.PositiveIntegerField(default=1, help_text='Number of saves of this content not yet deleted.', verbose_name='References')),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='main_image',
+            field=models.ImageField(blank=True, help_text='Add an image of the project.', null=True, storage=portfolio.storage.image_storage, upload_to='portfolio/', verbose_name='Main Image'),
+        ),
+        migrations.AlterField(
+            model_name='projectimage',
+            name='image',
+            field=models.ImageField(help_text='Add an image of the project.', storage=portfolio.storage.image_storage, upload_to='project_images/', verbose_name='Image'),
+        ),
+    ]
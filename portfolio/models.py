@@ -2,7 +2,10 @@
 from django.db import models
 from django.urls import reverse
 
+from base.rendering import LINES, refresh_html
 from config.settings import AUTH_USER_MODEL
+from portfolio import images, renditions
+from portfolio.storage import image_storage
 
 
 class TimestampMixin(models.Model):
@@ -86,6 +89,18 @@ class Project(TimestampMixin):
         blank=True,
         null=True,
     )
+    description_html = models.TextField(
+        verbose_name="Rendered Project Description",
+        help_text="HTML rendered from the description when the project is saved.",
+        blank=True,
+        editable=False,
+    )
+    description_html_hash = models.CharField(
+        verbose_name="Rendered Project Description Hash",
+        max_length=64,
+        blank=True,
+        editable=False,
+    )
     repository_url = models.URLField(
         verbose_name="Repository URL",
         help_text="Enter the URL of the project's repository.",
@@ -104,9 +119,69 @@ class Project(TimestampMixin):
         # `upload_to` is a required argument for `ImageField`.
         # It specifies the path to which the uploaded file will be saved.
         upload_to="portfolio/",
+        # Identical uploads share one stored file; see `portfolio.storage`.
+        storage=image_storage,
         blank=True,
         null=True,
     )
+    main_image_width = models.PositiveIntegerField(
+        verbose_name="Main Image Width",
+        help_text="Width in pixels, as displayed; see `portfolio.images`.",
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    main_image_height = models.PositiveIntegerField(
+        verbose_name="Main Image Height",
+        help_text="Height in pixels, as displayed.",
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    main_image_size = models.PositiveBigIntegerField(
+        verbose_name="Main Image Size",
+        help_text="Size of the uploaded file in bytes.",
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    main_image_format = models.CharField(
+        verbose_name="Main Image Format",
+        max_length=10,
+        blank=True,
+        editable=False,
+    )
+    main_image_sha256 = models.CharField(
+        verbose_name="Main Image SHA-256",
+        help_text="Hash of the uploaded file's content.",
+        max_length=64,
+        blank=True,
+        editable=False,
+    )
+    main_image_placeholder = models.TextField(
+        verbose_name="Main Image Placeholder",
+        help_text="Tiny WebP `data:` URI shown while the image loads; see "
+        "`portfolio.placeholders`.",
+        blank=True,
+        editable=False,
+    )
+    main_image_renditions = models.JSONField(
+        verbose_name="Main Image Renditions",
+        help_text="Resized copies of the main image; see `portfolio.renditions`.",
+        default=list,
+        blank=True,
+        editable=False,
+    )
+
+    class Meta:
+        indexes = [
+            # Supports the latest `updated_at` used as the feeds'
+            # `Last-Modified`, and listing projects by it.
+            models.Index(
+                fields=["updated_at", "id"],
+                name="portfolio_project_updated_idx",
+            ),
+        ]
 
     def __str__(self):
         """
@@ -114,6 +189,32 @@ class Project(TimestampMixin):
         """
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+        Re-render `description_html` if `description` changed, and record
+        the metadata and generate renditions of a newly uploaded
+        `main_image`.
+        """
+        refresh_html(self, "description", LINES)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "description" in update_fields:
+            kwargs["update_fields"] = {
+                *update_fields, "description_html", "description_html_hash"
+            }
+        upload = images.Upload(self, "main_image")
+        super().save(*args, **kwargs)
+        upload.finish()
+
+    @property
+    def responsive_main_image(self):
+        return renditions.ResponsiveImage(
+            self.main_image,
+            self.main_image_renditions,
+            self.main_image_width,
+            self.main_image_height,
+            self.main_image_placeholder,
+        )
+
     def get_absolute_url(self):
         return reverse(
             "portfolio:project-detail",
@@ -126,7 +227,9 @@ class Project(TimestampMixin):
         display multiple `Technology`'s in the `Project` list view.
         """
         # Limit the number of technologies to 3 and then join them with
-        # a comma and a space to form a string.
+        # a comma and a space to form a string. When the queryset used
+        # `prefetch_related("technology")` the slice is taken from the
+        # prefetched cache rather than issuing a query per project.
         return ", ".join(technology.name for technology in self.technology.all()[:3])
 
 
@@ -146,6 +249,55 @@ class ProjectImage(TimestampMixin):
         verbose_name="Image",
         help_text="Add an image of the project.",
         upload_to="project_images/",
+        storage=image_storage,
+    )
+    image_width = models.PositiveIntegerField(
+        verbose_name="Image Width",
+        help_text="Width in pixels, as displayed; see `portfolio.images`.",
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    image_height = models.PositiveIntegerField(
+        verbose_name="Image Height",
+        help_text="Height in pixels, as displayed.",
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    image_size = models.PositiveBigIntegerField(
+        verbose_name="Image Size",
+        help_text="Size of the uploaded file in bytes.",
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    image_format = models.CharField(
+        verbose_name="Image Format",
+        max_length=10,
+        blank=True,
+        editable=False,
+    )
+    image_sha256 = models.CharField(
+        verbose_name="Image SHA-256",
+        help_text="Hash of the uploaded file's content.",
+        max_length=64,
+        blank=True,
+        editable=False,
+    )
+    image_placeholder = models.TextField(
+        verbose_name="Image Placeholder",
+        help_text="Tiny WebP `data:` URI shown while the image loads; see "
+        "`portfolio.placeholders`.",
+        blank=True,
+        editable=False,
+    )
+    image_renditions = models.JSONField(
+        verbose_name="Image Renditions",
+        help_text="Resized copies of the image; see `portfolio.renditions`.",
+        default=list,
+        blank=True,
+        editable=False,
     )
     caption = models.CharField(
         verbose_name="Caption",
@@ -161,5 +313,100 @@ class ProjectImage(TimestampMixin):
         """
         return self.caption
 
+    def save(self, *args, **kwargs):
+        """
+        Record the metadata and generate renditions of a newly uploaded
+        `image`.
+        """
+        upload = images.Upload(self, "image")
+        super().save(*args, **kwargs)
+        upload.finish()
+
+    @property
+    def responsive_image(self):
+        return renditions.ResponsiveImage(
+            self.image,
+            self.image_renditions,
+            self.image_width,
+            self.image_height,
+            self.image_placeholder,
+        )
+
     class Meta:
         verbose_name_plural = "Project Images"
+
+
+# `(model, image field)` pairs processed by `portfolio.images`.
+IMAGE_FIELDS = (
+    (Project, "main_image"),
+    (ProjectImage, "image"),
+)
+
+
+class RelatedProject(models.Model):
+    """
+    One of the `PORTFOLIO_RELATED_PROJECTS` projects sharing the most
+    technologies with `project`, best first by `rank`. Maintained by
+    `portfolio.related`.
+    """
+
+    project = models.ForeignKey(
+        Project,
+        verbose_name="Project",
+        help_text="Project the related project is shown on.",
+        on_delete=models.CASCADE,
+        related_name="related_projects",
+        # The unique constraint's index leads with `project`.
+        db_index=False,
+    )
+    related = models.ForeignKey(
+        Project,
+        verbose_name="Related Project",
+        help_text="Project sharing technologies with the project.",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    rank = models.PositiveSmallIntegerField(
+        verbose_name="Rank",
+    )
+    score = models.FloatField(
+        verbose_name="Score",
+        help_text="Jaccard similarity of the projects' technologies.",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "rank"],
+                name="portfolio_relatedproject_project_rank_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} -> {self.related_id} ({self.score:.3f})"
+
+
+class StoredFile(models.Model):
+    """
+    A file of `portfolio.storage.ContentAddressedStorage` and the number of
+    references to it; the file is deleted with its last reference.
+    """
+
+    name = models.CharField(
+        verbose_name="Name",
+        help_text="Name of the file in storage, after its content hash.",
+        max_length=255,
+        unique=True,
+    )
+    size = models.PositiveBigIntegerField(
+        verbose_name="Size",
+        help_text="Size of the file in bytes.",
+    )
+    references = models.PositiveIntegerField(
+        verbose_name="References",
+        help_text="Number of saves of this content not yet deleted.",
+        default=1,
+    )
+
+    def __str__(self):
+        return f"{self.name} ({self.references})"
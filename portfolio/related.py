@@ -0,0 +1,85 @@
+# portfolio/related.py
+"""
+Precomputed "similar projects" for `ProjectDetailView`.
+
+Projects are compared by the Jaccard similarity of their technologies with
+`base.similarity.SimilarityIndex`, which scores the whole portfolio at
+once as the product of a project x technology membership matrix with
+itself. Each project's `PORTFOLIO_RELATED_PROJECTS` best
+neighbours are stored as `RelatedProject` rows, which the detail view
+reads with one indexed query; rewriting a project's rows bumps its
+`related-project:<id>` page cache tag.
+
+`rebuild()` recomputes every project; `update()` is called by
+`portfolio.signals` when technologies are added or removed and only
+rewrites the lists that can change.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from base.page_cache import invalidate
+from base.similarity import SimilarityIndex, stale_items
+from portfolio.models import Project, RelatedProject
+
+
+def build_index():
+    """
+    Return a `SimilarityIndex` of every project, read with two queries.
+    """
+    technologies = defaultdict(list)
+    through = Project.technology.through.objects.values_list(
+        "project_id", "technology_id"
+    )
+    for project_id, technology_id in through.iterator():
+        technologies[project_id].append(technology_id)
+    ids = list(Project.objects.order_by("pk").values_list("pk", flat=True))
+    return SimilarityIndex(ids, sets=[technologies[pk] for pk in ids])
+
+
+def rows(neighbours):
+    return [
+        RelatedProject(project_id=pk, related_id=related_id, rank=rank, score=score)
+        for pk, related in neighbours.items()
+        for rank, (related_id, score) in enumerate(related)
+    ]
+
+
+def rebuild():
+    """
+    Recompute the related projects of every project. Returns the number of
+    projects.
+    """
+    neighbours = build_index().top_k_all(settings.PORTFOLIO_RELATED_PROJECTS)
+    with transaction.atomic():
+        RelatedProject.objects.all().delete()
+        RelatedProject.objects.bulk_create(rows(neighbours), batch_size=500)
+        invalidate(*(f"related-project:{pk}" for pk in neighbours))
+    return len(neighbours)
+
+
+def update(project_ids):
+    """
+    Bring the related projects up to date after the technologies of the
+    projects with `project_ids` changed, or the projects were deleted.
+    Returns the ids of the projects whose related projects were rewritten.
+    """
+    k = settings.PORTFOLIO_RELATED_PROJECTS
+    index = build_index()
+    stored = defaultdict(list)
+    for pk, related_id, score in RelatedProject.objects.values_list(
+        "project_id", "related_id", "score"
+    ).iterator():
+        stored[pk].append((related_id, score))
+
+    stale = stale_items(index, project_ids, stored, k)
+    if not stale:
+        return stale
+
+    neighbours = {pk: index.top_k(pk, k) for pk in stale}
+    with transaction.atomic():
+        RelatedProject.objects.filter(project_id__in=stale).delete()
+        RelatedProject.objects.bulk_create(rows(neighbours))
+        invalidate(*(f"related-project:{pk}" for pk in stale))
+    return stale
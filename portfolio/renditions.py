@@ -0,0 +1,142 @@
+# portfolio/renditions.py
+"""
+Responsive renditions of uploaded portfolio images.
+
+When an image is uploaded (see `portfolio.images`), Pillow writes it
+again at each of `PORTFOLIO_IMAGE_WIDTHS` narrower than the original (and
+at the original width, capped at the largest), in WebP and in a fallback
+format browsers without WebP support can show: JPEG, or PNG for images
+with transparency.
+Orientation is applied from the EXIF data and the renditions are written
+without any metadata.
+
+Renditions are saved next to the original through the field's storage,
+as `<name>.<width>w.<ext>` (which `portfolio.storage` replaces by a name
+after their content), and listed on the row in `<field>_renditions` so
+templates can build `srcset`s without asking the storage what exists.
+`python manage.py generate_renditions` processes existing images in a
+process pool.
+"""
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+WEBP = "webp"
+
+FORMATS = {
+    "jpg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+    "png": ("PNG", {"optimize": True}),
+    WEBP: ("WEBP", {"quality": 80, "method": 4}),
+}
+
+
+def rendition_name(name, width, extension):
+    stem, _ = posixpath.splitext(name)
+    return f"{stem}.{width}w.{extension}"
+
+
+def has_alpha(image):
+    return image.mode in ("RGBA", "LA", "PA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+
+
+def rendition_widths(width):
+    """
+    Return the widths to render an image `width` pixels wide at.
+    """
+    widths = sorted(settings.PORTFOLIO_IMAGE_WIDTHS)
+    return [w for w in widths if w < width] + [min(width, widths[-1])]
+
+
+def encode(image, extension):
+    image_format, options = FORMATS[extension]
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def decode(source):
+    """
+    Return the image file `source` upright, as RGB, or RGBA if it has
+    transparency.
+    """
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        return image.convert("RGBA" if has_alpha(image) else "RGB")
+
+
+def render(image):
+    """
+    Yield `(width, height, {extension: bytes})` for each rendition of the
+    `decode()`d `image`.
+    """
+    fallback = "png" if image.mode == "RGBA" else "jpg"
+    for width in rendition_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        yield width, height, {
+            WEBP: encode(resized, WEBP),
+            fallback: encode(resized, fallback),
+        }
+
+
+def store(storage, name, rendered):
+    """
+    Save the output of `render()` for the image `name` of `storage` next
+    to it. Returns the list stored in `<field>_renditions`: one
+    `{"width", "height", "webp", "fallback"}` dict per width, narrowest
+    first, naming the saved files.
+    """
+    renditions = []
+    for width, height, files in rendered:
+        rendition = {"width": width, "height": height}
+        for extension, content in files.items():
+            key = WEBP if extension == WEBP else "fallback"
+            rendition[key] = storage.save(
+                rendition_name(name, width, extension), ContentFile(content)
+            )
+        renditions.append(rendition)
+    return renditions
+
+
+class ResponsiveImage:
+    """
+    What templates need to show an image field and its renditions; see
+    `portfolio/includes/picture.html`.
+    """
+
+    def __init__(self, field_file, renditions, width=None, height=None,
+                 placeholder=""):
+        self.field_file = field_file
+        self.renditions = renditions or []
+        self.width = width
+        self.height = height
+        self.placeholder = placeholder
+
+    def __bool__(self):
+        return bool(self.field_file)
+
+    def srcset(self, key):
+        storage = self.field_file.storage
+        return ", ".join(
+            f"{storage.url(rendition[key])} {rendition['width']}w"
+            for rendition in self.renditions
+        )
+
+    @property
+    def src(self):
+        if self.renditions:
+            return self.field_file.storage.url(self.renditions[-1]["fallback"])
+        return self.field_file.url
+
+    @property
+    def webp_srcset(self):
+        return self.srcset(WEBP)
+
+    @property
+    def fallback_srcset(self):
+        return self.srcset("fallback")
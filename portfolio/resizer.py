@@ -0,0 +1,404 @@
+# portfolio/resizer.py
+"""
+Portfolio images resized on the fly.
+
+`resized_url()` returns a signed URL `/media/r/<width>x<height>/<name>`
+for the stored image `name`, whose content has the SHA-256 `digest` (the
+`<field>_sha256` of its row), scaled down to fit in `width` x `height`
+(`0` leaves that side unconstrained), so templates can ask for exactly the
+size a layout needs (see the `resized_url` tag of `portfolio_images`).
+Only URLs the site signed are served, so clients can't have it render
+arbitrary sizes.
+
+`resized_image()` answers them from, in order:
+
+1. `DiskCache`, a local directory of recently served files kept under
+   `PORTFOLIO_RESIZE_CACHE_BYTES` by evicting the least recently used;
+2. the storage backend of the image fields (`portfolio.storage`), where
+   every rendered file is also saved under `resized/<digest>/`, so other
+   processes and new machines don't render it again;
+3. rendering it in `RenderPool`, a pool of `PORTFOLIO_RESIZE_WORKERS`
+   threads (Pillow releases the GIL while resizing and encoding).
+   Concurrent requests for the same file share one render, and requests
+   arriving with `PORTFOLIO_RESIZE_MAX_PENDING` renders pending get a 503.
+
+Browsers accepting WebP get WebP, others the fallback format of
+`portfolio.renditions`. Files are keyed by the source's digest, size and
+format, never by its name, and a source whose content no longer matches
+the digest in the URL isn't rendered, so the bytes behind a URL don't
+change: responses have a strong ETag computed from the URL alone, which
+answers `If-None-Match` before anything is read, and may be cached
+forever.
+"""
+import functools
+import hashlib
+import os
+import posixpath
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+from PIL import Image
+
+from portfolio import renditions
+from portfolio.storage import image_storage
+
+SALT = "portfolio.resizer"
+STORAGE_PREFIX = "resized"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+CONTENT_TYPES = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+# Source formats that may have transparency, which JPEG can't keep.
+TRANSPARENT_EXTENSIONS = {".png", ".gif", ".webp"}
+
+# Eviction frees space down to this fraction of the budget, so it doesn't
+# run again on the next write.
+LOW_WATER = 0.9
+
+
+class Busy(Exception):
+    """
+    Too many renders are pending.
+    """
+
+
+def variant_storage():
+    """
+    The storage resized files are kept in: the backend of the image
+    fields' storage, so they keep their names rather than being renamed
+    after their content and reference counted.
+    """
+    storage = image_storage()
+    return getattr(storage, "backend", storage)
+
+
+def signature(name, digest, width, height):
+    return signing.Signer(salt=SALT).signature(f"{width}x{height}/{digest}/{name}")
+
+
+def resized_url(name, digest, width, height=0):
+    """
+    Return the signed URL of the stored image `name`, with content digest
+    `digest`, fitted in `width` x `height`.
+    """
+    url = reverse(
+        "resized-image", kwargs={"width": width, "height": height, "name": name}
+    )
+    return f"{url}?v={digest}&s={signature(name, digest, width, height)}"
+
+
+def is_portfolio_image(name):
+    from portfolio.models import IMAGE_FIELDS
+
+    if ".." in name.split("/"):
+        return False
+    return any(
+        name.startswith(model._meta.get_field(field_name).upload_to)
+        for model, field_name in IMAGE_FIELDS
+    )
+
+
+def fallback_extension(name):
+    _, extension = posixpath.splitext(name)
+    return "png" if extension.lower() in TRANSPARENT_EXTENSIONS else "jpg"
+
+
+def fitted_size(image_width, image_height, width, height):
+    """
+    Return the size of an `image_width` x `image_height` image scaled down,
+    never up, to fit in `width` x `height`.
+    """
+    scale = min(
+        width / image_width if width else 1.0,
+        height / image_height if height else 1.0,
+        1.0,
+    )
+    return (
+        max(1, round(image_width * scale)),
+        max(1, round(image_height * scale)),
+    )
+
+
+def render(name, digest, width, height, extension):
+    """
+    Return the stored image `name` fitted in `width` x `height`, encoded
+    as `extension`. Raises `ValueError` if its content doesn't have the
+    SHA-256 `digest`.
+    """
+    with image_storage().open(name) as source:
+        content = source.read()
+    if hashlib.sha256(content).hexdigest() != digest:
+        raise ValueError("The image has changed.")
+    image = renditions.decode(BytesIO(content))
+    size = fitted_size(image.width, image.height, width, height)
+    if size != image.size:
+        image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+    if extension == "jpg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    return renditions.encode(image, extension)
+
+
+class Variant:
+    """
+    One resized file: the image `name`, with content digest `digest`,
+    fitted in `width` x `height` as `extension`.
+    """
+
+    def __init__(self, name, digest, width, height, extension):
+        self.name = name
+        self.digest = digest
+        self.width = width
+        self.height = height
+        self.extension = extension
+
+    @property
+    def cache_key(self):
+        return f"{self.digest}-{self.width}x{self.height}.{self.extension}"
+
+    @property
+    def stored_name(self):
+        return (
+            f"{STORAGE_PREFIX}/{self.digest}/"
+            f"{self.width}x{self.height}.{self.extension}"
+        )
+
+    @property
+    def etag(self):
+        return quote_etag(self.cache_key)
+
+    def load(self, cache):
+        """
+        Return the variant's bytes, read from the storage backend or
+        rendered and saved there, and put them in `cache`.
+        """
+        storage = variant_storage()
+        if storage.exists(self.stored_name):
+            with storage.open(self.stored_name) as stored:
+                content = stored.read()
+        else:
+            content = render(
+                self.name, self.digest, self.width, self.height, self.extension
+            )
+            storage.save(self.stored_name, ContentFile(content))
+        cache.put(self.cache_key, content)
+        return content
+
+
+class DiskCache:
+    """
+    Files in `directory`, about `max_bytes` in total at most.
+
+    Reading a file marks it as recently used by touching it; a write that
+    takes the total over the budget deletes the least recently used files.
+    Processes may share the directory: files are written under a temporary
+    name and renamed into place, and each process rescans the directory
+    before evicting, as its running total only counts its own writes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.size = None
+
+    def path(self, key):
+        return self.directory / key[:2] / key
+
+    def open(self, key):
+        """
+        Return the file `key` opened for reading, or `None`. An open file
+        can still be read if another process evicts it.
+        """
+        path = self.path(key)
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return file
+
+    def put(self, key, content):
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+        os.replace(temporary, path)
+        with self.lock:
+            if self.size is None:
+                self.size = sum(size for _, size, _ in self.entries())
+            else:
+                self.size += len(content)
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def discard(self, prefix):
+        """
+        Delete the files whose keys start with `prefix` followed by `-`.
+        """
+        for path in (self.directory / prefix[:2]).glob(f"{prefix}-*"):
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            with self.lock:
+                if self.size is not None:
+                    self.size -= size
+
+    def entries(self):
+        """
+        Yield `(last used, size, path)` for each cached file.
+        """
+        for path in self.directory.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+    def evict(self):
+        entries = sorted(self.entries())
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.size <= self.max_bytes * LOW_WATER:
+                break
+            path.unlink(missing_ok=True)
+            self.size -= size
+
+
+@functools.lru_cache(maxsize=None)
+def disk_cache(directory, max_bytes):
+    return DiskCache(directory, max_bytes)
+
+
+def delete_variants(digest):
+    """
+    Delete the resized files of the image with content digest `digest`
+    from `variant_storage()` and from this machine's `DiskCache`. Disk
+    caches of other machines drop theirs as they evict them.
+    """
+    storage = variant_storage()
+    directory = f"{STORAGE_PREFIX}/{digest}"
+    try:
+        _, names = storage.listdir(directory)
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        storage.delete(f"{directory}/{name}")
+    disk_cache(
+        settings.PORTFOLIO_RESIZE_CACHE_DIR, settings.PORTFOLIO_RESIZE_CACHE_BYTES
+    ).discard(digest)
+
+
+class RenderPool:
+    """
+    Runs `Variant.load()` in a bounded thread pool, once per variant at a
+    time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.executor = None
+
+    def submit(self, variant, cache):
+        """
+        Return a future of the bytes of `variant`; raises `Busy` if too
+        many renders are pending.
+        """
+        with self.lock:
+            future = self.pending.get(variant.cache_key)
+            if future is None:
+                if len(self.pending) >= settings.PORTFOLIO_RESIZE_MAX_PENDING:
+                    raise Busy
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(
+                        max_workers=settings.PORTFOLIO_RESIZE_WORKERS,
+                        thread_name_prefix="resize",
+                    )
+                future = self.executor.submit(variant.load, cache)
+                self.pending[variant.cache_key] = future
+                # Registered with the lock held, the callback could run
+                # here, in this thread, if the render were already done.
+                done = functools.partial(self.done, variant.cache_key)
+            else:
+                done = None
+        if done is not None:
+            future.add_done_callback(done)
+        return future
+
+    def done(self, key, future):
+        with self.lock:
+            if self.pending.get(key) is future:
+                del self.pending[key]
+
+
+pool = RenderPool()
+
+
+def add_headers(response, variant):
+    response["ETag"] = variant.etag
+    response["Cache-Control"] = CACHE_CONTROL
+    response["Vary"] = "Accept"
+    return response
+
+
+@require_safe
+def resized_image(request, width, height, name):
+    """
+    Serve the stored image `name` fitted in `width` x `height`; see the
+    module docstring.
+    """
+    digest = request.GET.get("v", "")
+    if not constant_time_compare(
+        request.GET.get("s", ""), signature(name, digest, width, height)
+    ):
+        raise Http404("Invalid signature.")
+    limit = settings.PORTFOLIO_RESIZE_MAX_SIZE
+    if not (width or height) or width > limit or height > limit:
+        raise Http404("Unsupported size.")
+    if not is_portfolio_image(name):
+        raise Http404("Not a portfolio image.")
+
+    accepts_webp = "image/webp" in request.headers.get("Accept", "")
+    extension = renditions.WEBP if accepts_webp else fallback_extension(name)
+    variant = Variant(name, digest, width, height, extension)
+    response = get_conditional_response(request, etag=variant.etag)
+    if response is not None:
+        return add_headers(response, variant)
+
+    content_type = CONTENT_TYPES[extension]
+    cache = disk_cache(
+        settings.PORTFOLIO_RESIZE_CACHE_DIR, settings.PORTFOLIO_RESIZE_CACHE_BYTES
+    )
+    file = cache.open(variant.cache_key)
+    if file is not None:
+        return add_headers(FileResponse(file, content_type=content_type), variant)
+    try:
+        content = pool.submit(variant, cache).result(
+            timeout=settings.PORTFOLIO_RESIZE_TIMEOUT
+        )
+    except (Busy, FutureTimeout):
+        response = HttpResponse("Busy, please try again later.", status=503)
+        response["Retry-After"] = 1
+        return response
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise Http404("Unreadable image.")
+    return add_headers(HttpResponse(content, content_type=content_type), variant)
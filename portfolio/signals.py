@@ -0,0 +1,126 @@
+# portfolio/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from base.page_cache import invalidate
+from portfolio import images, related
+from portfolio.models import Project, ProjectImage, RelatedProject, Technology
+
+# Cached pages (`base.page_cache`) are tagged with the projects and
+# technologies they show; the project list is also tagged "projects" so new
+# projects appear. Feeds and sitemaps list every project with its
+# technologies, so any change to either bumps "project-feed".
+
+
+@receiver(post_save, sender=Project)
+def purge_saved_project(sender, instance, created, **kwargs):
+    invalidate(
+        "project-feed",
+        f"project:{instance.pk}",
+        *(["projects"] if created else []),
+    )
+
+
+@receiver(post_delete, sender=Project)
+def purge_deleted_project(sender, instance, **kwargs):
+    invalidate("projects", "project-feed", f"project:{instance.pk}")
+
+
+@receiver(m2m_changed, sender=Project.technology.through)
+def purge_project_technologies(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    # Pages that showed a removed relation are purged through the tag of
+    # `instance`; pages gaining one through the tags in `pk_set`.
+    if reverse:
+        # `instance` is a `Technology`; `pk_set` holds `Project` ids.
+        tags = [
+            f"technology:{instance.pk}",
+            *(f"project:{pk}" for pk in pk_set or ()),
+        ]
+    else:
+        tags = [
+            f"project:{instance.pk}",
+            *(f"technology:{pk}" for pk in pk_set or ()),
+        ]
+    invalidate("project-feed", *tags)
+
+
+@receiver([post_save, post_delete], sender=Technology)
+def purge_technology(sender, instance, **kwargs):
+    invalidate("project-feed", f"technology:{instance.pk}")
+
+
+@receiver([post_save, post_delete], sender=ProjectImage)
+def purge_image_project(sender, instance, **kwargs):
+    invalidate(f"project:{instance.project_id}")
+
+
+# Related projects (`portfolio.related`) depend only on technologies. A
+# deleted project or technology takes rows the neighbour lists were built
+# from with it, so the projects affected are noted in `pre_delete` and
+# updated once the rows are gone.
+
+
+@receiver(m2m_changed, sender=Project.technology.through)
+def update_related_project_technologies(sender, instance, action, reverse, pk_set,
+                                        **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            related.update([instance.pk])
+        return
+    # `instance` is a `Technology`; a `clear()` has no `pk_set`.
+    if action == "pre_clear":
+        instance._related_project_ids = list(
+            instance.projects.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        related.update(getattr(instance, "_related_project_ids", []))
+    elif action in ("post_add", "post_remove"):
+        related.update(pk_set or [])
+
+
+@receiver(pre_delete, sender=Project)
+def note_projects_related_to_deleted_project(sender, instance, **kwargs):
+    instance._related_project_ids = list(
+        RelatedProject.objects.filter(related=instance).values_list(
+            "project_id", flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=Project)
+def update_projects_related_to_deleted_project(sender, instance, **kwargs):
+    related.update(getattr(instance, "_related_project_ids", []))
+
+
+@receiver(pre_delete, sender=Technology)
+def note_technology_projects(sender, instance, **kwargs):
+    instance._related_project_ids = list(
+        instance.projects.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Technology)
+def update_technology_projects(sender, instance, **kwargs):
+    related.update(getattr(instance, "_related_project_ids", []))
+
+
+# Files of deleted rows are released from `portfolio.storage` once the
+# deletion is committed; shared files stay until their last row is gone.
+
+
+@receiver(post_delete, sender=Project)
+def release_project_image(sender, instance, **kwargs):
+    images.release_later(
+        instance.main_image.storage,
+        images.stored_files(instance.main_image.name, instance.main_image_renditions),
+    )
+
+
+@receiver(post_delete, sender=ProjectImage)
+def release_project_image_image(sender, instance, **kwargs):
+    images.release_later(
+        instance.image.storage,
+        images.stored_files(instance.image.name, instance.image_renditions),
+    )
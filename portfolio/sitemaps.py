@@ -0,0 +1,28 @@
+# portfolio/sitemaps.py
+from django.urls import reverse
+
+from base.sitemaps import Section
+from portfolio.models import Project, Technology
+
+
+class ProjectSitemap(Section):
+    model = Project
+    lastmod = "updated_at"
+    tags = ("project-feed",)
+
+    def location(self, pk):
+        # As `Project.get_absolute_url()`, without loading the project.
+        return reverse("portfolio:project-detail", kwargs={"pk": pk})
+
+
+class TechnologySitemap(Section):
+    """
+    Technology pages, last modified when one of their projects was.
+    """
+
+    model = Technology
+    lastmod = "projects__updated_at"
+    tags = ("project-feed",)
+
+    def location(self, pk):
+        return reverse("portfolio:technology-projects", kwargs={"technology_id": pk})
@@ -0,0 +1,194 @@
+# portfolio/storage.py
+"""
+Content-addressed storage of uploaded portfolio images.
+
+`ContentAddressedStorage` wraps the configured `DEFAULT_FILE_STORAGE`. It
+hashes each file it saves in chunks and stores it as
+`<upload directory>/<sha256><ext>`, so identical uploads (the same
+screenshot on several projects, and their identical renditions) share one
+object. Saving a file already stored writes nothing to the backend.
+
+A `StoredFile` row counts the references to each object. Saving adds one;
+`delete()` and `release()` remove one and delete the object with its last
+reference, holding the row's lock, so a concurrent save of the same
+content either keeps the object alive or writes it again. The files
+`portfolio.resizer` made from an object are deleted with it. Files stored
+before this storage was used have no row and aren't shared: `delete()`
+deletes them as any storage would, `release()` leaves them alone.
+
+`portfolio.images` releases a row's files when its image is replaced or
+removed and `portfolio.signals` when the row is deleted.
+"""
+import hashlib
+import posixpath
+
+from django.core.files.storage import Storage, default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+CHUNK_SIZE = 64 * 1024
+
+
+def content_digest(content):
+    """
+    Return the SHA-256 hex digest and size of the file `content`, read in
+    chunks.
+    """
+    digest, size = hashlib.sha256(), 0
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return digest.hexdigest(), size
+
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+    """
+    Files of `backend` (`default_storage` by default) named after their
+    content and reference counted; see the module docstring.
+
+    With `counted=False` saves only write to the backend. Processes that
+    must not use the database (see `generate_renditions`) save that way
+    and leave `retain()` to the parent.
+    """
+
+    def __init__(self, backend=None, counted=True):
+        self.backend = default_storage if backend is None else backend
+        self.counted = counted
+
+    @property
+    def uncounted(self):
+        return ContentAddressedStorage(self.backend, counted=False)
+
+    def get_available_name(self, name, max_length=None):
+        # Names are replaced by content hashes in `_save()`.
+        return name
+
+    def _save(self, name, content):
+        digest, size = content_digest(content)
+        directory = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        name = posixpath.join(directory, f"{digest}{extension}")
+        if not self.counted:
+            self.write(name, content)
+            return name
+        with transaction.atomic():
+            if not self.retain([name], size):
+                # Nobody else held a reference: the object may be missing.
+                self.write(name, content)
+        return name
+
+    def write(self, name, content):
+        if self.backend.exists(name):
+            return
+        saved = self.backend.save(name, content)
+        if saved != name:
+            # Written concurrently under `name`; the copy is the same file.
+            self.backend.delete(saved)
+
+    def retain(self, names, size=None):
+        """
+        Add a reference to each of `names`. Returns whether they all had
+        references already.
+        """
+        from portfolio.models import StoredFile
+
+        existed = True
+        with transaction.atomic():
+            for name in names:
+                stored, created = StoredFile.objects.select_for_update().get_or_create(
+                    name=name,
+                    defaults={
+                        "size": self.backend.size(name) if size is None else size
+                    },
+                )
+                if not created:
+                    StoredFile.objects.filter(pk=stored.pk).update(
+                        references=F("references") + 1
+                    )
+                existed = existed and not created
+        return existed
+
+    def release(self, names):
+        """
+        Remove a reference to each tracked name of `names`, deleting the
+        objects left without one. Returns the names deleted.
+        """
+        from portfolio.models import StoredFile
+
+        names, deleted = list(names), []
+        with transaction.atomic():
+            rows = StoredFile.objects.select_for_update().filter(name__in=set(names))
+            for stored in rows:
+                references = stored.references - names.count(stored.name)
+                if references > 0:
+                    StoredFile.objects.filter(pk=stored.pk).update(
+                        references=references
+                    )
+                    continue
+                stored.delete()
+                self.backend.delete(stored.name)
+                self.delete_derived(stored.name)
+                deleted.append(stored.name)
+        return deleted
+
+    def delete_derived(self, name):
+        """
+        Delete the resized copies of the object `name`, which is named
+        after its content's digest.
+        """
+        from portfolio import resizer
+
+        digest = posixpath.splitext(posixpath.basename(name))[0]
+        resizer.delete_variants(digest)
+
+    def delete(self, name):
+        from portfolio.models import StoredFile
+
+        if StoredFile.objects.filter(name=name).exists():
+            self.release([name])
+        else:
+            self.backend.delete(name)
+
+    def _open(self, name, mode="rb"):
+        return self.backend.open(name, mode)
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def url(self, name):
+        return self.backend.url(name)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+    def get_accessed_time(self, name):
+        return self.backend.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.backend.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.backend.get_modified_time(name)
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def image_storage():
+    """
+    The storage of portfolio image fields; a callable so migrations don't
+    depend on the configured backend.
+    """
+    return content_addressed_storage
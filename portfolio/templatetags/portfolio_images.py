@@ -0,0 +1,23 @@
+from django import template
+
+from portfolio import resizer
+
+register = template.Library()
+
+
+@register.simple_tag
+def resized_url(field_file, width, height=0):
+    """
+    The signed URL of the image in `field_file` fitted in `width` x
+    `height`, served by `portfolio.resizer`; empty if there is no image.
+    Images whose `<field>_sha256` isn't recorded yet are linked as they
+    are.
+
+        {% resized_url project.main_image 96 64 %}
+    """
+    if not field_file:
+        return ""
+    digest = getattr(field_file.instance, f"{field_file.field.name}_sha256", "")
+    if not digest:
+        return field_file.url
+    return resizer.resized_url(field_file.name, digest, width, height)
@@ -0,0 +1,67 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from portfolio.models import Project, Technology
+
+
+class ProjectFeedTest(TestCase):
+    """
+    Tests for the Atom and RSS feeds of `portfolio.Project`s.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = CustomUser.objects.create_user(
+            username="testuser1",
+            password="testpassword1",
+        )
+        cls.python = Technology.objects.create(name="Python")
+        cls.projects = [
+            Project.objects.create(
+                owner=owner, title=f"Project {number}", description="Description"
+            )
+            for number in range(2)
+        ]
+        cls.projects[0].technology.add(cls.python)
+
+    def get(self, url, **headers):
+        response = self.client.get(url, **headers)
+        if response.streaming:
+            response.body = b"".join(response.streaming_content).decode()
+        return response
+
+    def test_project_feed(self):
+        """
+        The project feed has an entry per project with its technologies.
+        """
+        response = self.get(reverse("portfolio:project-feed", args=["atom"]))
+        self.assertEqual(response.body.count("<entry>"), 2)
+        self.assertIn('<category term="Python"', response.body)
+        self.assertIn("Last-Modified", response)
+
+    def test_technology_feed_only_lists_its_projects(self):
+        """
+        A technology's feed only has the projects using it.
+        """
+        response = self.get(
+            reverse("portfolio:technology-feed", args=[self.python.pk, "rss"])
+        )
+        self.assertEqual(response.body.count("<item>"), 1)
+        self.assertIn("Project 0", response.body)
+
+    def test_updating_a_project_changes_validators(self):
+        """
+        Saving a project moves `Last-Modified` and the ETag.
+        """
+        url = reverse("portfolio:project-feed", args=["atom"])
+        etag = self.get(url)["ETag"]
+        self.projects[1].title = "Updated"
+        self.projects[1].save()
+        response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Updated", response.body)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code,
+            304,
+        )
@@ -0,0 +1,122 @@
+import hashlib
+from io import StringIO
+from unittest import mock
+
+from django.contrib.admin.sites import AdminSite
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+
+from base import page_cache
+from portfolio.admin import ProjectAdmin
+from portfolio.models import Project, ProjectImage
+from portfolio.tests.test_renditions import TemporaryMediaMixin, image_bytes
+
+
+class ImageMetadataTest(TemporaryMediaMixin, TestCase):
+    """
+    Tests for `portfolio.images` and the metadata it records.
+    """
+
+    def test_upload_records_metadata_without_reading_storage(self):
+        """
+        Metadata and renditions come from the upload itself.
+        """
+        content = image_bytes((600, 400), orientation=6)
+        with mock.patch.object(
+            FileSystemStorage, "open", side_effect=AssertionError("read storage")
+        ):
+            image = ProjectImage.objects.create(
+                project=Project.objects.create(owner=self.owner, title="Project"),
+                image=SimpleUploadedFile("shot.jpg", content),
+            )
+        image.refresh_from_db()
+        self.assertEqual(
+            (
+                image.image_width,
+                image.image_height,
+                image.image_size,
+                image.image_format,
+                image.image_sha256,
+            ),
+            (400, 600, len(content), "JPEG", hashlib.sha256(content).hexdigest()),
+        )
+        self.assertEqual(image.image_renditions[-1]["width"], 400)
+
+    def test_removing_the_image_clears_metadata(self):
+        """
+        Metadata describes the current image only.
+        """
+        project = Project.objects.create(
+            owner=self.owner,
+            title="Project",
+            main_image=SimpleUploadedFile(
+                "shot.png", image_bytes((50, 20), "RGB", "PNG")
+            ),
+        )
+        self.assertEqual(project.main_image_format, "PNG")
+        project.main_image = None
+        project.save()
+        project.refresh_from_db()
+        self.assertEqual(
+            (project.main_image_width, project.main_image_sha256), (None, "")
+        )
+
+    def test_detail_page_sets_image_dimensions(self):
+        """
+        The `<img>` carries the recorded dimensions.
+        """
+        project = Project.objects.create(
+            owner=self.owner,
+            title="Project",
+            main_image=SimpleUploadedFile("shot.jpg", image_bytes((300, 200))),
+        )
+        response = self.client.get(project.get_absolute_url())
+        self.assertContains(response, 'width="300" height="200"')
+
+    def test_admin_shows_recorded_dimensions(self):
+        """
+        The admin lists dimensions and size from the row.
+        """
+        project = Project(
+            main_image_width=1200, main_image_height=800, main_image_size=2048
+        )
+        admin = ProjectAdmin(Project, AdminSite())
+        self.assertEqual(admin.main_image_dimensions(project), "1200 x 800, 2.0\xa0KB")
+        self.assertEqual(admin.main_image_dimensions(Project()), "-")
+
+    def test_backfill_reads_stored_images(self):
+        """
+        `backfill_image_metadata` records the metadata of stored images and
+        reports those it can't read.
+        """
+        content = image_bytes((120, 90))
+        project = Project.objects.create(
+            owner=self.owner,
+            title="Project",
+            main_image=SimpleUploadedFile("shot.jpg", content),
+        )
+        Project.objects.filter(pk=project.pk).update(
+            main_image_width=None, main_image_sha256=""
+        )
+        Project.objects.create(owner=self.owner, title="Missing", main_image="gone.jpg")
+        tag = f"project:{project.pk}"
+        before = page_cache.current_versions([tag])[tag]
+        out, err = StringIO(), StringIO()
+        call_command(
+            "backfill_image_metadata",
+            "--missing-only",
+            "--batch-size=1",
+            stdout=out,
+            stderr=err,
+        )
+        project.refresh_from_db()
+        self.assertEqual(project.main_image_width, 120)
+        self.assertEqual(
+            project.main_image_sha256, hashlib.sha256(content).hexdigest()
+        )
+        self.assertIn("Recorded metadata of 1 Project(s), 1 failed.", out.getvalue())
+        self.assertIn("gone.jpg", err.getvalue())
+        # The cached pages showing the project are purged.
+        self.assertNotEqual(page_cache.current_versions([tag])[tag], before)
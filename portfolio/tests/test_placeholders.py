@@ -0,0 +1,95 @@
+import base64
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from PIL import Image
+
+from portfolio import placeholders
+from portfolio.models import Project
+from portfolio.tests.test_renditions import TemporaryMediaMixin, image_bytes
+
+
+def decode(uri):
+    data = base64.b64decode(uri.removeprefix(placeholders.PREFIX))
+    image = Image.open(BytesIO(data))
+    image.load()
+    return image
+
+
+class PlaceholderTest(SimpleTestCase):
+    """
+    Tests for `portfolio.placeholders`.
+    """
+
+    def setUp(self):
+        self.image = Image.linear_gradient("L").resize((1200, 800)).convert("RGB")
+
+    def test_placeholder_is_a_small_webp_data_uri(self):
+        """
+        Placeholders are `PLACEHOLDER_WIDTH` wide WebP images under 1 KB.
+        """
+        uri = placeholders.placeholder(self.image)
+        self.assertTrue(uri.startswith("data:image/webp;base64,"))
+        self.assertLessEqual(len(uri), placeholders.PLACEHOLDER_MAX_BYTES)
+        image = decode(uri)
+        self.assertEqual((image.format, image.size), ("WEBP", (16, 11)))
+
+    def test_oversized_placeholders_are_shrunk(self):
+        """
+        A placeholder over the byte budget is made narrower.
+        """
+        with mock.patch.object(placeholders, "PLACEHOLDER_MAX_BYTES", 60):
+            uri = placeholders.placeholder(self.image)
+        self.assertLess(decode(uri).width, placeholders.PLACEHOLDER_WIDTH)
+
+    def test_downsample_matches_box_filter(self):
+        """
+        The NumPy block average matches Pillow's box filter on whole
+        blocks.
+        """
+        image = self.image.resize((160, 110))
+        expected = image.resize((16, 11), Image.BOX)
+        actual = placeholders.downsample(image, 16, 11)
+        # Up to rounding of halves.
+        for pixel, expected_pixel in zip(actual.getdata(), expected.getdata()):
+            for channel, expected_channel in zip(pixel, expected_pixel):
+                self.assertLessEqual(abs(channel - expected_channel), 1)
+
+    def test_downsample_averages_every_pixel(self):
+        """
+        Sizes that don't divide still average the whole image.
+        """
+        image = Image.new("RGB", (31, 31), (255, 0, 0))
+        image.paste((0, 0, 255), (16, 0, 31, 31))
+        actual = placeholders.downsample(image, 16, 16)
+        self.assertEqual(actual.size, (16, 16))
+        self.assertEqual(actual.getpixel((0, 0)), (255, 0, 0))
+        self.assertEqual(actual.getpixel((15, 15)), (0, 0, 255))
+        # The blue half is 15 of the 31 columns.
+        blue = sum(pixel[2] for pixel in actual.getdata()) / 16 / 16
+        self.assertAlmostEqual(blue, 255 * 15 / 31, delta=5)
+
+
+class UploadPlaceholderTest(TemporaryMediaMixin, TestCase):
+    """
+    Tests for the placeholders of uploaded images.
+    """
+
+    def test_list_page_inlines_placeholder_and_lazy_loads(self):
+        """
+        Cards show the stored placeholder until the image loads lazily.
+        """
+        project = Project.objects.create(
+            owner=self.owner,
+            title="Project",
+            main_image=SimpleUploadedFile("shot.jpg", image_bytes((640, 480))),
+        )
+        self.assertEqual(decode(project.main_image_placeholder).size, (16, 12))
+        response = self.client.get(reverse("portfolio:projects"))
+        self.assertContains(
+            response, f"background: url('{project.main_image_placeholder}')"
+        )
+        self.assertContains(response, 'loading="lazy"')
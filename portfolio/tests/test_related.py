@@ -0,0 +1,111 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from portfolio import related
+from portfolio.models import Project, RelatedProject, Technology
+
+
+def neighbours(project):
+    return list(
+        RelatedProject.objects.filter(project=project)
+        .order_by("rank")
+        .values_list("related_id", "score")
+    )
+
+
+@override_settings(PORTFOLIO_RELATED_PROJECTS=2)
+class RelatedProjectsTest(TestCase):
+    """
+    Tests for `portfolio.related` and the signals keeping it up to date.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        cls.python, cls.django, cls.rust = (
+            Technology.objects.create(name=name)
+            for name in ("Python", "Django", "Rust")
+        )
+        cls.blog, cls.shop, cls.cli, cls.game = (
+            Project.objects.create(owner=owner, title=title)
+            for title in ("Blog", "Shop", "CLI", "Game")
+        )
+        cls.blog.technology.set([cls.python, cls.django])
+        cls.shop.technology.set([cls.python, cls.django])
+        cls.cli.technology.set([cls.python, cls.rust])
+        cls.game.technology.set([cls.rust])
+
+    def test_neighbours_are_ranked_by_jaccard(self):
+        """
+        Projects sharing more of their technologies come first.
+        """
+        self.assertEqual(
+            neighbours(self.blog), [(self.shop.pk, 1.0), (self.cli.pk, 1 / 3)]
+        )
+        self.assertEqual(neighbours(self.game), [(self.cli.pk, 0.5)])
+
+    def test_technology_changes_update_lists(self):
+        """
+        Adding and removing technologies, from either side, updates the
+        lists that change.
+        """
+        self.game.technology.add(self.python)
+        self.assertEqual(
+            neighbours(self.game), [(self.cli.pk, 1.0), (self.blog.pk, 1 / 3)]
+        )
+        self.assertEqual(neighbours(self.cli)[0], (self.game.pk, 1.0))
+        self.rust.projects.clear()
+        self.assertEqual(
+            neighbours(self.cli), [(self.game.pk, 1.0), (self.blog.pk, 0.5)]
+        )
+        self.django.delete()
+        self.assertEqual(
+            neighbours(self.blog), [(self.shop.pk, 1.0), (self.cli.pk, 1.0)]
+        )
+
+    def test_deleting_a_project_refills_lists(self):
+        """
+        Lists that held a deleted project are recomputed without it.
+        """
+        self.shop.delete()
+        self.assertEqual(neighbours(self.blog), [(self.cli.pk, 1 / 3)])
+
+    def test_rebuild_matches_incremental_updates(self):
+        """
+        A full rebuild yields the lists kept by the signals.
+        """
+        before = {project.pk: neighbours(project) for project in Project.objects.all()}
+        out = StringIO()
+        call_command("rebuild_related_projects", stdout=out)
+        self.assertIn("4 project(s)", out.getvalue())
+        after = {project.pk: neighbours(project) for project in Project.objects.all()}
+        self.assertEqual(after.keys(), before.keys())
+        for pk, rows in after.items():
+            self.assertEqual([i for i, _ in rows], [i for i, _ in before[pk]])
+            for (_, got), (_, want) in zip(rows, before[pk]):
+                self.assertAlmostEqual(got, want, places=6)
+
+    def test_update_skips_unrelated_projects(self):
+        """
+        Only the lists a changed project can affect are rewritten.
+        """
+        self.assertEqual(
+            related.update([self.game.pk]), {self.game.pk, self.cli.pk}
+        )
+
+    def test_detail_view_shows_similar_projects_with_one_query(self):
+        """
+        The section adds one query to `ProjectDetailView`.
+        """
+        url = reverse("portfolio:project-detail", kwargs={"pk": self.blog.pk})
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.context["related_projects"], [self.shop, self.cli])
+        self.assertContains(response, "Similar projects:")
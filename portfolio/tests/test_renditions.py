@@ -0,0 +1,181 @@
+import hashlib
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from accounts.models import CustomUser
+from portfolio.models import Project, ProjectImage
+
+# EXIF tag for the orientation; 6 means "rotate 90 degrees clockwise".
+ORIENTATION = 0x0112
+
+
+def image_bytes(size, mode="RGB", image_format="JPEG", orientation=None):
+    image = Image.new(mode, size, "red")
+    buffer = BytesIO()
+    options = {}
+    if orientation:
+        exif = Image.Exif()
+        exif[ORIENTATION] = orientation
+        options["exif"] = exif
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def upload(name, size, mode="RGB", image_format="JPEG", orientation=None):
+    return SimpleUploadedFile(
+        name, image_bytes(size, mode, image_format, orientation)
+    )
+
+
+class TemporaryMediaMixin:
+    """
+    Store uploads in a temporary directory on the local file system.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(
+            DEFAULT_FILE_STORAGE="django.core.files.storage.FileSystemStorage",
+            MEDIA_ROOT=media_root,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def open(self, name):
+        with default_storage.open(name) as file:
+            image = Image.open(file)
+            image.load()
+        return image
+
+    def assertContentAddressed(self, name, directory, extension):
+        """
+        Assert that the stored file `name` is named after its content.
+        """
+        with default_storage.open(name) as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        self.assertEqual(name, f"{directory}/{digest}.{extension}")
+
+
+class RenditionsTest(TemporaryMediaMixin, TestCase):
+    """
+    Tests for `portfolio.renditions` and the models generating them.
+    """
+
+    def test_upload_generates_oriented_renditions_without_exif(self):
+        """
+        Each width narrower than the original is rendered, plus the original
+        width, in WebP and JPEG, upright and without EXIF data.
+        """
+        project = Project.objects.create(
+            owner=self.owner,
+            title="Project",
+            main_image=upload("shot.jpg", (1500, 800), orientation=6),
+        )
+        project.refresh_from_db()
+        renditions = project.main_image_renditions
+        self.assertEqual(
+            [(r["width"], r["height"]) for r in renditions],
+            [(320, 600), (640, 1200), (800, 1500)],
+        )
+        self.assertContentAddressed(renditions[0]["webp"], "portfolio", "webp")
+        self.assertContentAddressed(renditions[0]["fallback"], "portfolio", "jpg")
+        webp = self.open(renditions[1]["webp"])
+        self.assertEqual((webp.format, webp.size), ("WEBP", (640, 1200)))
+        fallback = self.open(renditions[1]["fallback"])
+        self.assertEqual(fallback.format, "JPEG")
+        self.assertNotIn(ORIENTATION, fallback.getexif())
+
+    def test_transparent_images_fall_back_to_png(self):
+        """
+        Images with transparency keep it in a PNG fallback.
+        """
+        image = ProjectImage.objects.create(
+            project=Project.objects.create(owner=self.owner, title="Project"),
+            image=upload("logo.png", (200, 100), "RGBA", "PNG"),
+        )
+        [rendition] = image.image_renditions
+        self.assertEqual((rendition["width"], rendition["height"]), (200, 100))
+        self.assertContentAddressed(rendition["webp"], "project_images", "webp")
+        self.assertContentAddressed(rendition["fallback"], "project_images", "png")
+        self.assertEqual(self.open(rendition["fallback"]).mode, "RGBA")
+
+    def test_saving_without_a_new_upload_keeps_renditions(self):
+        """
+        Renditions are only generated when an image is uploaded, and
+        dropped with the image.
+        """
+        project = Project.objects.create(
+            owner=self.owner,
+            title="Project",
+            main_image=upload("shot.jpg", (400, 300)),
+        )
+        renditions = project.main_image_renditions
+        project.title = "Renamed"
+        project.save()
+        self.assertEqual(project.main_image_renditions, renditions)
+        project.main_image = None
+        project.save()
+        project.refresh_from_db()
+        self.assertEqual(project.main_image_renditions, [])
+
+    def test_templates_offer_srcsets(self):
+        """
+        List and detail pages offer WebP and fallback `srcset`s.
+        """
+        project = Project.objects.create(
+            owner=self.owner,
+            title="Project",
+            main_image=upload("shot.jpg", (700, 300)),
+        )
+        webp = [r["webp"] for r in project.main_image_renditions]
+        fallback = project.main_image_renditions[-1]["fallback"]
+        for url in (reverse("portfolio:projects"), project.get_absolute_url()):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(
+                    response,
+                    f'srcset="/media/{webp[0]} 320w, '
+                    f'/media/{webp[1]} 640w, '
+                    f'/media/{webp[2]} 700w"',
+                )
+                self.assertContains(response, f"/media/{fallback} 700w")
+
+    def test_command_generates_missing_renditions(self):
+        """
+        `generate_renditions` renders renditions and placeholders of
+        existing images in worker processes.
+        """
+        project = Project.objects.create(
+            owner=self.owner,
+            title="Project",
+            main_image=upload("shot.jpg", (400, 300)),
+        )
+        Project.objects.filter(pk=project.pk).update(
+            main_image_renditions=[], main_image_placeholder=""
+        )
+        out = StringIO()
+        call_command("generate_renditions", "--missing-only", "--workers=2", stdout=out)
+        project.refresh_from_db()
+        self.assertEqual(
+            [r["width"] for r in project.main_image_renditions], [320, 400]
+        )
+        self.assertTrue(project.main_image_placeholder.startswith("data:image/webp"))
+        self.assertIn(
+            "Generated renditions for 1 Project(s), 0 failed.", out.getvalue()
+        )
@@ -0,0 +1,257 @@
+import os
+import shutil
+import tempfile
+import time
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.html import escape
+from PIL import Image
+
+from portfolio import resizer
+from portfolio.models import Project, RelatedProject
+from portfolio.storage import content_addressed_storage
+from portfolio.tests.test_renditions import TemporaryMediaMixin, upload
+
+WEBP_ACCEPT = "image/avif,image/webp,*/*"
+
+
+class DiskCacheTest(SimpleTestCase):
+    """
+    Tests for `portfolio.resizer.DiskCache`.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def age(self, cache, key, seconds):
+        moment = time.time() - seconds
+        os.utime(cache.path(key), (moment, moment))
+
+    def test_least_recently_used_files_are_evicted(self):
+        """
+        Going over the budget deletes the files read longest ago.
+        """
+        cache = resizer.DiskCache(self.directory, 350)
+        for number, key in enumerate(("aa1", "bb2", "cc3")):
+            cache.put(key, b"x" * 100)
+            self.age(cache, key, 100 - number)
+        # Reading the oldest file makes it the most recently used.
+        cache.open("aa1").close()
+        cache.put("dd4", b"x" * 100)
+        self.assertIsNone(cache.open("bb2"))
+        for key in ("aa1", "cc3", "dd4"):
+            with cache.open(key) as file:
+                self.assertEqual(file.read(), b"x" * 100)
+        self.assertEqual(cache.size, 300)
+
+    def test_missing_file(self):
+        cache = resizer.DiskCache(self.directory, 300)
+        self.assertIsNone(cache.open("aa1"))
+
+
+class ResizerTest(TemporaryMediaMixin, TestCase):
+    """
+    Tests for `portfolio.resizer.resized_image`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        settings = override_settings(PORTFOLIO_RESIZE_CACHE_DIR=cache_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.cache_dir = cache_dir
+        self.project = Project.objects.create(
+            owner=self.owner,
+            title="Project",
+            main_image=upload("shot.jpg", (1200, 800)),
+        )
+        self.name = self.project.main_image.name
+        self.digest = self.project.main_image_sha256
+
+    def get(self, url, **headers):
+        return self.client.get(url, HTTP_ACCEPT=WEBP_ACCEPT, **headers)
+
+    def test_image_is_fitted_in_the_box(self):
+        """
+        The first request renders the image, scaled down to fit, as WebP
+        with a strong ETag and immutable caching.
+        """
+        response = self.get(resizer.resized_url(self.name, self.digest, 300, 300))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        self.assertEqual(response["Vary"], "Accept")
+        self.assertTrue(response["ETag"].startswith('"'))
+        image = Image.open(BytesIO(response.content))
+        self.assertEqual((image.format, image.size), ("WEBP", (300, 200)))
+
+    def test_images_are_not_upscaled(self):
+        response = self.get(resizer.resized_url(self.name, self.digest, 2000, 0))
+        image = Image.open(BytesIO(response.content))
+        self.assertEqual(image.size, (1200, 800))
+
+    def test_fallback_format_without_webp_support(self):
+        """
+        Browsers not accepting WebP get the fallback format.
+        """
+        response = self.client.get(
+            resizer.resized_url(self.name, self.digest, 0, 100),
+            HTTP_ACCEPT="image/*",
+        )
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        image = Image.open(BytesIO(response.content))
+        self.assertEqual((image.format, image.size), ("JPEG", (150, 100)))
+
+    def test_later_requests_are_served_from_disk(self):
+        """
+        Rendered files are kept on disk and served without rendering.
+        """
+        url = resizer.resized_url(self.name, self.digest, 300, 0)
+        rendered = self.get(url).content
+        with mock.patch.object(resizer, "render") as render:
+            with mock.patch.object(default_storage, "exists") as exists:
+                response = self.get(url)
+                self.assertEqual(b"".join(response.streaming_content), rendered)
+        render.assert_not_called()
+        exists.assert_not_called()
+
+    def test_evicted_files_are_read_from_storage(self):
+        """
+        Files no longer on disk are copied back from the storage backend.
+        """
+        url = resizer.resized_url(self.name, self.digest, 300, 0)
+        rendered = self.get(url).content
+        self.assertTrue(default_storage.exists(f"resized/{self.digest}/300x0.webp"))
+        shutil.rmtree(self.cache_dir)
+        with mock.patch.object(resizer, "render") as render:
+            self.assertEqual(self.get(url).content, rendered)
+        render.assert_not_called()
+
+    def test_images_are_read_and_resized_in_the_field_storage(self):
+        """
+        Sources are read from, and resized files saved to, the storage of
+        the image fields rather than `default_storage`.
+        """
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        backend = FileSystemStorage(location=location)
+        with mock.patch.object(content_addressed_storage, "backend", backend):
+            project = Project.objects.create(
+                owner=self.owner,
+                title="Elsewhere",
+                main_image=upload("elsewhere.jpg", (640, 480)),
+            )
+            name, digest = project.main_image.name, project.main_image_sha256
+            self.assertFalse(default_storage.exists(name))
+            response = self.get(resizer.resized_url(name, digest, 320, 0))
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(backend.exists(f"resized/{digest}/320x0.webp"))
+        self.assertFalse(default_storage.exists(f"resized/{digest}"))
+
+    def test_matching_etag_returns_304(self):
+        """
+        A client holding the ETag gets a 304 without anything being read.
+        """
+        url = resizer.resized_url(self.name, self.digest, 300, 0)
+        etag = self.get(url)["ETag"]
+        with mock.patch.object(resizer.DiskCache, "open") as open_file:
+            response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        open_file.assert_not_called()
+
+    def test_unsigned_or_tampered_urls_return_404(self):
+        """
+        Only URLs signed for that size and image are served.
+        """
+        url = resizer.resized_url(self.name, self.digest, 300, 0)
+        path = reverse(
+            "resized-image", kwargs={"width": 600, "height": 0, "name": self.name}
+        )
+        for bad in (
+            url.split("?")[0],
+            url.replace("300x0", "600x0"),
+            url.replace(self.digest, "0" * 64),
+            path,
+        ):
+            self.assertEqual(self.get(bad).status_code, 404)
+
+    def test_sizes_and_names_are_restricted(self):
+        """
+        Sizes are bounded and only portfolio images are served, even with
+        a valid signature.
+        """
+        for name, width, height in (
+            (self.name, 0, 0),
+            (self.name, 3000, 0),
+            ("other/secret.jpg", 300, 0),
+            ("portfolio/../other/secret.jpg", 300, 0),
+        ):
+            with self.subTest(name=name, width=width, height=height):
+                url = resizer.resized_url(name, self.digest, width, height)
+                self.assertEqual(self.get(url).status_code, 404)
+
+    def test_changed_images_are_not_served_under_old_urls(self):
+        """
+        Resized files are keyed by content, and a source no longer
+        matching the digest in the URL isn't rendered.
+        """
+        url = resizer.resized_url(self.name, self.digest, 300, 0)
+        default_storage.delete(self.name)
+        default_storage.save(self.name, upload("other.jpg", (600, 400)))
+        self.assertEqual(self.get(url).status_code, 404)
+        self.assertFalse(default_storage.exists(f"resized/{self.digest}/300x0.webp"))
+
+    def test_variants_are_deleted_with_the_image(self):
+        """
+        Releasing the last reference to an image deletes its resized files
+        from storage and from the disk cache.
+        """
+        url = resizer.resized_url(self.name, self.digest, 300, 0)
+        self.get(url)
+        self.client.get(url, HTTP_ACCEPT="image/*")
+        stored = f"resized/{self.digest}"
+        cached = os.path.join(self.cache_dir, self.digest[:2])
+        self.assertEqual(len(default_storage.listdir(stored)[1]), 2)
+        self.assertEqual(len(os.listdir(cached)), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()
+        self.assertEqual(default_storage.listdir(stored)[1], [])
+        self.assertEqual(os.listdir(cached), [])
+        self.assertEqual(self.get(url).status_code, 404)
+
+    def test_missing_images_return_404(self):
+        url = resizer.resized_url("portfolio/missing.jpg", self.digest, 300, 0)
+        response = self.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(PORTFOLIO_RESIZE_MAX_PENDING=0)
+    def test_renders_over_the_cap_return_503(self):
+        """
+        Requests needing a render while the pool is full are turned away.
+        """
+        response = self.get(resizer.resized_url(self.name, self.digest, 300, 0))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_similar_projects_show_resized_thumbnails(self):
+        """
+        The project page links thumbnails of similar projects' images.
+        """
+        other = Project.objects.create(owner=self.owner, title="Other")
+        RelatedProject.objects.create(
+            project=other, related=self.project, rank=0, score=1.0
+        )
+        response = self.client.get(other.get_absolute_url())
+        self.assertContains(
+            response, escape(resizer.resized_url(self.name, self.digest, 96, 64))
+        )
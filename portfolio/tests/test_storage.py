@@ -0,0 +1,121 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase
+
+from portfolio.models import Project, ProjectImage, StoredFile
+from portfolio.storage import content_addressed_storage
+from portfolio.tests.test_renditions import TemporaryMediaMixin, upload
+
+
+def references(name):
+    stored = StoredFile.objects.filter(name=name).first()
+    return stored.references if stored else 0
+
+
+class ContentAddressedStorageTest(TemporaryMediaMixin, TestCase):
+    """
+    Tests for `portfolio.storage.ContentAddressedStorage`.
+    """
+
+    def create(self, name="shot.jpg", size=(400, 300)):
+        return Project.objects.create(
+            owner=self.owner, title="Project", main_image=upload(name, size)
+        )
+
+    def stored_names(self, project):
+        return [project.main_image.name] + [
+            rendition[key]
+            for rendition in project.main_image_renditions
+            for key in ("webp", "fallback")
+        ]
+
+    def test_uploads_are_named_after_their_content(self):
+        project = self.create("Screen Shot.JPG")
+        self.assertEqual(
+            project.main_image.name, f"portfolio/{project.main_image_sha256}.jpg"
+        )
+        self.assertEqual(references(project.main_image.name), 1)
+
+    def test_identical_uploads_share_one_file(self):
+        """
+        Uploading the same content again writes nothing and adds a
+        reference.
+        """
+        first = self.create()
+        with mock.patch.object(
+            default_storage, "save", wraps=default_storage.save
+        ) as save:
+            second = self.create("copy.jpg")
+        save.assert_not_called()
+        self.assertEqual(self.stored_names(second), self.stored_names(first))
+        for name in self.stored_names(first):
+            self.assertEqual(references(name), 2)
+        other = self.create(size=(401, 300))
+        self.assertNotEqual(other.main_image.name, first.main_image.name)
+        self.assertEqual(
+            ProjectImage.objects.create(project=other, image=upload("a.jpg", (1, 1)))
+            .image.name.split("/")[0],
+            "project_images",
+        )
+
+    def test_files_are_deleted_with_their_last_reference(self):
+        first, second = self.create(), self.create()
+        names = self.stored_names(first)
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        for name in names:
+            self.assertTrue(default_storage.exists(name))
+            self.assertEqual(references(name), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        for name in names:
+            self.assertFalse(default_storage.exists(name))
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_replacing_an_image_releases_the_previous_one(self):
+        project = self.create()
+        names = self.stored_names(project)
+        with self.captureOnCommitCallbacks(execute=True):
+            project.main_image = upload("new.jpg", (500, 300))
+            project.save()
+        for name in names:
+            self.assertFalse(default_storage.exists(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            project.main_image = None
+            project.save()
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_untracked_files_are_deleted_directly(self):
+        """
+        Files stored before content addressing aren't shared.
+        """
+        name = default_storage.save("portfolio/old.jpg", ContentFile(b"old"))
+        content_addressed_storage.release([name])
+        self.assertTrue(default_storage.exists(name))
+        content_addressed_storage.delete(name)
+        self.assertFalse(default_storage.exists(name))
+
+    def test_command_counts_references_to_renditions(self):
+        """
+        Renditions saved by `generate_renditions` workers are counted by
+        the parent, and the ones they replace released.
+        """
+        project = self.create()
+        previous = project.main_image_renditions
+        Project.objects.filter(pk=project.pk).update(main_image_placeholder="")
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "generate_renditions",
+                "--missing-only",
+                "--workers=1",
+                stdout=StringIO(),
+            )
+        project.refresh_from_db()
+        # The same renditions are rendered again.
+        self.assertEqual(project.main_image_renditions, previous)
+        for name in self.stored_names(project):
+            self.assertEqual(references(name), 1)
@@ -7,6 +7,7 @@ from accounts.models import CustomUser
 
 from portfolio.models import (
     Project,
+    Technology,
 )
 
 
@@ -114,3 +115,54 @@ class TestProjectUpdateView(TestCase):
             ),
         )
         self.assertEqual(response.status_code, 403)
+
+
+class TestProjectListQueryCount(TestCase):
+    """
+    Test that the project list views render in a constant number of queries.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create several projects, each with several technologies.
+        """
+        cls.user1 = CustomUser.objects.create_user(
+            username="testuser1",
+            email="testuser1@email.app",
+            password="testpassword1",
+        )
+        cls.technologies = [
+            Technology.objects.create(name=f"Technology {number}")
+            for number in range(3)
+        ]
+        for number in range(5):
+            project = Project.objects.create(
+                owner=cls.user1,
+                title=f"Test Project {number}",
+                description="Test description",
+            )
+            project.technology.set(cls.technologies)
+
+    def test_project_list_view_query_count(self):
+        """
+        `ProjectListView` should fetch projects and technologies in two
+        queries.
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("portfolio:projects"))
+        self.assertEqual(len(response.context["project_list"]), 5)
+
+    def test_technology_projects_view_query_count(self):
+        """
+        `technology_projects` should fetch the technology and its projects
+        in two queries.
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse(
+                    "portfolio:technology-projects",
+                    kwargs={"technology_id": self.technologies[0].pk},
+                )
+            )
+        self.assertEqual(len(response.context["projects"]), 5)
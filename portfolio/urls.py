@@ -9,6 +9,11 @@ urlpatterns = [
         views.ProjectListView.as_view(),
         name="projects",
     ),
+    path(
+        "projects/feed/<str:feed_format>/",
+        views.project_feed,
+        name="project-feed",
+    ),
     path(
         "projects/create/",
         views.ProjectCreateView.as_view(),
@@ -28,5 +33,10 @@ urlpatterns = [
         "technologies/<int:technology_id>/projects/",
         views.technology_projects,
         name="technology-projects",
-    )
+    ),
+    path(
+        "technologies/<int:technology_id>/projects/feed/<str:feed_format>/",
+        views.technology_feed,
+        name="technology-feed",
+    ),
 ]
@@ -6,14 +6,32 @@ from django.views.generic.edit import (
 )
 from django.contrib.auth.mixins import UserPassesTestMixin
 
+from django.db.models import Count, Max, Prefetch
 from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
+from django.utils.decorators import method_decorator
 
 from .mixins import RegistrationAcceptedMixin
 from .forms import ProjectForm
+from base.feeds import CHUNK_ITEMS, feed_response
+from base.page_cache import add_cache_tags, cache_anonymous_page, object_tags
 from config.settings import THE_SITE_NAME
 from . import models
 
 
+def with_technologies(projects):
+    """
+    Prefetch the `technology` names of `projects` in a single query so
+    list templates don't issue one query per project.
+    """
+    return projects.prefetch_related(
+        Prefetch(
+            "technology",
+            queryset=models.Technology.objects.only("id", "name"),
+        )
+    )
+
+
 class ProjectCreateView(RegistrationAcceptedMixin, CreateView):
     """
     Create view for `models.Project` model.
@@ -50,33 +68,67 @@ class ProjectUpdateView(UserPassesTestMixin, UpdateView):
         return self.request.user == self.get_object().owner
 
 
+def add_project_tags(request, projects):
+    """
+    Tag a cached page with the projects it shows and their technologies.
+    """
+    add_cache_tags(request, *object_tags("project", projects))
+    for project in projects:
+        add_cache_tags(request, *object_tags("technology", project.technology.all()))
+
+
+@method_decorator(cache_anonymous_page("portfolio:project-detail"), name="dispatch")
 class ProjectDetailView(DetailView):
     """
     Detail view for `models.Project` model.
     """
 
     model = models.Project
+    queryset = with_technologies(
+        models.Project.objects.select_related("owner")
+    ).prefetch_related("images")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Precomputed by `portfolio.related`; one lookup on the
+        # `(project, rank)` index.
+        context["related_projects"] = [
+            row.related
+            for row in models.RelatedProject.objects.filter(project=self.object)
+            .select_related("related")
+            .only(
+                "related__title", "related__main_image", "related__main_image_sha256"
+            )
+            .order_by("rank")
+        ]
+        add_project_tags(self.request, [self.object])
+        add_cache_tags(
+            self.request,
+            f"related-project:{self.object.pk}",
+            *object_tags("project", context["related_projects"]),
+        )
         context["the_site_name"] = THE_SITE_NAME
         return context
 
 
+@method_decorator(cache_anonymous_page("portfolio:projects"), name="dispatch")
 class ProjectListView(ListView):
     """
     List view for `models.Project` model.
     """
 
-    queryset = models.Project.objects.all().order_by("-created_at")
+    queryset = with_technologies(models.Project.objects.all()).order_by("-created_at")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        add_cache_tags(self.request, "projects")
+        add_project_tags(self.request, context["object_list"])
         context["page_title"] = "Flynnt Projects"
         context["the_site_name"] = THE_SITE_NAME
         return context
 
 
+@cache_anonymous_page("portfolio:technology-projects")
 def technology_projects(request, technology_id):
     """
     View to display projects by technology.
@@ -84,7 +136,11 @@ def technology_projects(request, technology_id):
     # Get the `Technology` object or return a 404 error.
     technology = get_object_or_404(models.Technology, pk=technology_id)
     # Get the `Project` objects associated with the `Technology` object.
-    projects = technology.projects.all()
+    # The template only shows each project's own fields, so no related data
+    # needs prefetching here.
+    projects = technology.projects.all().order_by("-created_at")
+    add_cache_tags(request, f"technology:{technology.pk}")
+    add_cache_tags(request, *object_tags("project", projects))
     # Create the context dictionary to pass to the template.
     context = {
         "page_title": f"Projects using {technology.name}",
@@ -94,3 +150,85 @@ def technology_projects(request, technology_id):
     }
     # Render the template.
     return render(request, "portfolio/technology_projects.html", context)
+
+
+def project_feed_items(request, projects):
+    """
+    Yield the feed items of `projects`, most recently updated first,
+    fetched in chunks.
+    """
+    projects = (
+        with_technologies(projects)
+        .select_related("owner")
+        .only(
+            "id",
+            "title",
+            "description_html",
+            "created_at",
+            "updated_at",
+            "owner__username",
+        )
+        .order_by("-updated_at", "-id")
+    )
+    for project in projects.iterator(chunk_size=CHUNK_ITEMS):
+        yield {
+            "title": project.title,
+            "link": request.build_absolute_uri(project.get_absolute_url()),
+            "description": project.description_html,
+            "pubdate": project.created_at,
+            "updateddate": project.updated_at,
+            "author_name": str(project.owner),
+            "categories": [
+                technology.name for technology in project.technology.all()
+            ],
+        }
+
+
+def project_feed_response(request, feed_format, projects, tags, **feed_kwargs):
+    """
+    Return the `feed_format` feed of `projects`; see `base.feeds`.
+    """
+    stats = projects.aggregate(latest=Max("updated_at"), count=Count("id"))
+    return feed_response(
+        request,
+        feed_format,
+        items=project_feed_items(request, projects),
+        last_modified=stats["latest"],
+        count=stats["count"],
+        tags=tags,
+        feed_url=request.build_absolute_uri(),
+        **feed_kwargs,
+    )
+
+
+def project_feed(request, feed_format):
+    """
+    Atom or RSS feed of every `models.Project`.
+    """
+    return project_feed_response(
+        request,
+        feed_format,
+        models.Project.objects.all(),
+        ["project-feed"],
+        title=f"{THE_SITE_NAME} - Flynnt Projects",
+        link=request.build_absolute_uri(reverse("portfolio:projects")),
+        description="Every project in the portfolio.",
+    )
+
+
+def technology_feed(request, technology_id, feed_format):
+    """
+    Atom or RSS feed of the `models.Project`s using a `models.Technology`.
+    """
+    technology = get_object_or_404(
+        models.Technology.objects.only("id", "name"), pk=technology_id
+    )
+    return project_feed_response(
+        request,
+        feed_format,
+        technology.projects.all(),
+        ["project-feed"],
+        title=f"{THE_SITE_NAME} - Projects using {technology.name}",
+        link=request.build_absolute_uri(technology.get_absolute_url()),
+        description=f"Projects using {technology.name}.",
+    )
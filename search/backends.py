@@ -0,0 +1,207 @@
+# search/backends.py
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+DOCUMENT_TABLE = "search_searchdocument"
+FTS_TABLE = "search_searchdocument_fts"
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+# PostgreSQL keeps the `tsvector` in a generated column, so it is updated
+# by the database whenever a `SearchDocument` row is written.
+POSTGRES_INSTALL = [
+    f"""
+    ALTER TABLE {DOCUMENT_TABLE}
+    ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    f"""
+    CREATE INDEX search_document_vector_idx
+    ON {DOCUMENT_TABLE} USING gin (search_vector)
+    """,
+]
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS search_document_vector_idx",
+    f"ALTER TABLE {DOCUMENT_TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+# SQLite keeps the text in an FTS5 shadow table whose `rowid` is the
+# `SearchDocument` id. It is written by `index_document()`.
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+    USING fts5(title, body, tokenize='porter unicode61')
+    """,
+]
+SQLITE_UNINSTALL = [
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def install(schema_editor):
+    """
+    Create the backend-specific full-text index.
+    """
+    statements = {
+        "postgresql": POSTGRES_INSTALL,
+        "sqlite": SQLITE_INSTALL,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def uninstall(schema_editor):
+    """
+    Drop the backend-specific full-text index.
+    """
+    statements = {
+        "postgresql": POSTGRES_UNINSTALL,
+        "sqlite": SQLITE_UNINSTALL,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def index_document(document):
+    """
+    Bring the full-text index up to date for a saved `SearchDocument`.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [document.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES (%s, %s, %s)",
+            [document.pk, document.title, document.body],
+        )
+
+
+def remove_document(document_id):
+    """
+    Remove a deleted `SearchDocument` from the full-text index.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [document_id])
+
+
+def sqlite_match_expression(query):
+    """
+    Turn free text into an FTS5 expression: every word must match, the last
+    one as a prefix. Words are quoted so FTS5 operators in user input are
+    treated as text.
+    """
+    words = WORD.findall(query)
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def postgres_tsquery(query):
+    """
+    Turn free text into a `to_tsquery()` expression matching the same way
+    as `sqlite_match_expression()`: every word must match, the last one as
+    a prefix. Words only hold word characters, so quoting them is enough
+    to keep `tsquery` operators in user input from being parsed.
+    """
+    terms = [f"'{word}'" for word in WORD.findall(query)]
+    terms[-1] += ":*"
+    return " & ".join(terms)
+
+
+def search(query, kind=None, limit=None, offset=0):
+    """
+    Return `(document_id, kind, object_id)` rows matching `query`, best
+    match first.
+    """
+    if not WORD.search(query):
+        return []
+    kind_clause = "AND d.kind = %s" if kind else ""
+    kind_params = [kind] if kind else []
+    limit_clause = "LIMIT %s OFFSET %s" if limit is not None else ""
+    limit_params = [limit, offset] if limit is not None else []
+
+    if connection.vendor == "postgresql":
+        sql = f"""
+            SELECT d.id, d.kind, d.object_id
+            FROM {DOCUMENT_TABLE} d,
+                 to_tsquery('english', %s) q
+            WHERE d.search_vector @@ q {kind_clause}
+            ORDER BY ts_rank_cd(d.search_vector, q) DESC, d.id DESC
+            {limit_clause}
+        """
+        params = [postgres_tsquery(query), *kind_params, *limit_params]
+    elif connection.vendor == "sqlite":
+        expression = sqlite_match_expression(query)
+        if limit is None:
+            # SQLite requires a `LIMIT` before `OFFSET`; -1 means no limit.
+            limit_clause, limit_params = "LIMIT -1 OFFSET %s", [offset]
+        # `bm25()` scores are negative; smaller is a better match. Title
+        # matches are weighted ten times as heavily as body matches.
+        sql = f"""
+            SELECT d.id, d.kind, d.object_id
+            FROM {FTS_TABLE} f
+            JOIN {DOCUMENT_TABLE} d ON d.id = f.rowid
+            WHERE {FTS_TABLE} MATCH %s {kind_clause}
+            ORDER BY bm25({FTS_TABLE}, 10.0, 1.0), d.id DESC
+            {limit_clause}
+        """
+        params = [expression, *kind_params, *limit_params]
+    else:
+        return fallback_search(query, kind, limit, offset)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def matching_documents(query, kind=None):
+    """
+    Return the `SearchDocument`s matching `query`, unordered, as a queryset
+    the database can use as a subquery.
+    """
+    from search.models import SearchDocument
+
+    documents = SearchDocument.objects.all()
+    if kind:
+        documents = documents.filter(kind=kind)
+    if not WORD.search(query):
+        return documents.none()
+    if connection.vendor == "postgresql":
+        # Unqualified, since Django relabels the table in subqueries.
+        matched = RawSQL(
+            "search_vector @@ to_tsquery('english', %s)",
+            [postgres_tsquery(query)],
+            output_field=BooleanField(),
+        )
+        return documents.alias(matched=matched).filter(matched=True)
+    if connection.vendor == "sqlite":
+        return documents.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [sqlite_match_expression(query)],
+            )
+        )
+    for word in WORD.findall(query):
+        documents = documents.filter(
+            Q(title__icontains=word) | Q(body__icontains=word)
+        )
+    return documents
+
+
+def fallback_search(query, kind=None, limit=None, offset=0):
+    """
+    Unranked substring search for database backends without a full-text
+    index.
+    """
+    documents = matching_documents(query, kind)
+    rows = documents.order_by("-id").values_list("id", "kind", "object_id")
+    if limit is not None:
+        rows = rows[offset:offset + limit]
+    return list(rows)
@@ -0,0 +1,71 @@
+# search/index.py
+from search import backends
+from search.models import SearchDocument
+
+
+def post_document(post):
+    """
+    Return the `(title, body)` text indexed for a `blog.Post`.
+    """
+    names = " ".join(category.name for category in post.categories.all())
+    return post.title, f"{post.body}\n{names}"
+
+
+def project_document(project):
+    """
+    Return the `(title, body)` text indexed for a `portfolio.Project`.
+    """
+    names = " ".join(technology.name for technology in project.technology.all())
+    return project.title, f"{project.description or ''}\n{names}"
+
+
+def update_document(kind, object_id, title, body):
+    """
+    Create or refresh the `SearchDocument` for one object.
+    """
+    document, _ = SearchDocument.objects.update_or_create(
+        kind=kind,
+        object_id=object_id,
+        defaults={"title": title, "body": body},
+    )
+    backends.index_document(document)
+    return document
+
+
+def index_post(post):
+    return update_document(SearchDocument.POST, post.pk, *post_document(post))
+
+
+def index_project(project):
+    return update_document(
+        SearchDocument.PROJECT, project.pk, *project_document(project)
+    )
+
+
+def remove(kind, object_id):
+    """
+    Drop the `SearchDocument` of a deleted object.
+    """
+    for document_id in SearchDocument.objects.filter(
+        kind=kind, object_id=object_id
+    ).values_list("id", flat=True):
+        backends.remove_document(document_id)
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def matching_ids(query, kind):
+    """
+    Return the ids of every object of `kind` matching `query`, unordered,
+    as a queryset to filter on, e.g. `pk__in=matching_ids(...)`, which the
+    database runs as a subquery.
+    """
+    return backends.matching_documents(query, kind=kind).values("object_id")
+
+
+def search(query, limit, offset=0):
+    """
+    Return `(kind, object_id)` pairs for one page of results, best match
+    first.
+    """
+    rows = backends.search(query, limit=limit, offset=offset)
+    return [(kind, object_id) for _, kind, object_id in rows]
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from portfolio.models import Project
+from search import index
+from search.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the full-text `SearchDocument` index for every `blog.Post` "
+        "and `portfolio.Project`"
+    )
+    batch_size = 200
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing-only",
+            action="store_true",
+            help="Only index objects that don't have a `SearchDocument` yet.",
+        )
+
+    def handle(self, *args, **kwargs):
+        missing_only = kwargs.get("missing_only", False)
+        targets = (
+            (SearchDocument.POST, Post.objects.prefetch_related("categories"),
+             index.index_post),
+            (SearchDocument.PROJECT,
+             Project.objects.prefetch_related("technology"),
+             index.index_project),
+        )
+        for kind, queryset, index_object in targets:
+            if missing_only:
+                indexed = SearchDocument.objects.filter(kind=kind).values("object_id")
+                queryset = queryset.exclude(pk__in=indexed)
+            count = 0
+            # `iterator()` honours `prefetch_related()` per chunk.
+            for obj in queryset.order_by("pk").iterator(chunk_size=self.batch_size):
+                index_object(obj)
+                count += 1
+            self.stdout.write(f"Indexed {count} {kind}(s).")
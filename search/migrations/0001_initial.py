@@ -0,0 +1,29 @@
+# Generated by Django 4.1.9 on 2026-10-18 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('project', 'Project')], max_length=10, verbose_name='Kind')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Object ID')),
+                ('title', models.CharField(max_length=100, verbose_name='Title')),
+                ('body', models.TextField(blank=True, verbose_name='Body')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='search_document_unique_object'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.1.9 on 2026-10-18 12:40
+
+from django.db import migrations
+
+from search import backends
+
+
+def install_full_text_index(apps, schema_editor):
+    backends.install(schema_editor)
+
+
+def uninstall_full_text_index(apps, schema_editor):
+    backends.uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            install_full_text_index,
+            uninstall_full_text_index,
+        ),
+    ]
@@ -0,0 +1,19 @@
+from search import index
+
+
+class IndexedSearchMixin:
+    """
+    `ModelAdmin` mixin that answers the change list search box from the
+    full-text index instead of `LIKE '%term%'` scans over `search_fields`.
+
+    `search_fields` must still be set for the admin to show the search box.
+    """
+
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        # A subquery, so no list of ids is sent back to the database.
+        ids = index.matching_ids(search_term, self.search_kind)
+        return queryset.filter(pk__in=ids), False
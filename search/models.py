@@ -0,0 +1,52 @@
+# search/models.py
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized, searchable text for one `blog.Post` or
+    `portfolio.Project`.
+
+    The full-text index itself is backend specific and lives outside the
+    Django model (see `search.backends`): a generated `tsvector` column
+    with a GIN index on PostgreSQL, and an FTS5 shadow table on SQLite.
+    """
+
+    POST = "post"
+    PROJECT = "project"
+    KIND_CHOICES = [
+        (POST, "Post"),
+        (PROJECT, "Project"),
+    ]
+
+    kind = models.CharField(
+        verbose_name="Kind",
+        max_length=10,
+        choices=KIND_CHOICES,
+    )
+    object_id = models.PositiveBigIntegerField(
+        verbose_name="Object ID",
+    )
+    title = models.CharField(
+        verbose_name="Title",
+        max_length=100,
+    )
+    body = models.TextField(
+        verbose_name="Body",
+        blank=True,
+    )
+    updated_at = models.DateTimeField(
+        verbose_name="Updated At",
+        auto_now=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"],
+                name="search_document_unique_object",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} {self.title}"
@@ -0,0 +1,91 @@
+# search/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from blog.models import Category, Post
+from portfolio.models import Project, Technology
+from search import index
+from search.models import SearchDocument
+
+M2M_ACTIONS = ("post_add", "post_remove", "post_clear")
+
+
+def changed_objects(instance, action, pk_set, model, related_name):
+    """
+    For a reverse `m2m_changed`, return the objects of `model` whose
+    relation to `instance` changed. A `clear()` has no `pk_set`, so the
+    related ids are stashed on `instance` during `pre_clear`.
+    """
+    stash = f"_search_{related_name}_cleared"
+    if action == "pre_clear":
+        setattr(
+            instance,
+            stash,
+            list(getattr(instance, related_name).values_list("pk", flat=True)),
+        )
+        return model.objects.none()
+    if action not in M2M_ACTIONS:
+        return model.objects.none()
+    if action == "post_clear":
+        pk_set = getattr(instance, stash, [])
+    return model.objects.filter(pk__in=pk_set or [])
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_deleted_post(sender, instance, **kwargs):
+    index.remove(SearchDocument.POST, instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def index_post_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # `instance` is a `Category`; reindex the posts that changed.
+        posts = changed_objects(instance, action, pk_set, Post, "posts")
+        for post in posts.prefetch_related("categories"):
+            index.index_post(post)
+    elif action in M2M_ACTIONS:
+        index.index_post(instance)
+
+
+@receiver(post_save, sender=Category)
+def index_category_posts(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    for post in instance.posts.prefetch_related("categories"):
+        index.index_post(post)
+
+
+@receiver(post_save, sender=Project)
+def index_saved_project(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index.index_project(instance)
+
+
+@receiver(post_delete, sender=Project)
+def remove_deleted_project(sender, instance, **kwargs):
+    index.remove(SearchDocument.PROJECT, instance.pk)
+
+
+@receiver(m2m_changed, sender=Project.technology.through)
+def index_project_technologies(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # `instance` is a `Technology`; reindex the projects that changed.
+        projects = changed_objects(instance, action, pk_set, Project, "projects")
+        for project in projects.prefetch_related("technology"):
+            index.index_project(project)
+    elif action in M2M_ACTIONS:
+        index.index_project(instance)
+
+
+@receiver(post_save, sender=Technology)
+def index_technology_projects(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    for project in instance.projects.prefetch_related("technology"):
+        index.index_project(project)
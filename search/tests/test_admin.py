@@ -0,0 +1,56 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog.models import Post
+from portfolio.models import Project
+
+
+class IndexedAdminSearchTest(TestCase):
+    """
+    Test that `PostAdmin` and `ProjectAdmin` search through the index.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = CustomUser.objects.create_superuser(
+            username="admin",
+            email="admin@email.app",
+            password="adminpass01",
+        )
+        cls.post = Post.objects.create(
+            title="Keyset pagination",
+            body="Body",
+            author=cls.admin_user,
+        )
+        Post.objects.create(title="Other", body="Body", author=cls.admin_user)
+        cls.project = Project.objects.create(
+            owner=cls.admin_user,
+            title="Search engine",
+            description="Ranked results",
+        )
+
+    def setUp(self):
+        self.client.login(username="admin", password="adminpass01")
+
+    def test_post_admin_search(self):
+        """
+        The `Post` change list only shows index matches.
+        """
+        response = self.client.get(
+            reverse("admin:blog_post_changelist"), {"q": "keyset"}
+        )
+        self.assertEqual(
+            list(response.context["cl"].result_list), [self.post]
+        )
+
+    def test_project_admin_search(self):
+        """
+        The `Project` change list only shows index matches.
+        """
+        response = self.client.get(
+            reverse("admin:portfolio_project_changelist"), {"q": "engine"}
+        )
+        self.assertEqual(
+            list(response.context["cl"].result_list), [self.project]
+        )
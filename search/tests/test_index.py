@@ -0,0 +1,126 @@
+from django.test import SimpleTestCase, TestCase
+
+from accounts.models import CustomUser
+from blog.models import Category, Post
+from portfolio.models import Project, Technology
+from search import backends, index
+from search.models import SearchDocument
+
+
+class SearchIndexTest(TestCase):
+    """
+    Tests for keeping the full-text index up to date through signals.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+
+    def create_post(self, title, body="Body"):
+        return Post.objects.create(title=title, body=body, author=self.author)
+
+    def test_saving_a_post_indexes_it(self):
+        """
+        A saved `Post` is searchable by title and body.
+        """
+        post = self.create_post("Keyset pagination", "Seek instead of offset")
+        self.assertEqual(index.search("keyset", limit=10), [("post", post.pk)])
+        self.assertEqual(index.search("offset", limit=10), [("post", post.pk)])
+
+    def test_stemming_and_prefix_match(self):
+        """
+        Words match their stems, and the last word matches as a prefix.
+        """
+        post = self.create_post("Running Django", "Queries")
+        self.assertEqual(index.search("run", limit=10), [("post", post.pk)])
+        self.assertEqual(index.search("djan", limit=10), [("post", post.pk)])
+
+    def test_title_matches_rank_first(self):
+        """
+        A match in the title outranks a match in the body.
+        """
+        in_body = self.create_post("Notes", "Something about caching")
+        in_title = self.create_post("Caching", "Notes")
+        self.assertEqual(
+            index.search("caching", limit=10),
+            [("post", in_title.pk), ("post", in_body.pk)],
+        )
+
+    def test_category_changes_are_indexed(self):
+        """
+        Adding, renaming and clearing categories updates the post's entry.
+        """
+        post = self.create_post("A post")
+        category = Category.objects.create(name="Django")
+        post.categories.add(category)
+        self.assertEqual(index.search("django", limit=10), [("post", post.pk)])
+        category.name = "Flask"
+        category.save()
+        self.assertEqual(index.search("django", limit=10), [])
+        self.assertEqual(index.search("flask", limit=10), [("post", post.pk)])
+        category.posts.clear()
+        self.assertEqual(index.search("flask", limit=10), [])
+
+    def test_deleting_a_post_removes_it(self):
+        """
+        A deleted `Post` is removed from the index.
+        """
+        post = self.create_post("Ephemeral")
+        post.delete()
+        self.assertEqual(index.search("ephemeral", limit=10), [])
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_projects_are_indexed_with_technologies(self):
+        """
+        A `Project` is searchable by its technology names.
+        """
+        project = Project.objects.create(owner=self.author, title="Portfolio")
+        technology = Technology.objects.create(name="Postgres")
+        technology.projects.add(project)
+        self.assertEqual(
+            index.search("postgres", limit=10), [("project", project.pk)]
+        )
+        self.assertFalse(index.matching_ids("postgres", "post").exists())
+        self.assertEqual(
+            list(index.matching_ids("postgres", "project")),
+            [{"object_id": project.pk}],
+        )
+
+    def test_matching_ids_are_a_subquery(self):
+        """
+        Filtering on `matching_ids()` leaves the matching to the database.
+        """
+        post = self.create_post("Subquery")
+        posts = Post.objects.filter(pk__in=index.matching_ids("subquery", "post"))
+        with self.assertNumQueries(1):
+            self.assertEqual(list(posts), [post])
+
+    def test_operators_in_queries_are_treated_as_text(self):
+        """
+        FTS syntax in user input does not raise.
+        """
+        self.create_post("Quotes")
+        self.assertEqual(index.search('"quo AND (NOT', limit=10), [])
+        self.assertEqual(index.search("  ", limit=10), [])
+
+
+class QueryExpressionTest(SimpleTestCase):
+    """
+    Test that both backends turn free text into the same kind of query.
+    """
+
+    def test_last_word_is_a_prefix_on_every_backend(self):
+        self.assertEqual(
+            backends.sqlite_match_expression("key set pag"), '"key" "set" "pag"*'
+        )
+        self.assertEqual(
+            backends.postgres_tsquery("key set pag"), "'key' & 'set' & 'pag':*"
+        )
+
+    def test_operators_are_dropped_from_postgres_queries(self):
+        self.assertEqual(
+            backends.postgres_tsquery("!a | (b <-> 'c'"), "'a' & 'b' & 'c':*"
+        )
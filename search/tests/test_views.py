@@ -0,0 +1,71 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from blog.models import Post
+from portfolio.models import Project
+
+
+class SearchViewTest(TestCase):
+    """
+    Test the `search` view.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = CustomUser.objects.create_user(
+            username="testuser01",
+            password="testpass01",
+        )
+        for number in range(3):
+            Post.objects.create(
+                title=f"Django post {number}",
+                body="Body",
+                author=cls.author,
+            )
+        cls.project = Project.objects.create(
+            owner=cls.author,
+            title="Django portfolio",
+            description="A project",
+        )
+
+    def test_search_view_url_exists_at_desired_location(self):
+        """
+        Test that the `search` view is rendered at `/search/`.
+        """
+        response = self.client.get("/search/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "search/search_results.html")
+
+    def test_search_view_returns_posts_and_projects(self):
+        """
+        Test that results include both posts and projects.
+        """
+        response = self.client.get(reverse("search:index"), {"q": "django"})
+        kinds = [result["kind"] for result in response.context["results"]]
+        self.assertEqual(sorted(kinds), ["post", "post", "post", "project"])
+        self.assertContains(response, self.project.get_absolute_url())
+
+    @override_settings(SEARCH_RESULTS_PER_PAGE=3)
+    def test_search_view_paginates(self):
+        """
+        Test that results are split into pages.
+        """
+        first = self.client.get(reverse("search:index"), {"q": "django"})
+        second = self.client.get(
+            reverse("search:index"), {"q": "django", "page": 2}
+        )
+        self.assertEqual(len(first.context["results"]), 3)
+        self.assertTrue(first.context["has_next"])
+        self.assertEqual(len(second.context["results"]), 1)
+        self.assertFalse(second.context["has_next"])
+        self.assertTrue(second.context["has_previous"])
+
+    def test_search_view_ignores_bad_page_numbers(self):
+        """
+        Test that a malformed `page` falls back to the first page.
+        """
+        response = self.client.get(
+            reverse("search:index"), {"q": "django", "page": "x"}
+        )
+        self.assertEqual(response.context["page_number"], 1)
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.shortcuts import render
+
+from config.settings import THE_SITE_NAME
+from blog.models import Post
+from portfolio.models import Project
+from search import index
+from search.models import SearchDocument
+
+
+def get_page_number(request):
+    """
+    Return the 1-based `page` query parameter, defaulting to 1.
+    """
+    try:
+        return max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        return 1
+
+
+def load_results(hits):
+    """
+    Fetch the objects for `(kind, object_id)` search hits, keeping their
+    rank order and skipping any that have since been deleted.
+    """
+    post_ids = [pk for kind, pk in hits if kind == SearchDocument.POST]
+    project_ids = [pk for kind, pk in hits if kind == SearchDocument.PROJECT]
+    objects = {
+        SearchDocument.POST: (
+            Post.objects.defer("body").select_related("author").in_bulk(post_ids)
+            if post_ids
+            else {}
+        ),
+        SearchDocument.PROJECT: (
+            Project.objects.in_bulk(project_ids) if project_ids else {}
+        ),
+    }
+    return [
+        {"kind": kind, "object": objects[kind][pk]}
+        for kind, pk in hits
+        if pk in objects[kind]
+    ]
+
+
+def search(request):
+    """
+    View for ranked full-text search over `blog.Post` and
+    `portfolio.Project`.
+    """
+    query = request.GET.get("q", "").strip()
+    page_number = get_page_number(request)
+    per_page = settings.SEARCH_RESULTS_PER_PAGE
+    results = []
+    has_next = False
+    if query:
+        # Fetch one extra hit to learn whether there is a next page.
+        hits = index.search(
+            query,
+            limit=per_page + 1,
+            offset=(page_number - 1) * per_page,
+        )
+        has_next = len(hits) > per_page
+        results = load_results(hits[:per_page])
+    context = {
+        "the_site_name": THE_SITE_NAME,
+        "page_title": "Search",
+        "query": query,
+        "results": results,
+        "page_number": page_number,
+        "has_next": has_next,
+        "has_previous": page_number > 1,
+    }
+    return render(request, "search/search_results.html", context)
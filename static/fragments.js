@@ -0,0 +1,39 @@
+// Fill in the per-visitor parts of pages that are rendered once and shared
+// by every visitor: the navbar links, the CSRF token of POST forms and the
+// visitor's own comments that are still queued.
+document.addEventListener("DOMContentLoaded", function () {
+    const navbar = document.querySelector("[data-session-fragment]");
+    if (navbar) {
+        fetch(navbar.dataset.sessionFragment, { credentials: "same-origin" })
+            .then(function (response) {
+                return response.json();
+            })
+            .then(function (fragment) {
+                navbar.innerHTML = fragment.navbar;
+                document
+                    .querySelectorAll("input[name=csrfmiddlewaretoken]")
+                    .forEach(function (input) {
+                        input.value = fragment.csrf_token;
+                    });
+            });
+    }
+
+    const pending = document.querySelector("[data-pending-comments]");
+    if (pending) {
+        fetch(pending.dataset.pendingComments, { credentials: "same-origin" })
+            .then(function (response) {
+                return response.json();
+            })
+            .then(function (data) {
+                data.comments.forEach(function (comment) {
+                    const heading = document.createElement("p");
+                    const author = document.createElement("b");
+                    author.textContent = comment.author;
+                    heading.append(author, " wrote (awaiting publication):");
+                    const body = document.createElement("p");
+                    body.textContent = comment.body;
+                    pending.append(heading, body, document.createElement("hr"));
+                });
+            });
+    }
+});